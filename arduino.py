@@ -2,32 +2,305 @@
 # 11/17/25
 
 
-import serial
-import time
+import asyncio
+import collections
+import struct
+import threading
 from enum import Enum
 
+from hal import Hardware
+from tasks import Task
+
+
+# ---------- PROTOCOL ----------
+# Binary frames (little endian), same layout in arduino/program/program.ino:
+#   Pi -> Arduino: SYNC, opcode, seq, motor, speed (int16), duration [ms] (uint16), CRC-8
+#   Arduino -> Pi: SYNC, reply, seq, motor, CRC-8
+# The CRC covers every byte between SYNC and the CRC. Each motor has its own
+# job queue on the Arduino, so jobs for different motors run at the same
+# time and frames are accepted while motors are running. Plain text lines
+# ("Arduino ready", debug messages) may appear between frames; they never
+# contain the SYNC byte.
+SYNC = 0xA5
+BAUDRATE = 115200
+
+# Opcodes (Pi -> Arduino)
+OP_MOTOR = 0x01     # run motor at speed for duration ms (0 = until the next command for that motor)
+OP_STOP = 0x02      # stop motor (0 = all motors)
+OP_PING = 0x03      # ACK only
+OP_STATUS = 0x04    # STATUS reply with the running motors
+
+# Replies (Arduino -> Pi)
+RE_ACK = 0x81       # frame accepted (motor job started)
+RE_DONE = 0x82      # timed motor job finished
+RE_ERROR = 0x83     # bad CRC, opcode or motor, or job queue full
+RE_CANCEL = 0x84    # motor job dropped by a stop
+RE_STATUS = 0x85    # motor byte = running motors (bit 0 = motor 1)
+
+COMMAND_FRAME = struct.Struct("<BBBBhHB")
+REPLY_FRAME = struct.Struct("<BBBBB")
+
+
+def crc8(data: bytes):
+    """CRC-8 (polynomial 0x07, initial value 0)."""
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def encode_command(opcode: int, seq: int, motor: int = 0, speed: int = 0, duration_ms: int = 0):
+    """Build a Pi -> Arduino frame."""
+    body = COMMAND_FRAME.pack(SYNC, opcode, seq, motor, speed, duration_ms, 0)[1:-1]
+    return bytes([SYNC]) + body + bytes([crc8(body)])
+
+
+def encode_reply(reply: int, seq: int, motor: int = 0):
+    """Build an Arduino -> Pi frame (used by the simulated firmware)."""
+    body = bytes([reply, seq, motor])
+    return bytes([SYNC]) + body + bytes([crc8(body)])
+
 
 class Command(str, Enum):
-    MOTOR1 = "MOTOR1"
-    MOTOR2 = "MOTOR2"
-    MOTOR3 = "MOTOR3"
-    
+    MOTOR1 = "MOTOR1"   # Keypad
+    MOTOR2 = "MOTOR2"   # Extender
+    MOTOR3 = "MOTOR3"   # Crank
+    RESET = "reset"     # Retract extender
+
+
+# Motor jobs of each command: [(motor, speed -255..255, duration ms)]
+PROGRAMS = {
+    Command.MOTOR1: [(1, -255, 5000)],
+    Command.MOTOR2: [(2, 255, 4000), (2, -255, 4000)],
+    Command.MOTOR3: [(3, -255, 5000)],
+    Command.RESET:  [(2, -255, 250)],
+}
+
 
 class Arduino:
-    def __init__(self, port='/dev/ttyACM0', baudrate=9600):
-        self.ser = serial.Serial(port, baudrate, timeout=1)
-        time.sleep(2)  # Allow Arduino to reset
+    """
+    Serial link to the Arduino motor controller.
+    Commands are binary frames with a sequence number; a background reader
+    thread decodes the replies and finishes the Task of each frame when the
+    Arduino acknowledges it (or reports a timed job done), so every command
+    can be awaited (Task.wait() from threads, `await` from asyncio code).
+    Commands for different motors run at the same time on the Arduino.
+    Opening the port resets the board unless reset=False (best effort: a
+    ping then checks that the sketch is running); with wait=False
+    the constructor returns right away and wait_ready() blocks until the
+    firmware is up, so other hardware can be set up in the meantime.
+    """
+
+    ACK_TIMEOUT = 0.5       # [s] time for the Arduino to accept a frame once it is free
+    DONE_MARGIN = 1.0       # [s] allowed on top of a timed job's duration
+    MAX_LINES = 100         # unread text lines kept for read_response()
+    READY_LINE = "Arduino ready"    # printed by setup() once the sketch runs
+    READY_TIMEOUT = 3.0     # [s] bootloader delay + setup() with a good margin
+
+    def __init__(self, port='/dev/ttyACM0', baudrate=BAUDRATE, hardware=None, reset=True, wait=True):
+        self.hardware = hardware if hardware is not None else Hardware()
+        self.clock = self.hardware.clock
+        self.ser = self.hardware.serial(port, baudrate, timeout=1, reset=reset)
+        self.ready = Task("arduino:ready", self.clock)      # finishes once the firmware answers
+        # Reader thread state
+        self._lines = collections.deque(maxlen=self.MAX_LINES)
+        self._pending = collections.OrderedDict()  # seq -> [task, expected reply, timeout, start time, last frame, result, queue]
+        self._seq = 0
+        self._rx = b""
+        self._lock = threading.Lock()
+        self._running = True
+        self._thread = threading.Thread(target=self._reader, daemon=True)
+        self.clock.register(self._thread)
+        self._thread.start()
+        if not reset:
+            # No reset, so no banner: the sketch is already running if it answers a ping
+            self.ping().add_done_callback(self._on_ping)
+        if wait:
+            self.wait_ready()
+
+    def wait_ready(self, timeout: float = READY_TIMEOUT):
+        """Block until the firmware is ready for commands. Returns False on timeout."""
+        if self.ready.wait(timeout):
+            return True
+        print(f"Arduino: not ready after {timeout} s")
+        return False
 
     def send_command(self, command: Command):
-        """Send a command string to the Arduino."""
-        self.ser.write((command + '\n').encode())
+        """Send a command to the Arduino (without waiting for it)."""
+        self.request(command)
 
     def read_response(self):
-        """Read a line of response from the Arduino."""
-        if self.ser.in_waiting > 0:
-            return self.ser.readline().decode().strip()
-        return None
+        """Returns the oldest unread text line from the Arduino, or None."""
+        with self._lock:
+            return self._lines.popleft() if self._lines else None
+
+    def request(self, command: Command, timeout: float = None):
+        """Send every motor job of a command. Returns a Task that finishes when the last job is done."""
+        task = Task(f"arduino:{command.value}", self.clock)
+        steps = PROGRAMS[command]
+        for n, (motor, speed, duration_ms) in enumerate(steps):
+            self._send(task, OP_MOTOR, motor, speed, duration_ms, timeout, last=(n == len(steps) - 1), result=command)
+        return task
+
+    def motor(self, motor: int, speed: int, duration_ms: int = 0, timeout: float = None):
+        """
+        Run one motor at speed (-255..255) for duration_ms (0 = until the next
+        command for that motor, for streaming setpoints). Returns a Task that
+        finishes when the job is done (or accepted, if duration_ms is 0).
+        """
+        task = Task(f"arduino:motor{motor}", self.clock)
+        self._send(task, OP_MOTOR, motor, speed, duration_ms, timeout, last=True, result=motor)
+        return task
+
+    def stop(self, motor: int = 0):
+        """Stop one motor (0 = all). Returns a Task that finishes when the Arduino accepts it."""
+        task = Task(f"arduino:stop{motor}", self.clock)
+        self._send(task, OP_STOP, motor, 0, 0, None, last=True, result=motor)
+        return task
+
+    def ping(self):
+        """Round trip to the Arduino. Returns a Task that finishes when it answers."""
+        task = Task("arduino:ping", self.clock)
+        self._send(task, OP_PING, 0, 0, 0, None, last=True, result=None)
+        return task
+
+    def status(self):
+        """Ask which motors are running. Returns a Task whose result is the list of running motors."""
+        task = Task("arduino:status", self.clock)
+        self._send(task, OP_STATUS, 0, 0, 0, None, last=True, result=None)
+        return task
+
+    def run_command(self, command: Command, timeout: float = None):
+        """Send a motor command and wait until the Arduino reports it finished. Returns False on failure."""
+        try:
+            self.request(command, timeout).result()
+            return True
+        except (TimeoutError, IOError) as e:
+            print(e)
+            return False
+
+    def run_command_async(self, command: Command, timeout: float = None):
+        """Send a motor command and return right away. Returns its Task."""
+        return self.request(command, timeout)
+
+    async def command(self, command: Command, timeout: float = None):
+        """asyncio version: `await arduino.command(Command.MOTOR1)` returns the command once it finished."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(task):
+            error = task.exception(0)
+            if error is not None:
+                loop.call_soon_threadsafe(future.set_exception, error)
+            else:
+                loop.call_soon_threadsafe(future.set_result, task.result(0))
+
+        self.request(command, timeout).add_done_callback(resolve)
+        return await future
 
     def close(self):
-        """Close the serial connection."""
-        self.ser.close()
\ No newline at end of file
+        """Stop the reader thread and close the serial connection."""
+        self._running = False
+        self.clock.join(self._thread)
+        self.ser.close()
+
+
+    # PRIVATE METHODS
+
+    def _send(self, task: Task, opcode: int, motor: int, speed: int, duration_ms: int, timeout: float, last: bool, result):
+        """Send one frame and remember what reply finishes it."""
+        speed = max(-255, min(255, int(speed)))
+        expect = RE_DONE if (opcode == OP_MOTOR and duration_ms > 0) else RE_ACK
+        if timeout is None:
+            timeout = duration_ms / 1000 + self.DONE_MARGIN
+        with self._lock:
+            seq = self._seq
+            self._seq = (self._seq + 1) % 256
+            queue = motor if opcode == OP_MOTOR else None    # motor jobs wait for earlier jobs of the same motor
+            self._pending[seq] = [task, expect, timeout, None, last, result, queue]
+            self._start_next()
+        self.ser.write(encode_command(opcode, seq, motor, speed, duration_ms))
+
+    def _on_ping(self, task: Task):
+        """Mark the firmware ready when the first ping is answered."""
+        if task.exception(0) is None:
+            self.ready._finish(True)
+
+    def _reader(self):
+        """Read the serial stream and split it into reply frames and text lines."""
+        while self._running:
+            data = self.ser.read(self.ser.in_waiting or 1)      # returns empty on timeout
+            self._rx += data
+            while self._rx:
+                if self._rx[0] == SYNC:
+                    if len(self._rx) < REPLY_FRAME.size:
+                        break
+                    frame, self._rx = self._rx[:REPLY_FRAME.size], self._rx[REPLY_FRAME.size:]
+                    _, reply, seq, motor, crc = REPLY_FRAME.unpack(frame)
+                    if crc8(frame[1:4]) == crc:
+                        self._on_reply(reply, seq, motor)
+                    else:
+                        print("Arduino: bad reply CRC")
+                    continue
+                end = self._rx.find(b"\n")
+                sync = self._rx.find(bytes([SYNC]))
+                if sync >= 0 and (end < 0 or sync < end):
+                    self._rx = self._rx[sync:]      # drop a partial line before a frame
+                    continue
+                if end < 0:
+                    break
+                line, self._rx = self._rx[:end], self._rx[end + 1:]
+                line = line.decode(errors="replace").strip()
+                if line:
+                    print(f"Arduino: {line}")
+                    with self._lock:
+                        self._lines.append(line)
+                    if line == self.READY_LINE:
+                        self.ready._finish(True)
+            self._expire()
+
+    def _on_reply(self, reply: int, seq: int, motor: int):
+        """Finish the frame a reply belongs to."""
+        with self._lock:
+            entry = self._pending.get(seq)
+            if entry is None:
+                return
+            task, expect, _, _, last, result, _ = entry
+            if reply == RE_ACK and expect == RE_DONE:
+                entry[3] = self.clock.time()    # job started: the timeout counts from now
+                return
+            del self._pending[seq]
+            self._start_next()
+        if reply == RE_ERROR:
+            task._finish(error=IOError(f"{task.name}: Arduino rejected frame {seq}"))
+        elif reply == RE_CANCEL:
+            task._finish(error=IOError(f"{task.name}: frame {seq} cancelled by a stop"))
+        elif reply == RE_STATUS:
+            task._finish([m for m in (1, 2, 3) if motor & (1 << (m - 1))])
+        elif last:
+            task._finish(result)
+
+    def _expire(self):
+        """Fail frames that were not accepted or finished in time."""
+        now = self.clock.time()
+        expired = []
+        with self._lock:
+            for seq, (task, expect, timeout, start, _, _, _) in list(self._pending.items()):
+                if start is not None and now - start > timeout + self.ACK_TIMEOUT:
+                    del self._pending[seq]
+                    expired.append((task, timeout))
+            self._start_next()
+        for task, timeout in expired:
+            task._finish(error=TimeoutError(f"{task.name} did not finish within {timeout} s"))
+
+    def _start_next(self):
+        """Start the clock of every frame the Arduino can run now (lock held)."""
+        busy = set()
+        for entry in self._pending.values():
+            queue = entry[6]
+            if entry[3] is None and queue not in busy:
+                entry[3] = self.clock.time()
+            if queue is not None:
+                busy.add(queue)
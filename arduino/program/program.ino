@@ -14,11 +14,51 @@ const int PIN_PHASE3  = 2;      // Direction (PHASE)
 const int PIN_IN3     = 5;      // PWM speed (IN)  <-- must be PWM-capable
 
 
-// ---------- COMMANDS ----------
-const String MOTOR1 = "MOTOR1"; // Keypad
-const String MOTOR2 = "MOTOR2"; // Extender
-const String MOTOR3 = "MOTOR3"; // Crank
-// (Add more commands as needed...)
+// ---------- PROTOCOL ----------
+// Binary frames (little endian), same layout as arduino.py on the Pi:
+//   Pi -> Arduino: SYNC, opcode, seq, motor, speed (int16), duration [ms] (uint16), CRC-8
+//   Arduino -> Pi: SYNC, reply, seq, motor, CRC-8
+// The CRC (polynomial 0x07) covers every byte between SYNC and the CRC.
+// Each motor has its own job queue and runs independently of the others
+// (no delay() calls), so frames are accepted while motors are running.
+const long BAUDRATE = 115200;
+const byte SYNC = 0xA5;
+// opcodes
+const byte OP_MOTOR = 0x01;     // run motor at speed for duration ms (0 = until the next command)
+const byte OP_STOP  = 0x02;     // stop motor (0 = all motors)
+const byte OP_PING  = 0x03;     // ACK only
+const byte OP_STATUS = 0x04;    // STATUS reply with the running motors
+// replies
+const byte RE_ACK    = 0x81;    // frame accepted (motor job started)
+const byte RE_DONE   = 0x82;    // timed motor job finished
+const byte RE_ERROR  = 0x83;    // bad CRC, opcode or motor, or job queue full
+const byte RE_CANCEL = 0x84;    // motor job dropped by a stop
+const byte RE_STATUS = 0x85;    // motor byte = running motors (bit 0 = motor 1)
+const int COMMAND_SIZE = 9;
+
+byte frame[COMMAND_SIZE];       // command frame being received
+int frame_len = 0;
+
+
+// ---------- JOB TABLE ----------
+const int NUM_MOTORS = 3;
+const int QUEUE_SIZE = 4;       // jobs per motor (running + waiting)
+
+struct Job {
+  byte seq;
+  int speed;
+  unsigned int duration;        // [ms] 0 = run until the next job for this motor
+};
+
+struct MotorJobs {
+  Job jobs[QUEUE_SIZE];         // jobs[head] is running when running is true
+  int head;
+  int count;
+  bool running;
+  unsigned long start;          // [ms] millis() when the running job started
+};
+
+MotorJobs table[NUM_MOTORS];
 
 
 // ---------- SUB-ROUTINES ----------
@@ -71,6 +111,125 @@ void drive_motor(int motor, int speed) {
 }
 
 
+byte crc8(const byte *data, int len) {
+  /* CRC-8 (polynomial 0x07, initial value 0) */
+  byte crc = 0;
+  for (int i = 0; i < len; i++) {
+    crc ^= data[i];
+    for (int b = 0; b < 8; b++) {
+      crc = (crc & 0x80) ? (crc << 1) ^ 0x07 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+
+void send_reply(byte reply, byte seq, byte motor) {
+  /* Send a reply frame to the Pi */
+  byte out[5] = {SYNC, reply, seq, motor, 0};
+  out[4] = crc8(out + 1, 3);
+  Serial.write(out, 5);
+}
+
+
+bool queue_job(byte motor, byte seq, int speed, unsigned int duration) {
+  /* Add a job to a motor's queue, returns false if the queue is full */
+  MotorJobs &m = table[motor - 1];
+  if (m.count == QUEUE_SIZE) {
+    return false;
+  }
+  Job &job = m.jobs[(m.head + m.count) % QUEUE_SIZE];
+  job.seq = seq;
+  job.speed = constrain(speed, -255, 255);
+  job.duration = duration;
+  m.count++;
+  return true;
+}
+
+
+void stop_jobs(byte motor) {
+  /* Stop a motor and cancel its running and waiting jobs */
+  MotorJobs &m = table[motor - 1];
+  drive_motor(motor, 0);
+  for (int i = 0; i < m.count; i++) {
+    Job &job = m.jobs[(m.head + i) % QUEUE_SIZE];
+    // a running job without a duration already finished when it was acknowledged
+    if (i > 0 || !m.running || job.duration > 0) {
+      send_reply(RE_CANCEL, job.seq, motor);
+    }
+  }
+  m.head = 0;
+  m.count = 0;
+  m.running = false;
+}
+
+
+void update_jobs(byte motor) {
+  /* Finish the running job when its time is up and start the next one */
+  MotorJobs &m = table[motor - 1];
+  if (m.running) {
+    Job &job = m.jobs[m.head];
+    if (job.duration > 0 && millis() - m.start >= job.duration) {
+      drive_motor(motor, 0);
+      send_reply(RE_DONE, job.seq, motor);
+    } else if (!(job.duration == 0 && m.count > 1)) {
+      return;     // still running (a job without a duration ends when the next one arrives)
+    }
+    m.head = (m.head + 1) % QUEUE_SIZE;
+    m.count--;
+    m.running = false;
+  }
+  if (m.count > 0) {
+    Job &job = m.jobs[m.head];
+    drive_motor(motor, job.speed);
+    m.start = millis();
+    m.running = true;
+    send_reply(RE_ACK, job.seq, motor);
+  }
+}
+
+
+void handle_frame() {
+  /* Run a complete command frame */
+  byte opcode = frame[1];
+  byte seq = frame[2];
+  byte motor = frame[3];
+  int speed = (int)(frame[4] | (frame[5] << 8));
+  unsigned int duration = frame[6] | (frame[7] << 8);
+  if (crc8(frame + 1, COMMAND_SIZE - 2) != frame[8]) {
+    send_reply(RE_ERROR, seq, motor);
+    return;
+  }
+  byte running = 0;
+  switch (opcode) {
+    case OP_MOTOR:
+      // acknowledged by update_jobs() when the job starts
+      if (motor < 1 || motor > NUM_MOTORS || !queue_job(motor, seq, speed, duration)) {
+        send_reply(RE_ERROR, seq, motor);
+      }
+      break;
+    case OP_STOP:
+      for (int m = 1; m <= NUM_MOTORS; m++) {
+        if (motor == 0 || motor == m) stop_jobs(m);
+      }
+      send_reply(RE_ACK, seq, motor);
+      break;
+    case OP_PING:
+      send_reply(RE_ACK, seq, motor);
+      break;
+    case OP_STATUS:
+      for (int m = 1; m <= NUM_MOTORS; m++) {
+        if (table[m - 1].running) running |= 1 << (m - 1);
+      }
+      send_reply(RE_STATUS, seq, running);
+      break;
+    default:
+      send_reply(RE_ERROR, seq, motor);
+      break;
+  }
+}
+
+
 // ---------- INITIAL SETUP ----------
 void setup() {
   // set pin input/output modes
@@ -85,7 +244,7 @@ void setup() {
   analogWrite(PIN_IN2, 0);
   analogWrite(PIN_IN3, 0);
   // start serial monitor
-  Serial.begin(9600);
+  Serial.begin(BAUDRATE);
   while (!Serial);
   Serial.println("Arduino ready");
 }
@@ -93,39 +252,20 @@ void setup() {
 
 // ---------- FOREVER LOOP ----------
 void loop() {
-  // Wait for serial port
-  if (Serial.available()) {
-    // Parse command
-    String cmd = Serial.readStringUntil('\n');
-    cmd.trim();
-    // Handle command
-    if (cmd == MOTOR1) {
-      Serial.println("Turning motor 1 (keypad)...");
-      drive_motor(1, -255);
-      delay(5000);
-      drive_motor(1, 0);
-      Serial.println("Turned motor 1");
-    } else if (cmd == MOTOR2) {
-      Serial.println("Turning motor 2 (extender)...");
-      drive_motor(2, 255);
-      delay(4000);
-      drive_motor(2, -255);
-      delay(4000);
-      drive_motor(2, 0);
-      Serial.println("Turned motor 2");
-    } else if (cmd == MOTOR3) {
-      Serial.println("Turning motor 3 (crank)...");
-      drive_motor(3, -255);
-      delay(5000);
-      drive_motor(3, 0);
-      Serial.println("Turned motor 3");
-    } else if (cmd == "reset") {
-      drive_motor(2, -255);
-      delay(250);
-      drive_motor(2, 0);
-    } else {
-      Serial.print("Unknown command: ");
-        Serial.println(cmd);
+  // Collect command frame bytes
+  while (Serial.available()) {
+    byte b = Serial.read();
+    if (frame_len == 0 && b != SYNC) {
+      continue;   // resync on the next SYNC byte
+    }
+    frame[frame_len++] = b;
+    if (frame_len == COMMAND_SIZE) {
+      handle_frame();
+      frame_len = 0;
     }
   }
-}
\ No newline at end of file
+  // Run the motor jobs
+  for (int m = 1; m <= NUM_MOTORS; m++) {
+    update_jobs(m);
+  }
+}
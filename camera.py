@@ -0,0 +1,115 @@
+# Camera Capture Library
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import math
+import time
+
+
+# PRIVATE LIBRARIES
+from vision import IMAGE_HEIGHT, IMAGE_WIDTH, YuvFrame
+
+
+# CAMERA PARAMETERS
+LORES_SIZE = (IMAGE_WIDTH, IMAGE_HEIGHT)    # YUV420 stream the detector reads
+FRAME_RATE = 30             # [frames/s]
+BUFFER_COUNT = 6            # camera buffers (frames held by the pipeline + the one being filled)
+SETTLE_TIME = 0.5           # [s] for the exposure to settle after starting
+
+
+class CameraFrame:
+    """
+    A camera request mapped in place: frame.yuv are views of the camera's
+    lores buffer (no copy), valid until release(). Release it as soon as it
+    is processed, the camera only has BUFFER_COUNT of them.
+    Usage:
+        with camera.capture() as frame:
+            markers = detector.detect(frame.yuv)
+    """
+
+    def __init__(self, request, size: tuple, stride: int):
+        from picamera2 import MappedArray
+        self.request = request
+        self._mapped = MappedArray(request, "lores", write=False)
+        buffer = self._mapped.__enter__().array
+        self.yuv = YuvFrame.from_i420(buffer, size[0], size[1], stride)
+        # Start of the frame readout on the monotonic clock [ns]
+        self.timestamp = request.get_metadata().get("SensorTimestamp")
+
+    def latency(self):
+        """Time since the frame was read out of the sensor [s]."""
+        return (time.monotonic_ns() - self.timestamp) / 1e9 if self.timestamp else math.nan
+
+    def release(self):
+        """Unmap the buffer and give it back to the camera (safe to call twice)."""
+        if self.request is not None:
+            self.yuv = None
+            self._mapped.__exit__(None, None, None)
+            self.request.release()
+            self.request = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class Camera:
+    """
+    Picamera2 capture of a small YUV420 (lores) stream without copies.
+    The main stream is only there because libcamera needs one; it is never
+    read. capture() maps the next request's lores buffer in place instead
+    of copying a 4-byte-per-pixel XRGB8888 frame out with capture_array(),
+    and the detector reads the YUV planes directly (no color conversion).
+    Parameters:
+    ----------
+    size : tuple
+        (width, height) of the lores stream [px]
+    frame_rate : float
+        Frames per second
+    buffer_count : int
+        Camera buffers (capture() blocks while all of them are held)
+    """
+
+    # CONSTRUCTOR
+
+    def __init__(self, size: tuple = LORES_SIZE, frame_rate: float = FRAME_RATE, buffer_count: int = BUFFER_COUNT):
+        self.size = size
+        self.frame_rate = frame_rate
+        self.buffer_count = buffer_count
+        self.picam2 = None
+        self.stride = None
+
+
+    # PUBLIC METHODS
+
+    def start(self, settle: float = SETTLE_TIME):
+        """Configure and start the camera, then let the exposure settle."""
+        import libcamera
+        from picamera2 import Picamera2
+        self.picam2 = Picamera2()
+        config = self.picam2.create_video_configuration(
+            main={"size": self.size},
+            lores={"size": self.size, "format": "YUV420"},
+            controls={"FrameRate": self.frame_rate},
+            buffer_count=self.buffer_count,
+            colour_space=libcamera.ColorSpace.Sycc(),       # full-range YUV, as vision's tables expect
+        )
+        self.picam2.configure(config)
+        self.stride = self.picam2.camera_configuration()["lores"]["stride"]
+        self.picam2.start()
+        time.sleep(settle)
+        return self
+
+    def capture(self):
+        """Block until the next frame. Returns it as a CameraFrame (release() it when done)."""
+        return CameraFrame(self.picam2.capture_request(), self.size, self.stride)
+
+    def stop(self):
+        """Stop and close the camera."""
+        if self.picam2 is not None:
+            self.picam2.stop()
+            self.picam2.close()
+            self.picam2 = None
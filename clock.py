@@ -0,0 +1,164 @@
+# Clock Library
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import math
+import threading
+import time
+
+
+# Every control loop gets its time from a clock object instead of calling
+# time.time()/time.sleep() directly:
+#
+#   clock.time()                -> current time [s]
+#   clock.sleep(seconds)        -> block the calling thread
+#   clock.sleep_until(t)        -> block until clock.time() reaches t
+#   clock.join(thread, timeout) -> wait for a thread to finish
+#   clock.register(thread)      -> declare a new thread that will use the clock
+#   clock.wait_for(cond, predicate, timeout)
+#                               -> Condition.wait_for() with the timeout on this clock
+#   clock.notify_all(cond)      -> wake threads in clock.wait_for() on cond
+#
+# RealClock follows the wall clock, MonotonicClock cannot jump when the Pi
+# syncs its time, and VirtualClock runs simulations faster than real time.
+
+
+class RealClock:
+    """Wall clock time (time.time)."""
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def sleep_until(self, t: float):
+        self.sleep(t - self.time())
+
+    def join(self, thread: threading.Thread, timeout: float = None):
+        thread.join(timeout)
+
+    def register(self, thread: threading.Thread):
+        pass
+
+    def wait_for(self, cond: threading.Condition, predicate, timeout: float = None):
+        return cond.wait_for(predicate, timeout)
+
+    def notify_all(self, cond: threading.Condition):
+        cond.notify_all()
+
+
+class MonotonicClock(RealClock):
+    """Monotonic time (time.monotonic), unaffected by system clock changes."""
+
+    def time(self):
+        return time.monotonic()
+
+
+class VirtualClock:
+    """
+    Discrete-event simulated clock.
+    Time only moves when every thread that uses the clock is waiting on it;
+    it then jumps straight to the earliest wake-up time, so simulated runs
+    take as long as the computation and not as long as the sleeps.
+    """
+
+    # CONSTANTS
+
+    POLL = 0.01     # [s] real time between checks for threads that exited
+
+
+    # CONSTRUCTOR
+
+    def __init__(self, start: float = 0.0):
+        self._now = float(start)
+        self._lock = threading.Lock()
+        self._threads = {threading.current_thread()}    # threads that use this clock
+        self._parked = {}           # thread -> [wake time, wake condition, user condition, done check]
+
+
+    # PUBLIC METHODS
+
+    def time(self):
+        return self._now
+
+    def sleep(self, seconds: float):
+        self._park(self._now + max(0.0, seconds))
+
+    def sleep_until(self, t: float):
+        self._park(t)
+
+    def join(self, thread: threading.Thread, timeout: float = None):
+        deadline = math.inf if timeout is None else self._now + timeout
+        self._park(deadline, lambda: not thread.is_alive())
+
+    def register(self, thread: threading.Thread):
+        """Count a (not yet started) thread as a clock user so time waits for it."""
+        with self._lock:
+            self._threads.add(thread)
+            self._threads.add(threading.current_thread())
+
+    def wait_for(self, cond: threading.Condition, predicate, timeout: float = None):
+        """Wait (holding cond) until predicate() is true or timeout passes on this clock."""
+        deadline = math.inf if timeout is None else self._now + timeout
+        while True:
+            result = predicate()
+            if result or self._now >= deadline:
+                return result
+            self._park(deadline, cond=cond)
+
+    def notify_all(self, cond: threading.Condition):
+        """Wake every thread waiting on cond (caller holds cond)."""
+        cond.notify_all()
+        with self._lock:
+            for record in self._parked.values():
+                if record[2] is cond:
+                    record[0] = min(record[0], self._now)
+                    record[1].notify()
+
+
+    # PRIVATE METHODS
+
+    def _park(self, deadline: float, done=None, cond=None):
+        """
+        Block the calling thread until deadline, until done() is true or,
+        when cond is given (and held by the caller), until notify_all(cond).
+        """
+        me = threading.current_thread()
+        with self._lock:
+            self._threads.add(me)
+            wake = threading.Condition(self._lock)
+            record = [deadline, wake, cond, done]
+            self._parked[me] = record
+            if cond is not None:
+                cond.release()
+            try:
+                while self._now < record[0] and not (done and done()):
+                    self._advance()
+                    if self._now >= record[0]:
+                        break
+                    wake.wait(self.POLL)
+            finally:
+                del self._parked[me]
+        if cond is not None:
+            cond.acquire()
+
+    def _advance(self):
+        """Jump to the next wake-up time if every thread is waiting (lock held)."""
+        self._threads = {t for t in self._threads if t.ident is None or t.is_alive()}
+        if any(t not in self._parked for t in self._threads):
+            return
+        # A joined thread that has exited makes its joiner runnable
+        for record in self._parked.values():
+            if record[3] is not None and record[3]():
+                record[1].notify()
+                return
+        next_time = min(record[0] for record in self._parked.values())
+        if next_time <= self._now or next_time == math.inf:
+            return
+        self._now = next_time
+        for deadline, wake, _, _ in self._parked.values():
+            if deadline <= next_time:
+                wake.notify()
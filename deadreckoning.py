@@ -1,16 +1,23 @@
-from codrone_edu.drone import *
 import time
 
 
-def start():
-        POWER = 50
-        FORWARD = 0.6
-        BACKWARD = 0.3
-        JUMP = 0.2
+def connect():
+        """Pair with the CoDrone (done ahead of time for a warm start)."""
+        from codrone_edu.drone import Drone
         print("Connecting to CoDrone...")
         drone = Drone()
         drone.pair()
         print("Connected!")
+        return drone
+
+
+def start(drone=None):
+        POWER = 50
+        FORWARD = 0.6
+        BACKWARD = 0.3
+        JUMP = 0.2
+        if drone is None:
+            drone = connect()
         drone.reset_trim()
         drone.takeoff()
         print("hovering")
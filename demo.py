@@ -20,7 +20,7 @@ from main import PORT_ARDUINO, PIN_SERVO_LEFT, PIN_SERVO_RIGHT
 def demo():
 
     # Arduino communication
-    arduino = Arduino(PORT_ARDUINO, 9600)
+    arduino = Arduino(PORT_ARDUINO)
 
     # Hardware objects
     left_servo = Servo(PIN_SERVO_LEFT)
@@ -3,14 +3,18 @@
 
 
 # PUBLIC LIBRARIES
-import time
 import math
 
 
 # PRIVATE LIBRARIES
 from pid import PID
-from encoder import Encoder
+from encoder import Encoder, EncoderGroup
+from hal import Hardware
+from rate import Rate
 from servo import Servo
+from tasks import CommandQueue
+from trajectory import MotionProfile
+from telemetry import Telemetry, INFO, DEBUG, MOVE_FORWARD, TURN
 
 
 class Drive:
@@ -26,6 +30,10 @@ class Drive:
         Left Encoder I2C address
     addr_encoder_right : int
         Right Encoder I2C address
+    hardware : Hardware
+        Hardware backend (real Pi by default, or sim.SimHardware)
+    telemetry : Telemetry
+        Control loop recorder and console log level (in-memory, INFO level by default)
     """
 
     # GENERAL PARAMETERS
@@ -46,26 +54,49 @@ class Drive:
     DIR_KI = 0.00
     DIR_KD = 0.00
     DIR_MAX_COMP = 0.3
+    POS_KP = 0.05                 # Speed correction per tick behind/ahead of the planned position
+    POS_KI = 0.00
+    POS_KD = 0.00
+    CONTROL_HZ = 50               # Speed update rate (fixed 20 ms period)
+
+    # MOTION PROFILE PARAMETERS
+    MAX_SPEED_TPS = 21.6          # [ticks/s] wheel speed at full servo speed (0.9 rev/s)
+    PROFILE_SPEED = 1 - DIR_MAX_COMP    # Cruise speed (fraction of full speed, leaves room for direction compensation)
+    PROFILE_ACCEL = 60.0          # [ticks/s^2] maximum acceleration
+    PROFILE_JERK = 600.0          # [ticks/s^3] maximum jerk (None = trapezoidal profile)
+    SETTLE_TIMEOUT = 0.5          # [s] time allowed after the profile ends to reach the target
 
 
     # CONSTRUCTOR
 
-    def __init__(self, pin_servo_left: int, pin_servo_right: int, addr_encoder_left: int, addr_encoder_right: int):
+    def __init__(self, pin_servo_left: int, pin_servo_right: int, addr_encoder_left: int, addr_encoder_right: int, hardware=None, telemetry=None):
+        self.hardware = hardware if hardware is not None else Hardware()
+        self.clock = self.hardware.clock
+        self.telemetry = telemetry if telemetry is not None else Telemetry(clock=self.clock)
+        self._call = 0          # move counter (telemetry)
+        self._last_move = None  # (source, target ticks, left sign, right sign) of the last move (telemetry)
         # Hardware control objects
-        self.servo_left  = Servo(pin_servo_left, 1)
+        self.servo_left  = Servo(pin_servo_left, 1, hardware=self.hardware)
         #     pulse_reverse = self.LEFT_PULSE_REVERSE,
         #     pulse_neutral = self.LEFT_PULSE_NEUTRAL,
         #     pulse_forward = self.LEFT_PULSE_FORWARD
         # )
-        self.servo_right = Servo(pin_servo_right, -1)
+        self.servo_right = Servo(pin_servo_right, -1, hardware=self.hardware)
         #     pulse_reverse = self.RIGHT_PULSE_REVERSE,
         #     pulse_neutral = self.RIGHT_PULSE_NEUTRAL,
         #     pulse_forward = self.RIGHT_PULSE_FORWARD
         # )
-        self.encoder_left = Encoder(addr_encoder_left, 1)
-        self.encoder_right = Encoder(addr_encoder_right, -1)
+        self.i2c = self.hardware.i2c()
+        self.encoder_left = Encoder(addr_encoder_left, 1, i2c=self.i2c, hardware=self.hardware)
+        self.encoder_right = Encoder(addr_encoder_right, -1, i2c=self.i2c, hardware=self.hardware)
+        # Single poller for both encoders (samples left/right at the same instant)
+        self.encoders = EncoderGroup([self.encoder_left, self.encoder_right])
         # Direction PID controller
-        self.dir_pid = PID(self.DIR_KP, self.DIR_KI, self.DIR_KD, -self.DIR_MAX_COMP, self.DIR_MAX_COMP)
+        self.dir_pid = PID(self.DIR_KP, self.DIR_KI, self.DIR_KD, -self.DIR_MAX_COMP, self.DIR_MAX_COMP, clock=self.clock)
+        # Position PID controller (tracks the planned motion profile)
+        self.pos_pid = PID(self.POS_KP, self.POS_KI, self.POS_KD, -1.0, 1.0, clock=self.clock)
+        # Motion command queue (for the *_async methods)
+        self.commands = CommandQueue(self.clock, "drive")
 
 
     # UTILITY METHODS
@@ -85,6 +116,16 @@ class Drive:
         arc_length = (math.pi * self.WHEEL_BASE_IN * angle) / 360.0
         # Convert arc length to ticks (reuse same formula as linear motion)
         return self._distance_to_ticks(arc_length)
+
+    def _record_rest(self):
+        """Record where the wheels came to rest after the last move (coasting included)."""
+        if self._last_move is None:
+            return
+        source, target_ticks, left_sign, right_sign = self._last_move
+        left_ticks, right_ticks = self.encoders.get_positions()
+        self.telemetry.record(source, self._call, target_ticks, left_ticks * left_sign, right_ticks * right_sign,
+                              0.0, 0.0, 0.0, None, None)
+        self._last_move = None
     
 
     # MOVEMENT METHODS
@@ -99,14 +140,7 @@ class Drive:
         """Set both servo's speed to zero and then wait 0.5 seconds for it to take effect"""
         self.servo_right.stop()
         self.servo_left.stop()
-        time.sleep(1)
-
-    def _ramp_up(self, end_speed: int, steps: int = 20):
-        for i in range(0, steps + 1):
-            speed = (i/steps) * end_speed
-            self._set_speed(speed, speed)
-            time.sleep(0.05)
-
+        self.clock.sleep(1)
 
     # PUBLIC METHODS
 
@@ -114,124 +148,128 @@ class Drive:
         """Start servo and encoder control threads"""
         self.servo_left.startup()
         self.servo_right.startup()
-        self.encoder_left.start()
-        self.encoder_right.start()
-        time.sleep(1) # wait for threads to start
+        self.encoders.start()
+        self.commands.start()
+        self.encoders.wait_started(1.0)     # positions are valid once the first sample is in
     
     def shutdown(self):
         """Stop servo and encoder control threads (join them to the main thread)"""
+        self.commands.stop()    # finish queued moves first
         self.servo_left.shutdown()
         self.servo_right.shutdown()
-        self.encoder_left.stop()
-        self.encoder_right.stop()
-        time.sleep(1) # wait for threads to join
+        self._record_rest()
+        self.encoders.stop()
+        self.clock.sleep(1) # wait for threads to join
 
-    def move_forward(self, distance_in: float):
-        """Move forward specified distance in inches"""
-        # Reset encoders
-        self.encoder_left.reset()
-        self.encoder_right.reset()
-        # Reset direction PID controller
+    def _follow_profile(self, source: int, target_ticks: int, left_sign: int, right_sign: int):
+        """
+        Drive both wheels target_ticks along a planned motion profile.
+        Positions are tracked as progress (ticks * sign) so forward moves and
+        turns share the same loop: left_sign/right_sign give each wheel's spin
+        direction. The speed command is the planned velocity (feed forward)
+        plus the position PID on the planned position, and the direction PID
+        keeps both wheels together.
+        """
+        # Reset encoders and controllers
+        self.encoders.reset()
         self.dir_pid.reset()
-        # Calculate ticks to reach distance
-        target_ticks = self._distance_to_ticks(distance_in)
-        # Determine direction
-        direction = 1 if distance_in > 0 else -1
-        print(f"Target ticks: {target_ticks}")
-        # servo speed variables
-        base_speed = 1 - self.DIR_MAX_COMP
-        left_speed = base_speed
-        right_speed = base_speed
-        # control loop
+        self.pos_pid.reset()
+        self._call += 1
+        self._last_move = (source, target_ticks, left_sign, right_sign)
+        self.telemetry.log(INFO, f"Target ticks: {target_ticks}")
+        # Plan position/velocity over time
+        profile = MotionProfile(target_ticks, self.PROFILE_SPEED * self.MAX_SPEED_TPS, self.PROFILE_ACCEL, self.PROFILE_JERK)
+        # servo speed variables (progress direction, None once stopped)
+        left_speed = right_speed = 0.0
+        # control loop (stop checks on every new encoder sample, speed updates on fixed deadlines)
+        start = self.clock.time()
+        rate = Rate(self.CONTROL_HZ, self.clock, start=start)
+        seq = self.encoders.get_sequence()
         while True:
-            # determine left and right wheel position difference
-            left_ticks = self.encoder_left.get_position()
-            right_ticks = self.encoder_right.get_position()
+            # determine left and right wheel progress and difference
+            left_ticks, right_ticks = self.encoders.get_positions()
+            left_ticks, right_ticks = left_ticks * left_sign, right_ticks * right_sign
             tick_diff = left_ticks - right_ticks
-            # compute left servo speed compensation
-            left_comp = self.dir_pid.update(target=0, current=tick_diff)
-            # stop either servo if they have reached the target position
+            # stop either servo if it has reached the target position
             if (abs(left_ticks - target_ticks) <= 1) and (left_speed is not None):
-                print("Stopping LEFT servo...")
+                self.telemetry.log(INFO, "Stopping LEFT servo...")
                 self.servo_left.stop() # left servo reached target
                 left_speed = None
             if (abs(right_ticks - target_ticks) <= 1 and (right_speed is not None)):
-                print("Stopping RIGHT servo...")
+                self.telemetry.log(INFO, "Stopping RIGHT servo...")
                 self.servo_right.stop() # right servo reached target
                 right_speed = None
-            # Debug
-            print(f"Comp: {left_comp}\tLt: {left_ticks}\tRt: {right_ticks}\tDt: {tick_diff}\tLs: {left_speed}\tRs: {right_speed}\tDir: {direction}")
+            # give up on a wheel that cannot reach the target after the profile ended
+            elapsed = self.clock.time() - start
+            if elapsed > profile.duration + self.SETTLE_TIMEOUT and (left_speed is not None or right_speed is not None):
+                self.telemetry.log(INFO, "Settle timeout, stopping servos...")
+                self.servo_left.stop()
+                self.servo_right.stop()
+                left_speed = right_speed = None
             # break condition
-            if (left_speed is None) and (right_speed is None): 
+            if (left_speed is None) and (right_speed is None):
+                self.telemetry.record(source, self._call, target_ticks, left_ticks, right_ticks,
+                                      self.pos_pid.p, self.pos_pid.i, self.pos_pid.d, left_speed, right_speed)
                 break
-            # compensate left and right speeds if both servos are still running
-            if (left_speed is not None) and (right_speed is not None):
-                if direction == 1:        
-                    left_speed  = base_speed + left_comp
-                    right_speed = base_speed - left_comp
-                else:
-                    left_speed  = -base_speed + left_comp
-                    right_speed = -base_speed - left_comp
+            # wait for new ticks until the next control deadline
+            if rate.remaining() > 0:
+                seq = self.encoders.wait_for_update(seq, timeout=rate.remaining())
+                continue
+            rate.tick()
+            # planned position and velocity
+            plan_pos, plan_vel = profile.sample(elapsed)
+            # speed along the path: feed forward + position correction
+            base_speed = plan_vel / self.MAX_SPEED_TPS + self.pos_pid.update(plan_pos, (left_ticks + right_ticks) / 2)
+            # compute left servo speed compensation (only while both servos are running)
+            left_comp = self.dir_pid.update(target=0, current=tick_diff)
+            if (left_speed is None) or (right_speed is None):
+                left_comp = 0.0
+            # Debug (console output is slow, telemetry has the same numbers)
+            if self.telemetry.level >= DEBUG:
+                print(f"Plan: {plan_pos:.1f}\tComp: {left_comp}\tLt: {left_ticks}\tRt: {right_ticks}\tDt: {tick_diff}\tLs: {left_speed}\tRs: {right_speed}")
             # update left servo speed (if still running)
             if left_speed is not None:
-                self.servo_left.set_speed(left_speed)
+                left_speed = base_speed + left_comp
+                self.servo_left.set_speed(left_speed * left_sign)
             # update right servo speed (if still running)
             if right_speed is not None:
-                self.servo_right.set_speed(right_speed)
-            time.sleep(0.02) # 50 Hz control loop
-        print("TARGET REACHED")
+                right_speed = base_speed - left_comp
+                self.servo_right.set_speed(right_speed * right_sign)
+            # record the cycle (numbers only, decoded off-line)
+            self.telemetry.record(source, self._call, target_ticks, left_ticks, right_ticks,
+                                  self.pos_pid.p, self.pos_pid.i, self.pos_pid.d, left_speed, right_speed)
+        self.telemetry.log(INFO, f"Control loop: {rate.stats}")
+
+    def move_forward(self, distance_in: float):
+        """Move forward specified distance in inches"""
+        self._record_rest()
+        # Calculate ticks to reach distance
+        target_ticks = self._distance_to_ticks(distance_in)
+        # Determine direction
+        direction = 1 if distance_in > 0 else -1
+        # Both wheels spin in the direction of travel
+        self._follow_profile(MOVE_FORWARD, abs(target_ticks), direction, direction)
+        self.telemetry.log(INFO, "TARGET REACHED")
 
     def turn(self, angle_deg: float):
         """Turn robot by specified angle in degrees."""
-        # Reset encoders
-        self.encoder_left.reset()
-        self.encoder_right.reset()
-        # Reset direction PID controller
-        self.dir_pid.reset()
+        self._record_rest()
         # Calculate ticks to reach distance
         target_ticks = self._angle_to_ticks(angle_deg)
         # Determine direction
         direction = 1 if angle_deg > 0 else -1
-        print(f"Target ticks: {target_ticks}")
-        # servo speed variables (based on direction)
-        base_speed = 1 - self.DIR_MAX_COMP
-        left_speed  =  base_speed * direction
-        right_speed = -base_speed * direction
-        # control loop
-        while True:
-            # determine left and right wheel position difference
-            left_ticks = abs(self.encoder_left.get_position())
-            right_ticks = abs(self.encoder_right.get_position())
-            tick_diff = left_ticks - right_ticks
-            # compute left servo speed compensation
-            left_comp = self.dir_pid.update(target=0, current=tick_diff)
-            # stop either servo if they have reached the target position
-            if (abs(left_ticks - target_ticks) <= 1) and (left_speed is not None):
-                print("Stopping LEFT servo...")
-                self.servo_left.stop() # left servo reached target
-                left_speed = None
-            if (abs(right_ticks - target_ticks) <= 1 and (right_speed is not None)):
-                print("Stopping RIGHT servo...")
-                self.servo_right.stop() # right servo reached target
-                right_speed = None
-            # Debug
-            print(f"Comp: {left_comp}\tLt: {left_ticks}\tRt: {right_ticks}\tDt: {tick_diff}\tLs: {left_speed}\tRs: {right_speed}\tDir: {direction}")
-            # break condition
-            if (left_speed is None) and (right_speed is None): 
-                break
-            # compensate left and right speeds if both servos are still running
-            if (left_speed is not None) and (right_speed is not None):
-                if direction == 1:
-                    left_speed  = base_speed + left_comp
-                    right_speed = (base_speed - left_comp) * -1
-                else:
-                    left_speed  = (base_speed + left_comp) * -1
-                    right_speed = base_speed - left_comp
-            # update left servo speed (if still running)
-            if left_speed is not None:
-                self.servo_left.set_speed(left_speed)
-            # update right servo speed (if still running)
-            if right_speed is not None:
-                self.servo_right.set_speed(right_speed)
-            time.sleep(0.02) # 50 Hz control loop
-        print("TURN COMPLETED")
+        # Wheels spin in opposite directions
+        self._follow_profile(TURN, target_ticks, direction, -direction)
+        self.telemetry.log(INFO, "TURN COMPLETED")
+
+    def move_forward_async(self, distance_in: float):
+        """Queue move_forward and return right away. Returns a Task (task.wait() / task.result())."""
+        return self.commands.submit(self.move_forward, distance_in)
+
+    def turn_async(self, angle_deg: float):
+        """Queue turn and return right away. Returns a Task (task.wait() / task.result())."""
+        return self.commands.submit(self.turn, angle_deg)
+
+    def wait_idle(self, timeout: float = None):
+        """Block until every queued move has finished."""
+        return self.commands.wait_idle(timeout)
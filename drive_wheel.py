@@ -3,7 +3,6 @@
 
 
 # PUBLIC LIBRARIES
-import time
 import threading
 
 
@@ -11,10 +10,9 @@ import threading
 from pid import PID
 from encoder import Encoder
 from servo import Servo
-
-
-
-
+from hal import Hardware
+from rate import PeriodicTask
+from telemetry import Telemetry, DEBUG, WHEEL_LEFT, WHEEL_RIGHT
 
 
 class DriveWheel:
@@ -39,6 +37,14 @@ class DriveWheel:
         Derivative (D) gain coefficient
     rate_hz : int
         Update rate in Hz
+    cpu : int
+        Optional CPU core for the control thread
+    priority : int
+        Optional real-time (SCHED_FIFO) priority for the control thread
+    hardware : Hardware
+        Hardware backend (real Pi by default, or sim.SimHardware)
+    telemetry : Telemetry
+        Control loop recorder and console log level (in-memory, INFO level by default)
     """
 
     # CONSTANTS
@@ -51,21 +57,23 @@ class DriveWheel:
 
     # CONSTRUCTOR
 
-    def __init__(self, servo_pin: int, encoder_addr: int, direction=1, kp=0.5, ki=0.0, kd=0.0, rate_hz=100):
+    def __init__(self, servo_pin: int, encoder_addr: int, direction=1, kp=0.5, ki=0.0, kd=0.0, rate_hz=100, cpu=None, priority=None, hardware=None, telemetry=None):
+        self.hardware = hardware if hardware is not None else Hardware()
+        self.clock = self.hardware.clock
+        self.telemetry = telemetry if telemetry is not None else Telemetry(clock=self.clock)
         # Hardware control objects
-        self.servo = Servo(servo_pin, direction)
-        self.encoder = Encoder(encoder_addr, direction)
+        self.servo = Servo(servo_pin, direction, hardware=self.hardware)
+        self.encoder = Encoder(encoder_addr, direction, hardware=self.hardware)
         # Forward Spin Direction
         self.direction = direction
         # PID controller
-        self.pid = PID(kp, ki, kd, -1.0, 1.0)
+        self.pid = PID(kp, ki, kd, -1.0, 1.0, clock=self.clock)
         # Control state
         self.target_position = 0
         self.target_reached = False
         self.rate_hz = rate_hz
-        # Threading
-        self._running = False
-        self._thread = None
+        # Threading (control loop runs on absolute deadlines)
+        self._task = PeriodicTask(self._control_step, rate_hz, self.clock, cpu, priority)
         self._lock = threading.Lock()
 
 
@@ -73,14 +81,10 @@ class DriveWheel:
 
     def start(self):
         self.encoder.start()
-        self._running = True
-        self._thread = threading.Thread(target=self._control_loop, daemon=True)
-        self._thread.start()
+        self._task.start()
 
     def stop(self):
-        self._running = False
-        if self._thread:
-            self._thread.join()
+        self._task.stop()
         self.servo.stop()
         self.encoder.stop()
 
@@ -106,43 +110,52 @@ class DriveWheel:
     def is_target_reached(self):
         return self.target_reached
 
+    def get_loop_stats(self):
+        """Returns timing statistics (jitter/overruns) of the control loop."""
+        return self._task.stats
+
 
     # INTERNAL CONTROL LOOP
 
-    def _control_loop(self):
-        period = 1.0 / self.rate_hz
-        while self._running:
-            # Read encoder
-            current_pos = self.encoder.get_position()
-            # Get target safely
-            with self._lock:
-                target = self.target_position
-            # Compute PID speed command
-            speed_cmd = self.pid.update(target, current_pos)
-            # If this is the left wheel (positive direction)
-            if self.direction == 1:
-                # Slow down left wheel slightly to match right wheel speed
-                speed_cmd = speed_cmd * self.LEFT_SLOW_FACTOR
-            # # Determine if servo is moving counter-clockwise (forward direction)
-            # forward = (
-            #     (self.direction == 1 and speed_cmd >= 0) or     # left wheel forward
-            #     (self.direction == -1 and speed_cmd < 0)        # right wheel forward
-            # )
-            # # If turning counter-clockwise (forward)
-            # if forward:
-            #     # Reduce speed command (slow down) by factor to match reverse scale 
-            #     speed_cmd = speed_cmd * self.FW_SLOW_FACTOR
-            # If error is within 1 encoder tick -> target reached
-            if abs(target - current_pos) < 1.0:
-                self.target_reached = True
-                # Stop servo (error is as small as possible)
-                self.servo.set_speed(0.0)
+    def _control_step(self):
+        """One control cycle (called every period by the PeriodicTask)."""
+        # Read encoder
+        current_pos = self.encoder.get_position()
+        # Get target safely
+        with self._lock:
+            target = self.target_position
+        # Compute PID speed command
+        speed_cmd = self.pid.update(target, current_pos)
+        # If this is the left wheel (positive direction)
+        if self.direction == 1:
+            # Slow down left wheel slightly to match right wheel speed
+            speed_cmd = speed_cmd * self.LEFT_SLOW_FACTOR
+        # # Determine if servo is moving counter-clockwise (forward direction)
+        # forward = (
+        #     (self.direction == 1 and speed_cmd >= 0) or     # left wheel forward
+        #     (self.direction == -1 and speed_cmd < 0)        # right wheel forward
+        # )
+        # # If turning counter-clockwise (forward)
+        # if forward:
+        #     # Reduce speed command (slow down) by factor to match reverse scale 
+        #     speed_cmd = speed_cmd * self.FW_SLOW_FACTOR
+        # If error is within 1 encoder tick -> target reached
+        if abs(target - current_pos) < 1.0:
+            self.target_reached = True
+            # Stop servo (error is as small as possible)
+            speed_cmd = 0.0
+            self.servo.set_speed(0.0)
+            if self.telemetry.level >= DEBUG:
                 print(f"{'L' if self.direction == 1 else 'R'}:\ttarget: reached")
-            # Otherwise keep trying to reduce error (reach target)
-            else:
-                self.target_reached = False
-                # Set servo speed
-                self.servo.set_speed(speed_cmd)
+        # Otherwise keep trying to reduce error (reach target)
+        else:
+            self.target_reached = False
+            # Set servo speed
+            self.servo.set_speed(speed_cmd)
+            if self.telemetry.level >= DEBUG:
                 print(f"{'L' if self.direction == 1 else 'R'}:\ttarget: {target}\tposition: {current_pos}\tspeed: {speed_cmd * self.direction}\t")
-            # Wait for next cycle
-            time.sleep(period)
\ No newline at end of file
+        # Record the cycle (the wheel's own ticks/speed go in its side's fields)
+        if self.direction == 1:
+            self.telemetry.record(WHEEL_LEFT, 0, target, current_pos, 0, self.pid.p, self.pid.i, self.pid.d, speed_cmd, None)
+        else:
+            self.telemetry.record(WHEEL_RIGHT, 0, target, 0, current_pos, self.pid.p, self.pid.i, self.pid.d, None, speed_cmd)
\ No newline at end of file
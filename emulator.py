@@ -0,0 +1,190 @@
+# Arduino Emulator
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import argparse
+import os
+import pty
+import select
+import statistics
+import sys
+import threading
+import time
+import tty
+
+
+# PRIVATE LIBRARIES
+import arduino
+from arduino import Arduino
+from clock import MonotonicClock
+from hal import Hardware
+from sim import SimArduino
+
+
+class ArduinoEmulator:
+    """
+    Pseudo-terminal stand-in for the Arduino board.
+    Runs the firmware model (sim.SimArduino: same frames, job table and
+    timing as arduino/program/program.ino) in real time behind a pty, so
+    arduino.Arduino talks to it through pyserial like to /dev/ttyACM0.
+    Opening the port resets the emulated board like the DTR line does on
+    the real one ("Arduino ready" after the bootloader delay).
+    Parameters:
+    ----------
+    baudrate : int
+        Emulated serial line speed (each byte takes 10 bit times, in both directions)
+    """
+
+    # CONSTANTS
+
+    POLL = 0.01     # [s] time between checks while no program has the port open
+
+
+    # CONSTRUCTOR
+
+    def __init__(self, baudrate: int = arduino.BAUDRATE):
+        self.baudrate = baudrate
+        self.clock = MonotonicClock()
+        self.firmware = SimArduino(self.clock, baudrate)
+        self.port = None
+        self._master = None
+        self._running = False
+        self._thread = None
+
+
+    # PUBLIC METHODS
+
+    def start(self):
+        """Create the pty and start serving it. Returns the port path to open."""
+        self._master, slave = pty.openpty()
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+        os.close(slave)     # the port counts as closed until a program opens it
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        """Stop serving and remove the pty."""
+        self._running = False
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._master is not None:
+            os.close(self._master)
+            self._master = None
+
+
+    # PRIVATE METHODS
+
+    def _serve(self):
+        poller = select.poll()
+        poller.register(self._master, select.POLLIN)
+        connected = False
+        while self._running:
+            next_time = self.firmware.next_output_time()
+            wait = self.POLL if next_time is None else min(self.POLL, max(0.0, next_time - self.clock.time()))
+            events = dict(poller.poll(wait * 1000))
+            mask = events.get(self._master, 0)
+            if mask & select.POLLHUP:
+                connected = False
+                time.sleep(self.POLL)
+                continue
+            if not connected:
+                connected = True
+                self.firmware.boot()    # port opened: DTR resets the board
+            if mask & select.POLLIN:
+                data = os.read(self._master, 4096)
+                self.firmware.receive(data, self.clock.time())
+            while True:
+                data = self.firmware.pop_output(self.clock.time())
+                if data is None:
+                    break
+                os.write(self._master, data)
+
+
+# BENCHMARK
+
+def benchmark(port: str, count: int = 1000, window: int = 64):
+    """
+    Measure the Arduino driver through a serial port (emulator or board).
+    Returns a dict with:
+        latency     [s] round trip of each ping sent on its own (sorted)
+        motor       [s] round trip of each untimed motor frame (sorted)
+        throughput  [frames/s] pings with up to window frames in flight
+    """
+    link = Arduino(port, hardware=Hardware())
+    try:
+        results = {}
+        for name, send in (("latency", link.ping), ("motor", lambda: link.motor(1, 0))):
+            times = []
+            for _ in range(count):
+                start = time.perf_counter()
+                send().result(timeout=1.0)
+                times.append(time.perf_counter() - start)
+            results[name] = sorted(times)
+        # Keep the window well below the 256 sequence numbers
+        start = time.perf_counter()
+        in_flight = []
+        for _ in range(count):
+            if len(in_flight) >= window:
+                in_flight.pop(0).result(timeout=1.0)
+            in_flight.append(link.ping())
+        for task in in_flight:
+            task.result(timeout=1.0)
+        results["throughput"] = count / (time.perf_counter() - start)
+    finally:
+        link.close()
+    return results
+
+
+def report(results: dict):
+    """Print benchmark results."""
+    for name in ("latency", "motor"):
+        times = results[name]
+        p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+        print(f"{name:>10}: min {times[0] * 1000:.3f} ms  median {statistics.median(times) * 1000:.3f} ms"
+              f"  p99 {p99 * 1000:.3f} ms  max {times[-1] * 1000:.3f} ms")
+    frames = results["throughput"]
+    print(f"throughput: {frames:.0f} frames/s ({frames * arduino.COMMAND_FRAME.size:.0f} B/s sent)")
+
+
+def main(argv=None):
+    """
+    python3 emulator.py serve
+    python3 emulator.py bench [--port /dev/ttyACM0] [--count 1000]
+    """
+    parser = argparse.ArgumentParser(description="Emulate the Arduino on a pty or benchmark the Arduino link.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("serve", help="run the emulator until Ctrl-C")
+    bench = commands.add_parser("bench", help="round trip latency and throughput through arduino.Arduino")
+    bench.add_argument("--port", help="serial port of a real board (default: start an emulator)")
+    bench.add_argument("--count", type=int, default=1000, help="frames per measurement")
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        emulator = ArduinoEmulator()
+        print(f"Arduino emulator on {emulator.start()}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        emulator.stop()
+    else:
+        emulator = None
+        port = args.port
+        if port is None:
+            emulator = ArduinoEmulator()
+            port = emulator.start()
+        print(f"Benchmarking {port} ({args.count} frames per measurement)...")
+        report(benchmark(port, args.count))
+        if emulator:
+            emulator.stop()
+    return 0
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,11 +3,11 @@
 
 
 # PUBLIC LIBRARIES
-import time
 import threading
-import board
-import busio
-from adafruit_seesaw import seesaw, rotaryio
+
+
+# PRIVATE LIBRARIES
+from hal import Hardware, I2CBus
 
 
 class Encoder:
@@ -17,8 +17,9 @@ class Encoder:
       - position (counts)
       - velocity (counts/sec)
       - optional threaded polling
+      - change notifications (wait_for_update / subscribe)
     """
-    
+
     # CONSTANTS
 
     TICKS_PER_REV = 24      # Ticks per full revolution
@@ -28,11 +29,13 @@ class Encoder:
 
     # CONSTRUCTOR
 
-    def __init__(self, address: int = DEFAULT_ADDR, direction: int = 1, rate_hz: int = DEFAULT_RATE_HZ):
-        # Allow user to pass an I2C bus or create one
-        self.i2c = busio.I2C(board.SCL, board.SDA)
-        self.ss = seesaw.Seesaw(self.i2c, addr=address)
-        self.encoder = rotaryio.IncrementalEncoder(self.ss)
+    def __init__(self, address: int = DEFAULT_ADDR, direction: int = 1, rate_hz: int = DEFAULT_RATE_HZ, i2c=None, hardware=None, clock=None):
+        # Hardware backend (real Pi by default)
+        self.hardware = hardware if hardware is not None else Hardware()
+        self.clock = clock if clock is not None else self.hardware.clock
+        # Allow user to pass an I2C bus or use the shared one
+        self.i2c = i2c if i2c is not None else self.hardware.i2c()
+        self.encoder = self.hardware.encoder(address, self.i2c)
 
         # Forward Spin Direction
         self.direction = direction
@@ -45,11 +48,15 @@ class Encoder:
         # Data
         self._position = 0
         self._velocity = 0.0
+        self._timestamp = self.clock.time()
         self._last_position = 0
-        self._last_time = time.time()
+        self._last_time = self.clock.time()
+        self._seq = 0                   # incremented every time the position changes
+        self._subscribers = []
 
-        # Lock for thread-safe access
+        # Lock for thread-safe access (and notification of new positions)
         self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
 
 
     # PUBLIC METHODS
@@ -59,24 +66,24 @@ class Encoder:
         if not self._running:
             self._running = True
             self._thread = threading.Thread(target=self._update_loop, daemon=True)
+            self.clock.register(self._thread)
             self._thread.start()
 
     def stop(self):
         """Stop background thread."""
         self._running = False
         if self._thread:
-            self._thread.join(timeout=0.5)
+            self.clock.join(self._thread, timeout=0.5)
 
     def reset(self):
         """Reset position to zero."""
-        with self._lock:
+        with I2CBus.lock, self._lock:
             # Seesaw allows writing a new position
             self.encoder.position = 0
             self._position = 0
             self._velocity = 0.0
             self._last_position = 0
-            self._last_time = time.time()
-        print("ENCODER RESET")
+            self._last_time = self.clock.time()
 
     def get_position(self):
         """Returns encoder count (thread-safe)."""
@@ -88,29 +95,222 @@ class Encoder:
         with self._lock:
             return self._velocity
 
+    def get_timestamp(self):
+        """Returns the time the current position was sampled."""
+        with self._lock:
+            return self._timestamp
+
+    def get_sequence(self):
+        """Returns the change counter (incremented on every new position)."""
+        with self._lock:
+            return self._seq
+
+    def wait_for_update(self, seq: int, timeout: float = None):
+        """Block until the position changes after sequence number seq. Returns the new sequence number."""
+        with self._cond:
+            self.clock.wait_for(self._cond, lambda: self._seq != seq, timeout)
+            return self._seq
+
+    def subscribe(self, callback):
+        """Call callback(position, timestamp) from the polling thread on every change."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Remove a callback added with subscribe()."""
+        self._subscribers.remove(callback)
+
 
     # PRIVATE METHODS
 
+    def _read(self):
+        """Read the raw position from the seesaw (in forward direction counts)."""
+        return self.encoder.position * self.direction
+
+    def _publish(self, pos, now):
+        """Store a new position sample taken at time now (notify listeners if it changed)."""
+        with self._cond:
+            changed = pos != self._position
+            dt = now - self._last_time
+            dp = pos - self._last_position
+            self._velocity = dp / dt if dt > 1e-6 else 0.0
+            self._position = pos
+            self._timestamp = now
+            self._last_position = pos
+            self._last_time = now
+            if changed:
+                self._seq += 1
+                self.clock.notify_all(self._cond)
+        if changed:
+            for callback in list(self._subscribers):
+                callback(pos, now)
+        return changed
+
     def _update_loop(self):
         period = 1.0 / self.rate_hz
 
         # Initialize last values
-        self._last_position = self.encoder.position
-        self._last_time = time.time()
+        with I2CBus.lock:
+            self._last_position = self._read()
+        self._last_time = self.clock.time()
 
         while self._running:
-            now = time.time()
-            pos = self.encoder.position * self.direction
+            now = self.clock.time()
+            with I2CBus.lock:
+                pos = self._read()
+            self._publish(pos, now)
+            self.clock.sleep(period)
 
-            dt = now - self._last_time
-            dp = pos - self._last_position
 
-            vel = dp / dt if dt > 1e-6 else 0.0
+class EncoderGroup:
+    """
+    Polls several encoders on the shared I2C bus from a single thread.
+    Every cycle reads all encoders back-to-back and publishes their
+    positions with one common timestamp. While nothing moves and nobody is
+    waiting for an update, polling drops to IDLE_RATE_HZ to save CPU.
+    Parameters:
+    ----------
+    encoders : list[Encoder]
+        Encoders to poll (in the order positions are returned)
+    rate_hz : int
+        Polling frequency in Hz
+    clock : Clock
+        Time source (defaults to the first encoder's clock)
+    """
 
-            with self._lock:
-                self._position = pos
-                self._velocity = vel
+    # CONSTANTS
 
-            self._last_position = pos
-            self._last_time = now
-            time.sleep(period)
\ No newline at end of file
+    IDLE_RATE_HZ = 20       # polling frequency while idle
+    IDLE_CYCLES = 50        # unchanged samples before polling slows down
+
+
+    # CONSTRUCTOR
+
+    def __init__(self, encoders, rate_hz: int = Encoder.DEFAULT_RATE_HZ, clock=None):
+        self.encoders = list(encoders)
+        self.rate_hz = rate_hz
+        self.clock = clock if clock is not None else self.encoders[0].clock
+        # Thread state
+        self._running = False
+        self._thread = None
+        # Latest snapshot
+        self._positions = tuple(0 for _ in self.encoders)
+        self._timestamp = self.clock.time()
+        self._seq = 0
+        self._waiters = 0
+        self._started = False       # first sample taken
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+
+
+    # PUBLIC METHODS
+
+    def start(self):
+        """Start the shared polling thread."""
+        if not self._running:
+            self._running = True
+            self._started = False
+            self._thread = threading.Thread(target=self._update_loop, daemon=True)
+            self.clock.register(self._thread)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the shared polling thread."""
+        self._running = False
+        if self._thread:
+            self.clock.join(self._thread, timeout=0.5)
+
+    def wait_started(self, timeout: float = None):
+        """Block until the polling thread has taken its first sample. Returns False on timeout."""
+        with self._cond:
+            return self.clock.wait_for(self._cond, lambda: self._started, timeout)
+
+    def reset(self):
+        """Reset every encoder in the group to zero."""
+        # Hold the bus like _sample does, so no sample read before the reset is published after it
+        with I2CBus.lock:
+            for enc in self.encoders:
+                enc.reset()
+            with self._cond:
+                self._positions = tuple(0 for _ in self.encoders)
+                self._seq += 1
+                self.clock.notify_all(self._cond)
+
+    def get_positions(self):
+        """Returns the positions of all encoders from the same sample."""
+        with self._lock:
+            return self._positions
+
+    def get_snapshot(self):
+        """Returns (positions, timestamp) of the latest sample."""
+        with self._lock:
+            return self._positions, self._timestamp
+
+    def get_sequence(self):
+        """Returns the change counter (incremented whenever any position changes)."""
+        with self._lock:
+            return self._seq
+
+    def wait_for_update(self, seq: int, timeout: float = None):
+        """Block until any position changes after sequence number seq. Returns the new sequence number."""
+        with self._cond:
+            self._waiters += 1
+            self.clock.notify_all(self._cond)   # wake the poller if it is idling
+            try:
+                self.clock.wait_for(self._cond, lambda: self._seq != seq, timeout)
+            finally:
+                self._waiters -= 1
+            return self._seq
+
+    def subscribe(self, callback):
+        """Call callback(positions, timestamp) from the polling thread on every change."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Remove a callback added with subscribe()."""
+        self._subscribers.remove(callback)
+
+
+    # PRIVATE METHODS
+
+    def _sample(self):
+        """
+        Read all encoders back-to-back and publish them together.
+        Returns True while the group is active (a position changed or someone is waiting).
+        """
+        # Read and publish under the bus lock, so a reset() happens before or after the whole sample
+        with I2CBus.lock:
+            now = self.clock.time()
+            positions = tuple(enc._read() for enc in self.encoders)
+            for enc, pos in zip(self.encoders, positions):
+                enc._publish(pos, now)
+            with self._cond:
+                changed = positions != self._positions
+                self._positions = positions
+                self._timestamp = now
+                if changed:
+                    self._seq += 1
+                    self.clock.notify_all(self._cond)
+                waiting = self._waiters > 0
+        if changed:
+            for callback in list(self._subscribers):
+                callback(positions, now)
+        return changed or waiting
+
+    def _update_loop(self):
+        period = 1.0 / self.rate_hz
+        idle_period = 1.0 / self.IDLE_RATE_HZ
+        idle_cycles = 0
+        # Initialize last values
+        self._sample()
+        with self._cond:
+            self._started = True
+            self.clock.notify_all(self._cond)
+        while self._running:
+            if idle_cycles < self.IDLE_CYCLES:
+                self.clock.sleep(period)
+            else:
+                # Idle: poll slowly until a consumer starts waiting for updates
+                with self._cond:
+                    self.clock.wait_for(self._cond, lambda: self._waiters > 0, idle_period)
+            idle_cycles = 0 if self._sample() else idle_cycles + 1
@@ -0,0 +1,171 @@
+# Drone Pose Estimator Library
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import math
+import threading
+import numpy as np
+
+
+# PRIVATE LIBRARIES
+from vision import IMAGE_HEIGHT, IMAGE_WIDTH, Target
+
+
+# STATE (x, y, yaw, scale) and their rates; scale is the front LED spacing [px]
+X, Y, YAW, SCALE = range(4)
+DIM = 4
+
+
+def wrap(angle: float):
+    """Angle in [-180, 180) [deg]."""
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+class PoseFilter:
+    """
+    Constant-velocity Kalman filter over the drone's image pose (x, y, yaw,
+    scale) fed by LED detections.
+    estimate(t) predicts the pose at any time, so a controller can run at
+    its own fixed rate between camera frames. Missed detections are
+    coasted through for up to max_coast seconds. Measurements further than
+    the gate (Mahalanobis distance, squared) from the prediction are
+    rejected as outliers; after max_rejects of them in a row the filter
+    restarts from the new measurement (the drone really moved).
+    Parameters:
+    ----------
+    width, height : int
+        Camera image size [px] (for the Target offsets and distance)
+    max_coast : float
+        Time without an accepted measurement before the estimate is dropped [s]
+    gate : float
+        Squared Mahalanobis distance above which a measurement is an outlier
+    max_rejects : int
+        Outliers in a row before the filter restarts
+    """
+
+    # CONSTANTS
+
+    MEASUREMENT_STD = (2.0, 2.0, 3.0, 1.0)          # [px, px, deg, px] detection noise
+    ACCELERATION_STD = (300.0, 300.0, 180.0, 30.0)  # [unit/s^2] unmodeled motion
+    INITIAL_VELOCITY_STD = (200.0, 200.0, 90.0, 20.0)
+    MAX_COAST = 0.3         # [s]
+    GATE = 18.5             # chi-square, 4 dof, 99.9%
+    MAX_REJECTS = 3
+
+
+    # CONSTRUCTOR
+
+    def __init__(self, width: int = IMAGE_WIDTH, height: int = IMAGE_HEIGHT, max_coast: float = MAX_COAST,
+                 gate: float = GATE, max_rejects: int = MAX_REJECTS):
+        self.width = width
+        self.height = height
+        self.max_coast = max_coast
+        self.gate = gate
+        self.max_rejects = max_rejects
+        self.R = np.diag(np.square(self.MEASUREMENT_STD))
+        self.H = np.hstack((np.eye(DIM), np.zeros((DIM, DIM))))
+        # Counters
+        self.accepted = 0
+        self.rejected = 0
+        self.missed = 0
+        self.restarts = 0
+        # Filter state
+        self._x = None              # [x, y, yaw, scale, vx, vy, vyaw, vscale]
+        self._P = None
+        self._time = None           # [s] time of the state
+        self._last_measurement = None
+        self._rejects = 0
+        self._lock = threading.Lock()
+
+
+    # PUBLIC METHODS
+
+    def update(self, t: float, target: Target = None):
+        """Add the detection of a frame captured at t (None = not found). Returns True if it was used."""
+        with self._lock:
+            if target is None:
+                self.missed += 1
+                return False
+            z = np.array([target.x, target.y, target.yaw, target.pixel_width])
+            if self._x is None or not self._tracking(t):
+                self._start(t, z)
+                return True
+            x, P = self._predict(t)
+            innovation = z - self.H @ x
+            innovation[YAW] = wrap(innovation[YAW])
+            S = self.H @ P @ self.H.T + self.R
+            if innovation @ np.linalg.solve(S, innovation) > self.gate:
+                self._rejects += 1
+                if self._rejects >= self.max_rejects:
+                    self.restarts += 1
+                    self._start(t, z)
+                    return True
+                self.rejected += 1
+                return False
+            K = P @ self.H.T @ np.linalg.inv(S)
+            self._x = x + K @ innovation
+            self._x[YAW] = wrap(self._x[YAW])
+            self._P = (np.eye(2 * DIM) - K @ self.H) @ P
+            self._time = max(t, self._time)
+            self._last_measurement = t
+            self._rejects = 0
+            self.accepted += 1
+            return True
+
+    def estimate(self, t: float):
+        """Predicted Target at time t, or None if there is no track (never seen or coasted too long)."""
+        with self._lock:
+            if self._x is None or not self._tracking(t):
+                return None
+            x, _ = self._predict(t)
+        scale = max(x[SCALE], 1.0)
+        return Target.from_pose(x[X], x[Y], wrap(x[YAW]), scale, self.width, self.height)
+
+    def velocity(self):
+        """Estimated (vx, vy, vyaw, vscale) [unit/s] of the last update."""
+        with self._lock:
+            return None if self._x is None else tuple(self._x[DIM:])
+
+    def age(self, t: float):
+        """Time since the last accepted measurement [s] (inf if none)."""
+        with self._lock:
+            return math.inf if self._last_measurement is None else t - self._last_measurement
+
+    def reset(self):
+        """Forget the track."""
+        with self._lock:
+            self._x = self._P = self._time = self._last_measurement = None
+            self._rejects = 0
+
+    def report(self):
+        """Print how many detections were used, rejected or missing."""
+        print(f"Pose filter: {self.accepted} accepted | {self.rejected} outliers | "
+              f"{self.missed} missed | {self.restarts} restarts")
+
+
+    # PRIVATE METHODS
+
+    def _tracking(self, t: float):
+        return t - self._last_measurement <= self.max_coast
+
+    def _start(self, t: float, z: np.ndarray):
+        """Start a track at measurement z with unknown velocity."""
+        self._x = np.concatenate((z, np.zeros(DIM)))
+        self._P = np.diag(np.concatenate((np.square(self.MEASUREMENT_STD), np.square(self.INITIAL_VELOCITY_STD))))
+        self._time = t
+        self._last_measurement = t
+        self._rejects = 0
+
+    def _predict(self, t: float):
+        """State and covariance moved to time t (not stored)."""
+        dt = max(0.0, t - self._time)
+        F = np.eye(2 * DIM)
+        F[:DIM, DIM:] = dt * np.eye(DIM)
+        # White-noise acceleration for each coordinate
+        q = np.square(self.ACCELERATION_STD)
+        Q = np.zeros((2 * DIM, 2 * DIM))
+        Q[:DIM, :DIM] = np.diag(q * dt ** 4 / 4)
+        Q[:DIM, DIM:] = Q[DIM:, :DIM] = np.diag(q * dt ** 3 / 2)
+        Q[DIM:, DIM:] = np.diag(q * dt ** 2)
+        return F @ self._x, F @ self._P @ F.T + Q
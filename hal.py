@@ -0,0 +1,347 @@
+# Hardware Abstraction Layer
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import os
+import threading
+import time
+
+
+# PRIVATE LIBRARIES
+from clock import MonotonicClock
+
+
+# Every driver (Servo, Encoder, Arduino) asks a hardware object for its
+# low level device instead of importing the Pi libraries itself:
+#
+#   hardware.clock                  -> clock used by every control loop (see clock.py)
+#   hardware.pwm(pin, chip)         -> object with open(), set_pulse(on_us, period_us), close()
+#                                      (the pulse train keeps running until set_pulse is called again)
+#   hardware.i2c()                  -> shared I2C bus (or None if not needed)
+#   hardware.encoder(address, i2c)  -> object with a read/write `position` attribute
+#   hardware.serial(port, baudrate, timeout, reset)
+#                                   -> object with write(), read(), readline(), in_waiting, close()
+#                                      (reset=False keeps DTR low so opening the port does not reset an Arduino)
+#   hardware.prepare_start(trigger) -> start the start light detector of a trigger (optional warm start)
+#   hardware.wait_for_start(trigger, timeout)
+#                                   -> block until the start light flashes (START_CAMERA or START_SENSOR;
+#                                      the sensor hands over to the camera if it sees nothing within timeout)
+#   hardware.prepare_drone()        -> pair with the drone (optional warm start)
+#   hardware.fly_drone()            -> run the drone flight
+#
+# Hardware talks to the real Raspberry Pi devices. sim.SimHardware provides
+# the same interface backed by a physics model so the control code can run
+# on any machine.
+
+
+# START TRIGGERS (hardware.wait_for_start)
+START_CAMERA = "camera"     # flash detection on camera frames (lightstart.py)
+START_SENSOR = "sensor"     # light sensor edge on a GPIO (camera if the sensor cannot be opened or times out)
+
+
+class I2CBus:
+    """
+    Shared I2C bus manager.
+    Every encoder on the Pi sits on the same SCL/SDA pair, so only one
+    busio.I2C handle is opened per process and handed out to every user.
+    """
+
+    _bus = None
+    _bus_lock = threading.Lock()
+    lock = threading.RLock()    # serializes transactions on the shared bus
+
+    @classmethod
+    def get(cls):
+        """Return the shared I2C bus (opened on first use)."""
+        with cls._bus_lock:
+            if cls._bus is None:
+                import board
+                import busio
+                cls._bus = busio.I2C(board.SCL, board.SDA)
+            return cls._bus
+
+
+class SysfsPWM:
+    """
+    Servo pulse output from the hardware PWM peripheral (sysfs pwmchip).
+    GPIO12/13 are PWM channels 0/1 once the overlay is enabled in
+    /boot/firmware/config.txt:
+        dtoverlay=pwm-2chan,pin=12,func=4,pin2=13,func2=4
+    The peripheral generates the pulse train by itself, so the only CPU work
+    is a sysfs write when the pulse width changes.
+    """
+
+    # CONSTANTS
+
+    PWMCHIP = "/sys/class/pwm/pwmchip0"
+    CHANNELS = {12: 0, 13: 1}   # GPIO -> PWM channel
+
+
+    # CONSTRUCTOR
+
+    def __init__(self, pin: int, pwmchip: str = PWMCHIP):
+        self.pin = pin
+        self.pwmchip = pwmchip
+        self.channel = self.CHANNELS[pin]
+        self.path = os.path.join(pwmchip, f"pwm{self.channel}")
+        self._period = None
+        self._duty = None
+
+
+    # PUBLIC METHODS
+
+    @classmethod
+    def available(cls, pwmchip: str = PWMCHIP):
+        """True if the hardware PWM overlay is loaded."""
+        return os.path.isdir(pwmchip)
+
+    def open(self):
+        """Export the PWM channel (output stays disabled until the first set_pulse)."""
+        if not os.path.isdir(self.path):
+            self._write(os.path.join(self.pwmchip, "export"), self.channel)
+            # udev needs a moment to fix the permissions of the new channel
+            for _ in range(100):
+                if os.access(os.path.join(self.path, "enable"), os.W_OK):
+                    break
+                time.sleep(0.01)
+        self._duty = open(os.path.join(self.path, "duty_cycle"), "w")
+
+    def set_pulse(self, on_us: int, period_us: int = 20000):
+        """Output on_us wide pulses every period_us until changed."""
+        if period_us != self._period:
+            # duty cycle must never exceed the period while it changes
+            self._set_duty(0)
+            self._write(os.path.join(self.path, "period"), period_us * 1000)
+            self._write(os.path.join(self.path, "enable"), 1)
+            self._period = period_us
+        self._set_duty(on_us * 1000)
+
+    def close(self):
+        """Stop the output and release the channel."""
+        if self._duty is not None:
+            self._write(os.path.join(self.path, "enable"), 0)
+            self._duty.close()
+            self._duty = None
+            self._write(os.path.join(self.pwmchip, "unexport"), self.channel)
+        self._period = None
+
+
+    # PRIVATE METHODS
+
+    def _set_duty(self, duty_ns: int):
+        self._duty.write(str(int(duty_ns)))
+        self._duty.flush()
+
+    def _write(self, path: str, value):
+        with open(path, "w") as f:
+            f.write(str(value))
+
+
+class LgpioPWM:
+    """
+    Servo pulse output on a Raspberry Pi 5 GPIO using lgpio.tx_servo
+    (fallback when the hardware PWM overlay is not loaded). lgpio times the
+    pulses in its own C thread, so no Python thread is needed either.
+    """
+
+    def __init__(self, pin: int, chip: int = 0):
+        self.pin = pin
+        self.chip = chip
+        self.h = None
+
+    def open(self):
+        """Claim the GPIO as an output."""
+        import lgpio
+        self._lgpio = lgpio
+        self.h = lgpio.gpiochip_open(self.chip)
+        lgpio.gpio_claim_output(self.h, self.pin)
+
+    def set_pulse(self, on_us: int, period_us: int = 20000):
+        """Output on_us wide pulses every period_us until changed."""
+        self._lgpio.tx_servo(self.h, self.pin, int(on_us), round(1e6 / period_us))
+
+    def close(self):
+        """Stop the pulses and release the GPIO chip."""
+        self._lgpio.tx_servo(self.h, self.pin, 0)
+        self._lgpio.gpiochip_close(self.h)
+
+
+class LightSensor:
+    """
+    Start light sensor on a GPIO (photodiode module with a comparator
+    output, threshold set on the module). lgpio watches the pin from its
+    own alert thread and timestamps the edge in the kernel, so the start is
+    seen within a fraction of a millisecond instead of at the next camera
+    frame.
+    Parameters:
+    ----------
+    pin : int
+        GPIO the sensor output is wired to
+    chip : int
+        GPIO chip number
+    rising : bool
+        True if the output goes high when the light turns on
+    """
+
+    # CONSTANTS
+
+    DEBOUNCE_US = 100   # [us] the level must hold this long to count (rejects spikes, adds this much latency)
+
+
+    # CONSTRUCTOR
+
+    def __init__(self, pin: int, chip: int = 0, rising: bool = True):
+        self.pin = pin
+        self.chip = chip
+        self.rising = rising
+        self.h = None
+        self.edge_time = None       # [ns] time.monotonic_ns() when the edge was reported
+        self._callback = None
+        self._event = threading.Event()
+
+
+    # PUBLIC METHODS
+
+    def open(self):
+        """Claim the GPIO and start watching for the edge."""
+        import lgpio
+        self._lgpio = lgpio
+        edge = lgpio.RISING_EDGE if self.rising else lgpio.FALLING_EDGE
+        self.h = lgpio.gpiochip_open(self.chip)
+        lgpio.gpio_claim_alert(self.h, self.pin, edge)
+        lgpio.gpio_set_debounce_micros(self.h, self.pin, self.DEBOUNCE_US)
+        self._callback = lgpio.callback(self.h, self.pin, edge, self._on_edge)
+
+    def wait(self, timeout: float = None):
+        """Block until the light turns on. Returns False on timeout."""
+        return self._event.wait(timeout)
+
+    def latency(self):
+        """Seconds from the edge being reported to now."""
+        return (time.monotonic_ns() - self.edge_time) / 1e9
+
+    def close(self):
+        """Stop watching and release the GPIO chip."""
+        if self._callback is not None:
+            self._callback.cancel()
+            self._callback = None
+        if self.h is not None:
+            self._lgpio.gpiochip_close(self.h)
+            self.h = None
+
+
+    # PRIVATE METHODS
+
+    def _on_edge(self, chip, gpio, level, tick):
+        """lgpio alert callback (runs on the lgpio thread)."""
+        if not self._event.is_set():
+            # tick's reference clock is unspecified by lgpio: time the callback instead
+            self.edge_time = time.monotonic_ns()
+            self._event.set()
+
+
+class Hardware:
+    """
+    Real Raspberry Pi hardware backend.
+    Parameters:
+    ----------
+    clock : Clock
+        Time source of every control loop
+    pwmchip : str
+        sysfs PWM chip of the servo outputs
+    sensor_pin : int
+        GPIO of the start light sensor (None = no sensor, START_SENSOR uses the camera)
+    """
+
+    def __init__(self, clock=None, pwmchip: str = SysfsPWM.PWMCHIP, sensor_pin: int = None):
+        self.clock = clock if clock is not None else MonotonicClock()
+        self.pwmchip = pwmchip
+        self.sensor_pin = sensor_pin
+        self._sensor = None     # opened by prepare_start()
+        self._camera = None     # started by prepare_start()
+        self._drone = None      # paired by prepare_drone()
+
+    def pwm(self, pin: int, chip: int = 0):
+        # Hardware PWM peripheral if the overlay is loaded, lgpio otherwise
+        if pin in SysfsPWM.CHANNELS and SysfsPWM.available(self.pwmchip):
+            return SysfsPWM(pin, self.pwmchip)
+        return LgpioPWM(pin, chip)
+
+    def i2c(self):
+        return I2CBus.get()
+
+    def encoder(self, address: int, i2c=None):
+        from adafruit_seesaw import seesaw, rotaryio
+        ss = seesaw.Seesaw(i2c if i2c is not None else self.i2c(), addr=address)
+        return rotaryio.IncrementalEncoder(ss)
+
+    def serial(self, port: str, baudrate: int, timeout: float = 1, reset: bool = True):
+        import serial
+        ser = serial.Serial(None, baudrate, timeout=timeout)
+        ser.port = port
+        if not reset:
+            # Best effort: the tty driver can still pulse DTR while opening, before pyserial applies this
+            ser.dtr = False
+        ser.open()
+        if not reset:
+            # Keep DTR up when the port closes (HUPCL), so the next open does not reset the board
+            import termios
+            attrs = termios.tcgetattr(ser.fd)
+            attrs[2] &= ~termios.HUPCL
+            termios.tcsetattr(ser.fd, termios.TCSANOW, attrs)
+        return ser
+
+    def prepare_start(self, trigger: str = START_CAMERA):
+        import lightstart
+        if trigger == START_SENSOR and self.sensor_pin is not None:
+            if self._sensor is None:
+                self._sensor = self._open_sensor()
+            if self._sensor is not None:
+                return      # the camera is only started if the sensor falls back to it
+        if self._camera is None:
+            self._camera = lightstart.open_camera()
+
+    def wait_for_start(self, trigger: str = START_CAMERA, timeout: float = None):
+        import lightstart
+        camera, self._camera = self._camera, None
+        sensor, self._sensor = self._sensor, None
+        if trigger == START_SENSOR:
+            if sensor is None and self.sensor_pin is not None:
+                sensor = self._open_sensor()
+            if sensor is not None:
+                print("waiting for light sensor")
+                seen = sensor.wait(timeout)
+                latency = sensor.latency() if seen else None
+                sensor.close()
+                if seen:
+                    print(f"light detected ({latency * 1000:.3f} ms after the edge was reported)")
+                    if camera is not None:
+                        camera.stop()
+                    return
+                print(f"no light on the sensor after {timeout} s, using the camera")
+            else:
+                print("light sensor unavailable, using the camera")
+        elif sensor is not None:
+            sensor.close()
+        lightstart.start(camera)        # opens the camera if it was not prepared
+
+    def prepare_drone(self):
+        import deadreckoning
+        self._drone = deadreckoning.connect()
+
+    def fly_drone(self):
+        import deadreckoning
+        drone, self._drone = self._drone, None
+        deadreckoning.start(drone)
+
+    def _open_sensor(self):
+        """Returns the opened light sensor, or None if it cannot be opened."""
+        sensor = LightSensor(self.sensor_pin)
+        try:
+            sensor.open()
+            return sensor
+        except Exception as e:
+            print(f"Light sensor on GPIO{self.sensor_pin}: {e!r}")
+            sensor.close()
+            return None
@@ -1,22 +1,106 @@
 #!/usr/bin/env python3
-from picamera2 import Picamera2
+import collections
+import math
 import numpy as np
-import time
 
+from camera import Camera
 
-def start():
-    picam2 = Picamera2()
-    picam2.configure(picam2.create_preview_configuration(main={"size": (640, 480)}))
-    picam2.start()
 
-    time.sleep(0.5)
-    baseline = np.mean(picam2.capture_array())
+# CAMERA PARAMETERS
+LORES_SIZE = (160, 120)     # YUV420 stream the detector reads
+FRAME_RATE = 60             # [frames/s] a frame every ~17 ms
+
+
+class FlashDetector:
+    """
+    Start light detector working on the luma (Y) plane of small frames.
+    Brightness is an integer sum over a region of interest, compared with
+    a rolling baseline (mean and spread of the last frames without a
+    flash): a frame counts as the flash when it is brighter than the
+    baseline by k standard deviations and at least min_jump levels, so slow
+    ambient changes (auto exposure, people walking by) do not trigger it.
+    Parameters:
+    ----------
+    roi : tuple
+        (x, y, width, height) of the region to watch in Y plane pixels (None = whole frame)
+    window : int
+        Number of frames in the rolling baseline
+    k : float
+        Trigger threshold in baseline standard deviations
+    min_jump : float
+        Smallest brightness jump that counts as the flash (mean luma levels)
+    """
+
+    # CONSTANTS
+
+    WINDOW = 30             # frames (~0.5 s at 60 frames/s)
+    K = 6.0
+    MIN_JUMP = 20.0
+    MIN_FRAMES = 5          # frames needed before the baseline is trusted
+
+
+    # CONSTRUCTOR
+
+    def __init__(self, roi: tuple = None, window: int = WINDOW, k: float = K, min_jump: float = MIN_JUMP):
+        self.roi = roi
+        self.k = k
+        self.min_jump = min_jump
+        self._history = collections.deque(maxlen=window)
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+
+    # PUBLIC METHODS
+
+    def brightness(self, y_plane: np.ndarray):
+        """Mean luma of the region of interest (integer sum, no float copy of the frame)."""
+        if self.roi is not None:
+            x, y, w, h = self.roi
+            y_plane = y_plane[y:y + h, x:x + w]
+        return int(y_plane.sum(dtype=np.uint32)) / y_plane.size
+
+    def threshold(self):
+        """Brightness that triggers the detector (inf until the baseline is ready)."""
+        n = len(self._history)
+        if n < self.MIN_FRAMES:
+            return math.inf
+        mean = self._sum / n
+        std = math.sqrt(max(0.0, self._sum_sq / n - mean * mean))
+        return mean + max(self.min_jump, self.k * std)
+
+    def update(self, brightness: float):
+        """Add a frame's brightness. Returns True if it is the flash (flash frames stay out of the baseline)."""
+        if brightness > self.threshold():
+            return True
+        if len(self._history) == self._history.maxlen:
+            old = self._history[0]
+            self._sum -= old
+            self._sum_sq -= old * old
+        self._history.append(brightness)
+        self._sum += brightness
+        self._sum_sq += brightness * brightness
+        return False
+
+
+def open_camera():
+    """Start the camera and let the exposure settle (done ahead of time for a warm start)."""
+    return Camera(LORES_SIZE, FRAME_RATE).start()
+
+
+def start(camera: Camera = None, detector: FlashDetector = None):
+    """Block until the start light flashes. Returns the detection latency [s] (frame exposure to decision)."""
+    if camera is None:
+        camera = open_camera()
+    if detector is None:
+        detector = FlashDetector()
     print("waiting for flash")
     while True:
-        brightness = np.mean(picam2.capture_array())
-        if brightness > baseline + 30:
+        # Blocks until the next frame (no polling delay); the Y plane is read in place
+        with camera.capture() as frame:
+            flash = detector.update(detector.brightness(frame.yuv.y))
+            latency = frame.latency()
+        if flash:
             break
-        time.sleep(0.05)
-
-    print("flash detected")
-    picam2.stop()
+    print(f"flash detected ({latency * 1000:.1f} ms after the frame)")
+    camera.stop()
+    return latency
@@ -8,8 +8,10 @@ from enum import Enum
 # PRIVATE LIBRARIES
 from drive import Drive
 from arduino import Arduino, Command
-import lightstart
-import deadreckoning
+from hal import Hardware, START_CAMERA
+from telemetry import Telemetry, QUIET
+from tasks import run_async, wait_all
+from startup import Startup
 
 # HARDWARE PARAMETERS
 PORT_ARDUINO    = '/dev/ttyACM0'
@@ -17,6 +19,17 @@ PIN_SERVO_LEFT  = 13    # GPIO13 (PWM1)
 PIN_SERVO_RIGHT = 12    # GPIO12 (PWM0)
 ADDR_ENC_LEFT   = 0x37  # A0=HIGH, A1=LOW
 ADDR_ENC_RIGHT  = 0x36  # A0=LOW, A1=LOW
+PIN_START_SENSOR = 16   # GPIO16 (light sensor module output, high when lit)
+
+# START PARAMETERS
+START_TRIGGER   = START_CAMERA  # START_SENSOR once the light sensor is wired (camera if it cannot be opened)
+SENSOR_TIMEOUT  = 60.0          # [s] without light on the sensor before the camera takes over
+
+# STARTUP PARAMETERS
+STARTUP_TIMEOUT = 10.0      # [s] longest wait for every device to come up
+
+# LOGGING PARAMETERS
+LOG_DIR         = 'logs'    # binary telemetry logs (decode with telemetry.py)
 
 # DATA STRUCTURES
 # Robot states for state machine
@@ -34,27 +47,48 @@ class State(Enum):
 # ROBOT
 
 class Robot:
-    def __init__(self):
+    def __init__(self, hardware=None, telemetry=None, trigger: str = START_CAMERA):
         self.state = State.STOPPED
-        # Arduino communication
-        self.arduino = Arduino(PORT_ARDUINO, 9600)
-        # Drive controller (uses PID control loop with encoder feedback)
-        self.drive = Drive(PIN_SERVO_LEFT, PIN_SERVO_RIGHT, ADDR_ENC_LEFT, ADDR_ENC_RIGHT)
+        self.trigger = trigger      # start light detector (START_CAMERA or START_SENSOR)
+        # Hardware backend (real Pi by default, or sim.SimHardware)
+        self.hardware = hardware if hardware is not None else Hardware()
+        # Control loop telemetry (in-memory unless a log file is given)
+        self.telemetry = telemetry if telemetry is not None else Telemetry(clock=self.hardware.clock)
+        # Bring every device up at the same time, before the start light (warm start)
+        self.startup = Startup(self.hardware.clock)
+        # Arduino communication (waits for the board to boot)
+        self.startup.add("arduino", Arduino, PORT_ARDUINO, hardware=self.hardware)
+        # Drive controller (I2C encoders, PWM servos and their control threads)
+        self.startup.add("drive", self._start_drive)
+        # Start light detector and drone pairing
+        self.startup.add("start light", self.hardware.prepare_start, trigger)
+        self.startup.add("drone", self.hardware.prepare_drone)
+        # Ready barrier (start light and drone fall back to starting when used)
+        self.startup.wait(STARTUP_TIMEOUT)
+        self.startup.report()
+        self.arduino = self.startup.result("arduino")
+        self.drive = self.startup.result("drive")
+
+    def _start_drive(self):
+        """Create the drive controller and start its threads."""
+        drive = Drive(PIN_SERVO_LEFT, PIN_SERVO_RIGHT, ADDR_ENC_LEFT, ADDR_ENC_RIGHT, hardware=self.hardware, telemetry=self.telemetry)
+        drive.startup()
+        return drive
 
 
     # TASK PROCEDURES
 
+    # (actuator procedures return a Task right away, call task.wait() to block until done)
+
     def turn_crank(self):
         """Execute crank procedure."""
         self.state = State.CRANK
-        self.arduino.send_command(Command.MOTOR3)
-        # time.sleep(5)
+        return self.arduino.run_command_async(Command.MOTOR3)
 
     def press_keypad(self):
         """Execute keypad procedure."""
         self.state = State.KEYPAD
-        self.arduino.send_command(Command.MOTOR1)
-        # time.sleep(5)
+        return self.arduino.run_command_async(Command.MOTOR1)
 
     def push_button(self):
         """Execute button procedure."""
@@ -67,53 +101,65 @@ class Robot:
     def whack_duck(self):
         """Execute duck procedure."""
         self.state = State.DUCK
-        self.arduino.send_command(Command.MOTOR2)
-        # time.sleep(7.5)
+        return self.arduino.run_command_async(Command.MOTOR2)
 
     def fly_drone(self):
         """Execute drone procedure."""
         self.state = State.DRONE
-        deadreckoning.start()
+        return run_async(self.hardware.fly_drone, clock=self.hardware.clock)
 
 
     # MAIN PROCEDURE
 
     def run(self):
         """Main robot procedure."""
-        # wait for flash signal
-        lightstart.start()
-        # start hardware threads
-        self.drive.startup()
-        # move to button
-        self.drive.move_forward(21.4)
-        # push button
-        self.push_button()
-        # move to duck
-        self.drive.move_forward(-14)
-        self.drive.turn(83.5)
-        self.drive.move_forward(31.5)
-        # whack duck
-        self.whack_duck()
-        # fly drone
-        self.fly_drone()
-        # turn crank
-        self.turn_crank()
-        # press keypad
-        self.press_keypad()
-        # return to start
-        self.drive.move_forward(-31.5)
-        self.drive.turn(90)
-        self.drive.move_forward(9)
-        # shutdown hardware
-        self.drive.shutdown()
-
+        try:
+            # wait for flash signal
+            self.hardware.wait_for_start(self.trigger, SENSOR_TIMEOUT)
+            # start telemetry (the drive threads already run since startup)
+            self.telemetry.start()
+            # move to button
+            self.drive.move_forward(21.4)
+            # push button
+            self.push_button()
+            # move to duck
+            self.drive.move_forward(-14)
+            self.drive.turn(83.5)
+            self.drive.move_forward(31.5)
+            # whack duck, turn crank and press keypad (the Arduino runs the three motors at the same time)
+            actuators = [self.whack_duck(), self.turn_crank(), self.press_keypad()]
+            # fly drone while the actuators run
+            drone = self.fly_drone()
+            # wait for the actuators to finish before driving away (a failed one does not stop the run)
+            for task in actuators:
+                error = task.exception()
+                if error is not None:
+                    print(f"{task.name} failed, returning anyway: {error!r}")
+            # wait for the drone to land: it returns to its takeoff spot, which is on the robot's way back
+            # (re-raises if the drone failed, so the robot does not drive where it may be)
+            wait_all([drone])
+            # return to start (queued moves)
+            self.state = State.RETURNING
+            self.drive.move_forward_async(-31.5)
+            self.drive.turn_async(90)
+            self.drive.move_forward_async(9)
+            self.drive.wait_idle()
+        finally:
+            # shutdown hardware (also when a step failed, so the motors stop and the log is written)
+            self.state = State.STOPPED
+            self.drive.shutdown()
+            self.arduino.close()
+            self.telemetry.close()
 
 
 # MAIN PROGRAM
 
 def main():
-    # create robot instance
-    robot = Robot()
+    # create robot instance (full telemetry to a log file, no console output from the drive loops)
+    hardware = Hardware(sensor_pin=PIN_START_SENSOR)
+    log_path = f"{LOG_DIR}/run_{time.strftime('%Y%m%d_%H%M%S')}.tlm"
+    telemetry = Telemetry(log_path, level=QUIET, clock=hardware.clock)
+    robot = Robot(hardware, telemetry, START_TRIGGER)
     # run main procedure
     robot.run()
 
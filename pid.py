@@ -2,14 +2,14 @@
 # 12/10/25
 
 
-# PUBLIC LIBRARIES
-import time
-
+# PRIVATE LIBRARIES
+from clock import MonotonicClock
 
 
 class PID:
     """Minimal PID controller for robotic control loops."""
-    def __init__(self, kp, ki, kd, output_min=-1.0, output_max=1.0):
+    def __init__(self, kp, ki, kd, output_min=-1.0, output_max=1.0, clock=None):
+        self.clock = clock if clock is not None else MonotonicClock()
         self.kp = kp
         self.ki = ki
         self.kd = kd
@@ -18,15 +18,17 @@ class PID:
 
         self.integral = 0.0
         self.last_error = 0.0
-        self.last_time = time.time()
+        self.last_time = self.clock.time()
+        # Terms of the last update (for telemetry)
+        self.p = self.i = self.d = 0.0
 
     def reset(self):
         self.integral = 0.0
         self.last_error = 0.0
-        self.last_time = time.time()
+        self.last_time = self.clock.time()
 
     def update(self, target, current):
-        now = time.time()
+        now = self.clock.time()
         dt = now - self.last_time
         if dt <= 0:
             dt = 1e-6
@@ -47,5 +49,6 @@ class PID:
         # Store
         self.last_error = error
         self.last_time = now
+        self.p, self.i, self.d = p, i, d
 
         return output
\ No newline at end of file
@@ -0,0 +1,261 @@
+# Frame Pipeline Library
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import collections
+import threading
+from dataclasses import dataclass
+
+
+# PRIVATE LIBRARIES
+from clock import MonotonicClock
+
+
+@dataclass
+class Frame:
+    """A camera frame on its way through the pipeline."""
+    seq: int                # capture number (gaps are dropped frames)
+    time: float             # [s] clock time the capture returned
+    image: object
+    result: object = None   # what process() returned
+    refs: int = 1           # stages still using the image (see Pipeline release)
+
+
+class LatestQueue:
+    """
+    Bounded queue with drop-oldest semantics.
+    put() never blocks: when the queue is full the oldest item is thrown
+    away, so a slow consumer always gets the freshest items instead of a
+    growing backlog.
+    Parameters:
+    ----------
+    maxsize : int
+        Items kept (1 = latest only)
+    clock : Clock
+        Time source for get() timeouts
+    """
+
+    # CONSTRUCTOR
+
+    def __init__(self, maxsize: int = 1, clock=None):
+        self.clock = clock if clock is not None else MonotonicClock()
+        self.dropped = 0
+        self._items = collections.deque()
+        self._maxsize = maxsize
+        self._closed = False
+        self._cond = threading.Condition()
+
+
+    # PUBLIC METHODS
+
+    def put(self, item):
+        """Add an item, dropping the oldest one if the queue is full. Returns the dropped item (or None)."""
+        dropped = None
+        with self._cond:
+            if len(self._items) >= self._maxsize:
+                dropped = self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.clock.notify_all(self._cond)
+        return dropped
+
+    def get(self, timeout: float = None):
+        """Oldest item kept, waiting for one if empty. Returns None on timeout or once closed."""
+        with self._cond:
+            self.clock.wait_for(self._cond, lambda: self._items or self._closed, timeout)
+            return self._items.popleft() if self._items else None
+
+    def close(self):
+        """Wake every waiting get() (they return None)."""
+        with self._cond:
+            self._closed = True
+            self.clock.notify_all(self._cond)
+
+    def drain(self):
+        """Remove and return every item left."""
+        with self._cond:
+            items, self._items = list(self._items), collections.deque()
+            return items
+
+
+class StageStats:
+    """Frame count and rate of one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.frames = 0
+        self.first = None           # [s] time of the first frame
+        self.last = None            # [s] time of the last frame
+        self.latency_sum = 0.0      # [s] capture -> end of this stage
+        self.latency_max = 0.0
+
+    def record(self, now: float, frame: Frame):
+        self.frames += 1
+        if self.first is None:
+            self.first = now
+        self.last = now
+        latency = now - frame.time
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    @property
+    def rate(self):
+        """[Hz] frames per second between the first and last frame."""
+        if self.frames < 2 or self.last <= self.first:
+            return 0.0
+        return (self.frames - 1) / (self.last - self.first)
+
+    @property
+    def latency_mean(self):
+        return self.latency_sum / self.frames if self.frames else 0.0
+
+    def __str__(self):
+        return (f"{self.name:<8} {self.frames:5d} frames {self.rate:6.1f} Hz | "
+                f"latency mean {self.latency_mean * 1000:6.1f} ms, max {self.latency_max * 1000:6.1f} ms")
+
+
+class Pipeline:
+    """
+    Runs capture -> process -> control on their own threads, with display
+    on the caller's thread (cv2.imshow must stay on the main thread).
+    Stages hand frames over through LatestQueues, so a slow stage drops old
+    frames instead of holding the others back: the frame rate is that of the
+    slowest stage instead of the sum of all of them, and control always acts
+    on the freshest processed frame.
+    Images that must be given back (mapped camera buffers) are passed to
+    release() as soon as no stage needs them: when dropped, after process()
+    (control only gets frame.result), or once the next frame is displayed.
+    Usage:
+        pipeline = Pipeline(camera.capture, detect, control, release=CameraFrame.release)
+        pipeline.start()
+        while running:
+            frame = pipeline.latest(timeout=1.0)
+            show(frame)
+        pipeline.stop()
+    Parameters:
+    ----------
+    capture : callable
+        capture() -> image, blocks until the next camera frame
+    process : callable
+        process(image) -> result (e.g. the detected markers)
+    control : callable
+        Optional control(frame), called with every processed Frame it keeps up with
+    clock : Clock
+        Time source
+    depth : int
+        Frames kept between two stages (1 = latest frame only)
+    release : callable
+        Optional release(image), called once per image when the pipeline is done with it
+    """
+
+    # CONSTRUCTOR
+
+    def __init__(self, capture, process, control=None, clock=None, depth: int = 1, release=None):
+        self.capture = capture
+        self.process = process
+        self.control = control
+        self.release = release
+        self.clock = clock if clock is not None else MonotonicClock()
+        self.stats = {name: StageStats(name) for name in ("capture", "process", "control", "display")}
+        self._processing = LatestQueue(depth, self.clock)
+        self._controlling = LatestQueue(depth, self.clock)
+        self._displaying = LatestQueue(depth, self.clock)
+        self._running = False
+        self._threads = []
+        self._shown = None          # frame returned by latest(), released at the next call
+        self._lock = threading.Lock()
+
+
+    # PUBLIC METHODS
+
+    def start(self):
+        """Start the capture, process and control threads."""
+        if self._running:
+            return
+        self._running = True
+        stages = [self._capture_loop, self._process_loop]
+        if self.control is not None:
+            stages.append(self._control_loop)
+        self._threads = [threading.Thread(target=stage, daemon=True) for stage in stages]
+        for thread in self._threads:
+            self.clock.register(thread)
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stop every stage and wait for the threads to finish."""
+        self._running = False
+        for queue in (self._processing, self._controlling, self._displaying):
+            queue.close()
+        for thread in self._threads:
+            self.clock.join(thread)
+        self._threads = []
+        for frame in self._processing.drain() + self._displaying.drain() + [self._shown]:
+            self._done(frame)
+        self._shown = None
+
+    def latest(self, timeout: float = None):
+        """Freshest processed Frame for display, valid until the next call (None on timeout or once stopped)."""
+        self._done(self._shown)
+        frame = self._shown = self._displaying.get(timeout)
+        if frame is not None:
+            self.stats["display"].record(self.clock.time(), frame)
+        return frame
+
+    def dropped(self):
+        """Returns {stage: frames dropped because the stage was still busy}."""
+        return {"process": self._processing.dropped,
+                "control": self._controlling.dropped,
+                "display": self._displaying.dropped}
+
+    def report(self):
+        """Print the rate and latency of every stage."""
+        dropped = self.dropped()
+        for name, stats in self.stats.items():
+            if stats.frames:
+                print(f"  {stats} | {dropped.get(name, 0)} dropped")
+
+
+    # PRIVATE METHODS
+
+    def _capture_loop(self):
+        seq = 0
+        while self._running:
+            image = self.capture()
+            frame = Frame(seq, self.clock.time(), image)
+            seq += 1
+            self.stats["capture"].record(frame.time, frame)
+            self._done(self._processing.put(frame))
+
+    def _process_loop(self):
+        while self._running:
+            frame = self._processing.get()
+            if frame is None:
+                continue
+            frame.result = self.process(frame.image)
+            self.stats["process"].record(self.clock.time(), frame)
+            if self.control is not None:
+                self._controlling.put(frame)
+            with self._lock:
+                frame.refs += 1
+            self._done(self._displaying.put(frame))
+            self._done(frame)
+
+    def _done(self, frame: Frame):
+        """A stage is done with frame's image: release it if it was the last one."""
+        if frame is None:
+            return
+        with self._lock:
+            frame.refs -= 1
+            last = frame.refs == 0
+        if last and self.release is not None:
+            self.release(frame.image)
+
+    def _control_loop(self):
+        while self._running:
+            frame = self._controlling.get()
+            if frame is None:
+                continue
+            self.control(frame)
+            self.stats["control"].record(self.clock.time(), frame)
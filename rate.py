@@ -0,0 +1,162 @@
+# Fixed-Rate Loop Library
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import os
+import threading
+
+
+# PRIVATE LIBRARIES
+from clock import MonotonicClock
+
+
+def set_realtime(cpu: int = None, priority: int = None):
+    """
+    Pin the calling thread to a CPU core and/or give it a real-time
+    (SCHED_FIFO) priority. Needs root for the priority; failures are reported
+    and ignored so the loop still runs without them.
+    """
+    if cpu is not None:
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except (AttributeError, OSError) as e:
+            print(f"Could not pin thread to CPU {cpu}: {e}")
+    if priority is not None:
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+        except (AttributeError, OSError) as e:
+            print(f"Could not set real-time priority {priority}: {e}")
+
+
+class LoopStats:
+    """Timing statistics of a fixed-rate loop."""
+
+    def __init__(self, period: float):
+        self.period = period
+        self.cycles = 0
+        self.overruns = 0           # cycles that started more than one period late
+        self.jitter_sum = 0.0       # [s] total lateness of cycle starts
+        self.jitter_max = 0.0       # [s] worst lateness of a cycle start
+        self.work_max = 0.0         # [s] longest loop body (PeriodicTask only)
+
+    def record(self, lateness: float):
+        self.cycles += 1
+        self.jitter_sum += lateness
+        self.jitter_max = max(self.jitter_max, lateness)
+        if lateness >= self.period:
+            self.overruns += 1
+
+    @property
+    def jitter_mean(self):
+        return self.jitter_sum / self.cycles if self.cycles else 0.0
+
+    def __str__(self):
+        return (f"{self.cycles} cycles @ {1 / self.period:.0f} Hz | "
+                f"jitter mean {self.jitter_mean * 1000:.2f} ms, max {self.jitter_max * 1000:.2f} ms | "
+                f"work max {self.work_max * 1000:.2f} ms | {self.overruns} overruns")
+
+
+class Rate:
+    """
+    Absolute-deadline loop timer.
+    Deadlines are start + n * period on the clock, so time spent in the loop
+    body (or printing) does not stretch the period. If a cycle runs more
+    than a whole period late, the missed deadlines are skipped and counted
+    as an overrun instead of being run back-to-back.
+    Usage:
+        rate = Rate(50)
+        while running:
+            do_work()
+            rate.sleep()
+    """
+
+    # CONSTRUCTOR
+
+    def __init__(self, rate_hz: float, clock=None, start: float = None):
+        self.clock = clock if clock is not None else MonotonicClock()
+        self.period = 1.0 / rate_hz
+        # First deadline (one period from now unless given)
+        self.deadline = start if start is not None else self.clock.time() + self.period
+        self.stats = LoopStats(self.period)
+
+
+    # PUBLIC METHODS
+
+    def remaining(self):
+        """Time left until the next deadline (negative if it has passed)."""
+        return self.deadline - self.clock.time()
+
+    def tick(self):
+        """Mark the current deadline as handled and schedule the next one. Returns the lateness."""
+        lateness = max(0.0, self.clock.time() - self.deadline)
+        self.stats.record(lateness)
+        missed = int(lateness // self.period)
+        self.deadline += (missed + 1) * self.period
+        return lateness
+
+    def sleep(self):
+        """Sleep until the next deadline."""
+        self.clock.sleep_until(self.deadline)
+        return self.tick()
+
+
+class PeriodicTask:
+    """
+    Runs fn() in a background thread on absolute deadlines.
+    Parameters:
+    ----------
+    fn : callable
+        Loop body, called once per period
+    rate_hz : float
+        Loop frequency in Hz
+    clock : Clock
+        Time source
+    cpu : int
+        Optional CPU core to pin the thread to
+    priority : int
+        Optional SCHED_FIFO priority (1-99, needs root)
+    """
+
+    # CONSTRUCTOR
+
+    def __init__(self, fn, rate_hz: float, clock=None, cpu: int = None, priority: int = None):
+        self.fn = fn
+        self.rate_hz = rate_hz
+        self.clock = clock if clock is not None else MonotonicClock()
+        self.cpu = cpu
+        self.priority = priority
+        self.stats = LoopStats(1.0 / rate_hz)
+        # Thread state
+        self._running = False
+        self._thread = None
+
+
+    # PUBLIC METHODS
+
+    def start(self):
+        """Start the loop thread."""
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self.clock.register(self._thread)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the loop thread and wait for it to finish."""
+        self._running = False
+        if self._thread:
+            self.clock.join(self._thread)
+
+
+    # PRIVATE METHODS
+
+    def _run(self):
+        set_realtime(self.cpu, self.priority)
+        rate = Rate(self.rate_hz, self.clock)
+        self.stats = rate.stats
+        while self._running:
+            start = self.clock.time()
+            self.fn()
+            self.stats.work_max = max(self.stats.work_max, self.clock.time() - start)
+            rate.sleep()
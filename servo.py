@@ -3,15 +3,19 @@
 
 
 # PUBLIC LIBRARIES
-import lgpio
 import threading
-import time
 
 
+# PRIVATE LIBRARIES
+from hal import Hardware
+
 
 class Servo:
     """
-    Continuous Servo Controller for Raspberry Pi 5 using lgpio.
+    Continuous Servo Controller for Raspberry Pi 5 (hardware PWM by default,
+    or any PWM backend provided by the hardware object).
+    The PWM backend keeps the 50 Hz pulse train running on its own; the
+    pulse width is only reprogrammed when set_speed changes it.
     
     Speed range:
         -1.0 = full reverse
@@ -29,7 +33,9 @@ class Servo:
     def __init__(self, pin: int, direction: int = 1, chip: int = 0,
         pulse_reverse: int = 1000,  # [us] full speed reverse
         pulse_forward: int = 2000,  # [us] full speed forward
-        pulse_neutral: int = 1500   # [us] neutral/stop
+        pulse_neutral: int = 1500,  # [us] neutral/stop
+        hardware=None,              # hardware backend (real Pi by default)
+        clock=None                  # time source (defaults to the hardware clock)
     ):
         # Initialize servo parameters
         self.pin = pin
@@ -38,14 +44,17 @@ class Servo:
         self.pulse_reverse = pulse_reverse
         self.pulse_forward = pulse_forward
         self.pulse_neutral = pulse_neutral
+        self.hardware = hardware if hardware is not None else Hardware()
+        self.clock = clock if clock is not None else self.hardware.clock
 
         # Validate pin
         if pin != 12 and pin != 13:
             raise ValueError("Servo must use GPIO12 or GPIO13 on Raspberry Pi 5 (hardware PWM).")
         
         # PWM parameters
+        self.pwm = None
         self._speed = 0.0
-        self._running = True
+        self._pulse = None          # [us] pulse width currently programmed
         self._lock = threading.Lock()
 
         # self.startup()
@@ -62,27 +71,22 @@ class Servo:
         else:
             return self.pulse_neutral + speed * (self.pulse_neutral - self.pulse_reverse)
 
-    def _pulse_worker(self):
-        """Thread that outputs 50 Hz servo pulses indefinitely."""
-        while self._running:
-            with self._lock:
-                pulse = int(self._speed_to_pulse(self._speed))
-            # High for pulse µs, then low for rest of 20ms
-            lgpio.tx_pulse(self.h, self.pin, pulse, self.PERIOD - pulse)
-            # Sleep 20ms to maintain 50 Hz
-            time.sleep(0.020)
+    def _update_pulse(self):
+        """Reprogram the PWM output if the pulse width changed (lock held)."""
+        pulse = int(self._speed_to_pulse(self._speed))
+        if self.pwm is not None and pulse != self._pulse:
+            self.pwm.set_pulse(pulse, self.PERIOD)
+            self._pulse = pulse
 
 
     # PUBLIC METHODS
 
     def startup(self):
-        # Claim hardware
-        self.h = lgpio.gpiochip_open(self.chip)
-        lgpio.gpio_claim_output(self.h, self.pin)
-
-        # Start the worker thread
-        self.thread = threading.Thread(target=self._pulse_worker, daemon=True)
-        self.thread.start()
+        # Claim hardware and start the pulse train
+        with self._lock:
+            self.pwm = self.hardware.pwm(self.pin, self.chip)
+            self.pwm.open()
+            self._update_pulse()
 
     def set_speed(self, speed):
         """
@@ -93,20 +97,22 @@ class Servo:
         """
         with self._lock:
             self._speed = float(speed) * self.direction
+            self._update_pulse()
 
     def stop(self):
         """Stop the servo and hold neutral."""
         self.set_speed(0.0)
 
     def shutdown(self):
-        """Clean up thread and GPIO."""
-        self._running = False
-        self.thread.join()
+        """Stop the pulses and release the GPIO."""
         self.stop()
-        # Send a few neutral pulses to settle
-        for _ in range(5):
-            lgpio.tx_pulse(self.h, self.pin, self.pulse_neutral, self.PERIOD - self.pulse_neutral)
-            time.sleep(0.02)
+        if self.pwm is None:
+            return
+        # Hold neutral for a few periods to settle
+        self.clock.sleep(5 * self.PERIOD / 1e6)
         # Close chip controller
-        lgpio.gpiochip_close(self.h)
+        with self._lock:
+            self.pwm.close()
+            self.pwm = None
+            self._pulse = None
         print("SERVO SHUT DOWN COMPLETE")
\ No newline at end of file
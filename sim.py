@@ -0,0 +1,534 @@
+# Simulated Hardware Backend
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import math
+import random
+import sys
+import threading
+import time
+
+
+# PRIVATE LIBRARIES
+from clock import RealClock, VirtualClock
+from encoder import Encoder
+from hal import START_CAMERA, START_SENSOR
+import arduino
+
+
+class SimWheel:
+    """
+    Continuous servo + wheel + seesaw encoder model.
+    The servo speed follows the commanded pulse width through a first-order
+    lag, the encoder reports whole ticks only (TICKS_PER_REV per revolution)
+    and ground travel loses a random fraction of the wheel rotation (slip).
+    """
+
+    # CONSTANTS
+
+    MAX_RPS = 0.9               # [rev/s] wheel speed at full pulse (~54 RPM)
+    TIME_CONSTANT = 0.08        # [s] motor response time constant
+    DEADBAND_US = 10            # [us] pulse band around neutral that does not move the servo
+
+
+    # CONSTRUCTOR
+
+    def __init__(self, gain: float = 1.0, slip: float = 0.0, rng=None,
+        pulse_neutral: int = 1500,  # [us] neutral/stop
+        pulse_span: int = 500       # [us] neutral to full speed
+    ):
+        self.gain = gain
+        self.slip = slip
+        self.rng = rng if rng is not None else random.Random(0)
+        self.pulse_neutral = pulse_neutral
+        self.pulse_span = pulse_span
+        # State
+        self.pulse_us = pulse_neutral
+        self.speed = 0.0            # [rev/s] wheel rotation speed
+        self.angle = 0.0            # [rev] total wheel rotation
+        self.travel = 0.0           # [rev] rotation that reached the ground
+        self.count_offset = 0       # encoder count written through the seesaw
+
+
+    # PUBLIC METHODS
+
+    def target_speed(self):
+        """Steady state wheel speed [rev/s] for the current pulse."""
+        error = self.pulse_us - self.pulse_neutral
+        if abs(error) <= self.DEADBAND_US:
+            return 0.0
+        frac = max(-1.0, min(1.0, error / self.pulse_span))
+        return frac * self.MAX_RPS * self.gain
+
+    def step(self, dt: float):
+        """Advance the wheel state by dt seconds."""
+        self.speed += (self.target_speed() - self.speed) * min(1.0, dt / self.TIME_CONSTANT)
+        rotation = self.speed * dt
+        self.angle += rotation
+        slip = self.rng.uniform(0.0, 2 * self.slip) if self.slip > 0 else 0.0
+        self.travel += rotation * (1.0 - slip)
+
+    def counts(self):
+        """Quantized encoder reading (whole ticks only)."""
+        return math.floor(self.angle * Encoder.TICKS_PER_REV) + self.count_offset
+
+    def set_counts(self, value: int):
+        """Overwrite the encoder count (same as writing seesaw position)."""
+        self.count_offset = value - math.floor(self.angle * Encoder.TICKS_PER_REV)
+
+
+class SimRobot:
+    """
+    Differential-drive robot model.
+    The left servo turns its wheel forward for positive speeds and the right
+    servo is mounted mirrored (positive speed drives it backward), matching
+    the direction settings used by Drive.
+    The model is advanced lazily up to clock.time() whenever it is touched.
+    """
+
+    # CONSTANTS
+
+    WHEEL_DIAMETER_IN = 2.64    # Wheel diameter in inches
+    WHEEL_BASE_IN = 8.5         # Space between wheel centers in inches
+    SUBSTEP = 0.001             # [s] integration step
+
+
+    # CONSTRUCTOR
+
+    def __init__(self, clock=None, left_gain: float = 1.0, right_gain: float = 1.0, slip: float = 0.0, seed: int = 0):
+        self.clock = clock if clock is not None else RealClock()
+        rng = random.Random(seed)
+        self.left = SimWheel(left_gain, slip, rng)
+        self.right = SimWheel(right_gain, slip, rng)
+        # Pose
+        self.x = 0.0                # [in]
+        self.y = 0.0                # [in]
+        self.heading = 0.0          # [rad] counter-clockwise positive
+        # Time keeping
+        self._last_time = self.clock.time()
+        self._lock = threading.RLock()
+
+
+    # PUBLIC METHODS
+
+    def advance(self):
+        """Integrate the model up to the current clock time."""
+        with self._lock:
+            now = self.clock.time()
+            while now - self._last_time > 1e-9:
+                dt = min(self.SUBSTEP, now - self._last_time)
+                self._step(dt)
+                self._last_time += dt
+
+    def pose(self):
+        """Returns (x, y, heading) of the robot."""
+        with self._lock:
+            self.advance()
+            return self.x, self.y, self.heading
+
+
+    # PRIVATE METHODS
+
+    def _step(self, dt: float):
+        left_travel = self.left.travel
+        right_travel = self.right.travel
+        self.left.step(dt)
+        self.right.step(dt)
+        circumference = math.pi * self.WHEEL_DIAMETER_IN
+        dl = (self.left.travel - left_travel) * circumference
+        dr = -(self.right.travel - right_travel) * circumference  # mirrored mount
+        ds = (dl + dr) / 2
+        self.heading += (dr - dl) / self.WHEEL_BASE_IN
+        self.x += ds * math.cos(self.heading)
+        self.y += ds * math.sin(self.heading)
+
+
+class SimPWM:
+    """PWM backend that feeds servo pulses into a SimWheel."""
+
+    def __init__(self, robot: SimRobot, wheel: SimWheel):
+        self.robot = robot
+        self.wheel = wheel
+
+    def open(self):
+        pass
+
+    def set_pulse(self, on_us: int, period_us: int = 20000):
+        with self.robot._lock:
+            self.robot.advance()
+            self.wheel.pulse_us = on_us
+
+    def close(self):
+        # No pulses -> continuous servo stops
+        with self.robot._lock:
+            self.robot.advance()
+            self.wheel.pulse_us = self.wheel.pulse_neutral
+
+
+class SimEncoder:
+    """Seesaw rotary encoder backend reading a SimWheel."""
+
+    def __init__(self, robot: SimRobot, wheel: SimWheel):
+        self.robot = robot
+        self.wheel = wheel
+
+    @property
+    def position(self):
+        with self.robot._lock:
+            self.robot.advance()
+            return self.wheel.counts()
+
+    @position.setter
+    def position(self, value):
+        with self.robot._lock:
+            self.robot.advance()
+            self.wheel.set_counts(value)
+
+
+class SimArduino:
+    """
+    Firmware model of arduino/program/program.ino.
+    Decodes the binary command frames and runs the job queue of each motor
+    independently (like the sketch's millis() job table); every reply is
+    scheduled at the time it would leave the board.
+    The serial line carries one byte per 10 bit times in each direction:
+    bytes queue behind the ones still being clocked out, so frames arrive
+    and replies are delivered no faster than the baud rate allows.
+    Parameters:
+    ----------
+    clock : Clock
+        Time source
+    baudrate : int
+        Serial line speed
+    """
+
+    # CONSTANTS
+
+    RESET_TIME = 1.5    # [s] bootloader delay before setup() prints "Arduino ready"
+    MOTORS = (1, 2, 3)
+    QUEUE_SIZE = 4      # jobs per motor (running + waiting)
+
+
+    # CONSTRUCTOR
+
+    def __init__(self, clock=None, baudrate: int = arduino.BAUDRATE):
+        self.clock = clock if clock is not None else RealClock()
+        self.byte_time = 10 / baudrate      # [s] start + 8 data + stop bits
+        self._rx_free = 0.0         # time the host -> board line finishes its last byte
+        self._tx_free = 0.0         # time the board -> host line finishes its last byte
+        self._ready = 0.0           # time setup() finishes
+        self._frame = b""           # partly received command frame
+        self._output = []           # [[time, bytes, seq]] in time order
+        self._jobs = {m: [] for m in self.MOTORS}     # motor -> [[seq, speed, start, end]] (end = inf until the next job)
+        self._lock = threading.Lock()
+
+
+    # PUBLIC METHODS
+
+    def boot(self):
+        """Reset the board (as happens when the serial port is opened)."""
+        with self._lock:
+            now = self.clock.time()
+            self._ready = now + self.RESET_TIME
+            self._frame = b""
+            self._rx_free = self._tx_free = now
+            self._output = [[self._ready, b"Arduino ready\r\n", None]]
+            self._jobs = {m: [] for m in self.MOTORS}
+
+    def receive(self, data: bytes, sent: float):
+        """Handle bytes put on the line at time sent (each arrives once the line has clocked it in)."""
+        with self._lock:
+            for byte in data:
+                self._rx_free = max(sent, self._rx_free) + self.byte_time
+                if not self._frame and byte != arduino.SYNC:
+                    continue    # resync on the next SYNC byte
+                self._frame += bytes([byte])
+                if len(self._frame) == arduino.COMMAND_FRAME.size:
+                    self._handle(self._frame, max(self._rx_free, self._ready))
+                    self._frame = b""
+
+    def speed(self, motor: int, now: float = None):
+        """Returns the speed a motor runs at (now by default)."""
+        now = self.clock.time() if now is None else now
+        with self._lock:
+            for _, speed, start, end in self._jobs[motor]:
+                if start <= now < end:
+                    return speed
+            return 0
+
+    def pop_output(self, now: float):
+        """Returns the next bytes fully received by the host at or before now, or None."""
+        with self._lock:
+            if self._output and self._delivery() <= now:
+                self._tx_free = self._delivery()
+                return self._output.pop(0)[1]
+            return None
+
+    def next_output_time(self):
+        """Returns the time the next pending output reaches the host, or None."""
+        with self._lock:
+            return self._delivery() if self._output else None
+
+
+    # PRIVATE METHODS
+
+    def _delivery(self):
+        """Time the next output has been clocked out, after the bytes before it (lock held)."""
+        t, data, _ = self._output[0]
+        return max(t, self._tx_free) + len(data) * self.byte_time
+
+    def _send(self, t: float, reply: int, seq: int, motor: int):
+        """Schedule a reply frame at time t (lock held)."""
+        self._output.append([t, arduino.encode_reply(reply, seq, motor), seq])
+        self._output.sort(key=lambda out: out[0])
+
+    def _handle(self, frame: bytes, t: float):
+        """Run one command frame that reaches setup()/loop() at time t (lock held)."""
+        _, opcode, seq, motor, speed, duration_ms, crc = arduino.COMMAND_FRAME.unpack(frame)
+        if arduino.crc8(frame[1:-1]) != crc:
+            self._send(t, arduino.RE_ERROR, seq, motor)
+        elif opcode == arduino.OP_MOTOR:
+            if motor not in self._jobs:
+                self._send(t, arduino.RE_ERROR, seq, motor)
+                return
+            jobs = self._jobs[motor] = [job for job in self._jobs[motor] if job[3] > t]
+            if len(jobs) == self.QUEUE_SIZE:
+                self._send(t, arduino.RE_ERROR, seq, motor)
+                return
+            start = t
+            if jobs:
+                # waits for the last job (a job without a duration ends when the next one starts)
+                last = jobs[-1]
+                if last[3] == math.inf:
+                    last[3] = start = max(t, last[2])
+                else:
+                    start = last[3]
+            end = start + duration_ms / 1000 if duration_ms > 0 else math.inf
+            jobs.append([seq, max(-255, min(255, speed)), start, end])
+            self._send(start, arduino.RE_ACK, seq, motor)
+            if duration_ms > 0:
+                self._send(end, arduino.RE_DONE, seq, motor)
+        elif opcode == arduino.OP_STOP:
+            for m in self.MOTORS:
+                if motor in (0, m):
+                    self._stop(m, t)
+            self._send(t, arduino.RE_ACK, seq, motor)
+        elif opcode == arduino.OP_PING:
+            self._send(t, arduino.RE_ACK, seq, motor)
+        elif opcode == arduino.OP_STATUS:
+            running = sum(1 << (m - 1) for m in self.MOTORS if any(j[2] <= t < j[3] for j in self._jobs[m]))
+            self._send(t, arduino.RE_STATUS, seq, running)
+        else:
+            self._send(t, arduino.RE_ERROR, seq, motor)
+
+    def _stop(self, motor: int, t: float):
+        """Stop a motor at time t and cancel its running and waiting jobs (lock held)."""
+        for seq, _, start, end in self._jobs[motor]:
+            if end <= t or (start <= t and end == math.inf):
+                continue    # finished (a job without a duration finished when it was acknowledged)
+            self._output = [out for out in self._output if not (out[2] == seq and out[0] > t)]
+            self._send(t, arduino.RE_CANCEL, seq, motor)
+        self._jobs[motor] = []
+
+
+class SimSerial:
+    """
+    pyserial-like port connected to a SimArduino.
+    Writes reach the firmware's serial line after the USB latency (the
+    firmware model clocks the bytes in at its baud rate).
+    """
+
+    # CONSTANTS
+
+    USB_LATENCY = 0.001     # [s] USB CDC transfer latency
+
+
+    # CONSTRUCTOR
+
+    def __init__(self, firmware: SimArduino, baudrate: int = arduino.BAUDRATE, timeout: float = 1, clock=None, reset: bool = True):
+        self.firmware = firmware
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.clock = clock if clock is not None else RealClock()
+        self.is_open = True
+        self._rx = b""
+        self._writes = 0            # wakes a blocked readline when a command may produce output sooner
+        self._cond = threading.Condition()
+        if reset:
+            self.firmware.boot()    # opening the port pulses DTR, which resets the board
+
+
+    # PUBLIC METHODS
+
+    def write(self, data: bytes):
+        self.firmware.receive(data, self.clock.time() + self.USB_LATENCY)
+        with self._cond:
+            self._writes += 1
+            self.clock.notify_all(self._cond)
+        return len(data)
+
+    @property
+    def in_waiting(self):
+        self._collect()
+        return len(self._rx)
+
+    def read(self, size: int = 1):
+        """Read up to size bytes (blocks up to timeout for the first one like pyserial)."""
+        deadline = self.clock.time() + (self.timeout if self.timeout is not None else math.inf)
+        while True:
+            self._collect()
+            if self._rx or self.clock.time() >= deadline:
+                data, self._rx = self._rx[:size], self._rx[size:]
+                return data
+            self._wait(deadline)
+
+    def readline(self):
+        """Read one line (blocks up to timeout like pyserial)."""
+        deadline = self.clock.time() + (self.timeout if self.timeout is not None else math.inf)
+        while True:
+            self._collect()
+            if b"\n" in self._rx:
+                line, self._rx = self._rx.split(b"\n", 1)
+                return line + b"\n"
+            if self.clock.time() >= deadline:
+                line, self._rx = self._rx, b""
+                return line
+            self._wait(deadline)
+
+    def close(self):
+        self.is_open = False
+
+
+    # PRIVATE METHODS
+
+    def _collect(self):
+        """Move bytes the firmware has sent so far into the receive buffer."""
+        while True:
+            data = self.firmware.pop_output(self.clock.time())
+            if data is None:
+                break
+            self._rx += data
+
+    def _wait(self, deadline: float):
+        """Sleep until the firmware sends more output, a write is made or deadline passes."""
+        now = self.clock.time()
+        next_time = self.firmware.next_output_time()
+        wake = deadline if next_time is None else min(deadline, next_time)
+        with self._cond:
+            writes = self._writes
+            self.clock.wait_for(self._cond, lambda: self._writes != writes, max(0.0, wake - now))
+
+
+class SimHardware:
+    """
+    Simulated hardware backend (drop-in replacement for hal.Hardware).
+    Parameters:
+    ----------
+    pin_left, pin_right : int
+        Servo GPIO pins driving the left/right wheel
+    addr_left, addr_right : int
+        Encoder I2C addresses on the left/right wheel
+    left_gain, right_gain : float
+        Servo speed scale for each wheel (models mismatched servos)
+    slip : float
+        Mean fraction of wheel rotation lost to slip
+    clock : Clock
+        Time source (a VirtualClock by default, so runs are faster than real time)
+    start_delay : float
+        Seconds until the simulated start light flashes
+    drone_time : float
+        Seconds the simulated drone flight takes
+    camera_time : float
+        Seconds the simulated camera takes to start
+    camera_latency : float
+        Seconds the camera takes to see the start light (the light sensor sees it at once)
+    pair_time : float
+        Seconds the simulated drone takes to pair
+    """
+
+    def __init__(self, pin_left: int = 13, pin_right: int = 12, addr_left: int = 0x37, addr_right: int = 0x36,
+        left_gain: float = 1.0, right_gain: float = 1.0, slip: float = 0.02, seed: int = 0, clock=None,
+        start_delay: float = 1.0, drone_time: float = 12.0, camera_time: float = 0.5, pair_time: float = 2.0,
+        camera_latency: float = 0.025
+    ):
+        self.clock = clock if clock is not None else VirtualClock()
+        self.start_delay = start_delay
+        self.drone_time = drone_time
+        self.camera_time = camera_time
+        self.camera_latency = camera_latency
+        self.pair_time = pair_time
+        self._camera = False
+        self._drone = False
+        self.robot = SimRobot(self.clock, left_gain, right_gain, slip, seed)
+        self.arduino = SimArduino(self.clock)
+        self._pins = {pin_left: self.robot.left, pin_right: self.robot.right}
+        self._addrs = {addr_left: self.robot.left, addr_right: self.robot.right}
+
+    def pwm(self, pin: int, chip: int = 0):
+        return SimPWM(self.robot, self._pins[pin])
+
+    def i2c(self):
+        return None
+
+    def encoder(self, address: int, i2c=None):
+        return SimEncoder(self.robot, self._addrs[address])
+
+    def serial(self, port: str, baudrate: int, timeout: float = 1, reset: bool = True):
+        return SimSerial(self.arduino, baudrate, timeout, self.clock, reset)
+
+    def prepare_start(self, trigger: str = START_CAMERA):
+        if trigger != START_SENSOR and not self._camera:
+            self.clock.sleep(self.camera_time)
+            self._camera = True
+
+    def wait_for_start(self, trigger: str = START_CAMERA, timeout: float = None):
+        if trigger == START_SENSOR:
+            if timeout is None or timeout >= self.start_delay:
+                self.clock.sleep(self.start_delay)
+                self._camera = False
+                return
+            self.clock.sleep(timeout)       # no light yet: the camera takes over
+        self.prepare_start()
+        self.clock.sleep(self.start_delay + self.camera_latency)
+        self._camera = False
+
+    def prepare_drone(self):
+        self.clock.sleep(self.pair_time)
+        self._drone = True
+
+    def fly_drone(self):
+        if not self._drone:
+            self.prepare_drone()
+        self._drone = False
+        self.clock.sleep(self.drone_time)
+
+
+# SIMULATION DEMO
+
+def main(argv=None):
+    """Replay the full Robot.run() mission in simulation: python3 sim.py [telemetry log file]"""
+    import contextlib
+    import io
+    from main import Robot, PIN_SERVO_LEFT, PIN_SERVO_RIGHT, ADDR_ENC_LEFT, ADDR_ENC_RIGHT
+    from telemetry import Telemetry, QUIET
+    argv = sys.argv[1:] if argv is None else argv
+    log_path = argv[0] if argv else None
+    hardware = SimHardware(PIN_SERVO_LEFT, PIN_SERVO_RIGHT, ADDR_ENC_LEFT, ADDR_ENC_RIGHT, left_gain=1.05)
+    telemetry = Telemetry(log_path, level=QUIET, clock=hardware.clock)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        robot = Robot(hardware, telemetry)
+        robot.run()
+    elapsed = time.perf_counter() - start
+    x, y, heading = hardware.robot.pose()
+    print(f"Mission time: {hardware.clock.time():.1f}s simulated in {elapsed:.2f}s")
+    print(f"Startup: {', '.join(f'{name} {t:.2f}s' for name, t in robot.startup.times().items())}")
+    print(f"Final pose: x={x:.2f}in y={y:.2f}in heading={math.degrees(heading):.1f}deg")
+    if log_path:
+        print(f"Telemetry: {len(telemetry.records())} records -> {log_path}")
+
+
+# If this file is executed as a script
+if __name__ == "__main__":
+    main()
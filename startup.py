@@ -0,0 +1,85 @@
+# Hardware Startup Library
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import threading
+
+
+# PRIVATE LIBRARIES
+from clock import MonotonicClock
+from tasks import run_async
+
+
+class Startup:
+    """
+    Brings up several devices at the same time.
+    Every add() starts the device's init function on its own thread right
+    away; wait() is the ready barrier, so the total startup time is that of
+    the slowest device instead of the sum of all of them.
+    Parameters:
+    ----------
+    clock : Clock
+        Time source (init times are measured on it)
+    """
+
+    # CONSTRUCTOR
+
+    def __init__(self, clock=None):
+        self.clock = clock if clock is not None else MonotonicClock()
+        self.start = self.clock.time()
+        self._tasks = {}        # name -> Task
+        self._times = {}        # name -> [s] init time
+        self._lock = threading.Lock()
+
+
+    # PUBLIC METHODS
+
+    def add(self, name: str, fn, *args, **kwargs):
+        """Start initializing a device with fn(*args, **kwargs). Returns its Task."""
+        task = run_async(self._init, name, fn, args, kwargs, clock=self.clock)
+        self._tasks[name] = task
+        return task
+
+    def wait(self, timeout: float = None):
+        """Ready barrier: block until every device is up. Returns False if one failed or timed out."""
+        deadline = None if timeout is None else self.clock.time() + timeout
+        ok = True
+        for task in self._tasks.values():
+            remaining = None if deadline is None else max(0.0, deadline - self.clock.time())
+            ok = task.wait(remaining) and task.exception(0) is None and ok
+        return ok
+
+    def result(self, name: str):
+        """Returns what a device's init function returned (re-raises its exception or TimeoutError)."""
+        return self._tasks[name].result(0)
+
+    def failed(self):
+        """Names of the devices whose init raised or has not finished."""
+        return [name for name, task in self._tasks.items() if not task.done() or task.exception(0) is not None]
+
+    def times(self):
+        """Returns {device name: init time [s]} of the devices that are up."""
+        with self._lock:
+            return dict(self._times)
+
+    def report(self):
+        """Print the init time of every device and the total time to ready."""
+        times = self.times()
+        for name in self._tasks:
+            if name in times:
+                print(f"  {name:<10} {times[name]:6.3f} s")
+            else:
+                print(f"  {name:<10} FAILED")
+        print(f"Ready after {self.clock.time() - self.start:.3f} s")
+
+
+    # PRIVATE METHODS
+
+    def _init(self, name: str, fn, args, kwargs):
+        """Run one device init and record how long it took."""
+        start = self.clock.time()
+        result = fn(*args, **kwargs)
+        with self._lock:
+            self._times[name] = self.clock.time() - start
+        return result
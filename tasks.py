@@ -0,0 +1,185 @@
+# Background Task Library
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import collections
+import threading
+
+
+# PRIVATE LIBRARIES
+from clock import MonotonicClock
+
+
+class Task:
+    """
+    Handle to a command running in the background.
+    Works like concurrent.futures.Future, but every wait goes through the
+    clock so tasks also run under a simulated clock.
+    """
+
+    # CONSTRUCTOR
+
+    def __init__(self, name: str = "", clock=None):
+        self.name = name
+        self.clock = clock if clock is not None else MonotonicClock()
+        self._done = False
+        self._result = None
+        self._error = None
+        self._callbacks = []
+        self._cond = threading.Condition()
+
+
+    # PUBLIC METHODS
+
+    def done(self):
+        """True once the command has finished (or failed)."""
+        with self._cond:
+            return self._done
+
+    def wait(self, timeout: float = None):
+        """Block until the command finishes. Returns False on timeout."""
+        with self._cond:
+            return self.clock.wait_for(self._cond, lambda: self._done, timeout)
+
+    def result(self, timeout: float = None):
+        """Wait for the command and return its result (re-raises its exception)."""
+        if not self.wait(timeout):
+            raise TimeoutError(f"Task {self.name} did not finish within {timeout} s")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def exception(self, timeout: float = None):
+        """Wait for the command and return its exception (None if it succeeded)."""
+        if not self.wait(timeout):
+            raise TimeoutError(f"Task {self.name} did not finish within {timeout} s")
+        return self._error
+
+    def add_done_callback(self, callback):
+        """Call callback(task) when the command finishes (right away if it already has)."""
+        with self._cond:
+            if not self._done:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+
+    # PRIVATE METHODS
+
+    def _run(self, fn, args, kwargs):
+        """Run the command and store its outcome."""
+        result, error = None, None
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            error = e
+            print(f"Task {self.name} failed: {e!r}")
+        self._finish(result, error)
+
+    def _finish(self, result=None, error: Exception = None):
+        """Store the outcome and wake the waiters (first call wins)."""
+        with self._cond:
+            if self._done:
+                return False
+            self._result, self._error, self._done = result, error, True
+            self.clock.notify_all(self._cond)
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+        return True
+
+
+class CommandQueue:
+    """
+    Runs submitted commands one at a time, in order, on a worker thread.
+    submit() returns a Task right away, so the caller can do other work
+    (or queue more commands) while the device is busy.
+    Parameters:
+    ----------
+    clock : Clock
+        Time source
+    name : str
+        Name used in task names and messages
+    """
+
+    # CONSTRUCTOR
+
+    def __init__(self, clock=None, name: str = "commands"):
+        self.clock = clock if clock is not None else MonotonicClock()
+        self.name = name
+        self._queue = collections.deque()   # [(task, fn, args, kwargs)]
+        self._busy = False
+        self._running = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+
+    # PUBLIC METHODS
+
+    def start(self):
+        """Start the worker thread."""
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._worker, daemon=True)
+            self.clock.register(self._thread)
+            self._thread.start()
+
+    def stop(self):
+        """Finish the queued commands, then stop the worker thread."""
+        with self._cond:
+            self._running = False
+            self.clock.notify_all(self._cond)
+        if self._thread:
+            self.clock.join(self._thread)
+            self._thread = None
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs). Returns its Task."""
+        task = Task(f"{self.name}:{getattr(fn, '__name__', 'command')}", self.clock)
+        with self._cond:
+            if not self._running:
+                raise RuntimeError(f"Command queue {self.name} is not running")
+            self._queue.append((task, fn, args, kwargs))
+            self.clock.notify_all(self._cond)
+        return task
+
+    def pending(self):
+        """Number of commands queued or running."""
+        with self._cond:
+            return len(self._queue) + (1 if self._busy else 0)
+
+    def wait_idle(self, timeout: float = None):
+        """Block until every queued command has finished. Returns False on timeout."""
+        with self._cond:
+            return self.clock.wait_for(self._cond, lambda: not self._queue and not self._busy, timeout)
+
+
+    # PRIVATE METHODS
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                self.clock.wait_for(self._cond, lambda: self._queue or not self._running)
+                if not self._queue:
+                    return
+                task, fn, args, kwargs = self._queue.popleft()
+                self._busy = True
+            task._run(fn, args, kwargs)
+            with self._cond:
+                self._busy = False
+                self.clock.notify_all(self._cond)
+
+
+def run_async(fn, *args, clock=None, **kwargs):
+    """Run fn(*args, **kwargs) on its own thread. Returns its Task."""
+    task = Task(getattr(fn, "__name__", "task"), clock)
+    thread = threading.Thread(target=task._run, args=(fn, args, kwargs), daemon=True)
+    task.clock.register(thread)
+    thread.start()
+    return task
+
+
+def wait_all(tasks, timeout: float = None):
+    """Wait for every task (None entries are skipped). Returns their results."""
+    return [task.result(timeout) for task in tasks if task is not None]
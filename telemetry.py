@@ -0,0 +1,324 @@
+# Telemetry Library
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import argparse
+import math
+import os
+import struct
+import sys
+import threading
+import numpy as np
+
+
+# PRIVATE LIBRARIES
+from clock import MonotonicClock
+
+
+# LOG LEVELS (console output only, telemetry is always recorded)
+QUIET = 0       # no console writes (production runs)
+INFO = 1        # one line per move / state change
+DEBUG = 2       # one line per control cycle (slow on the Pi console)
+
+# RECORD SOURCES
+MOVE_FORWARD = 0    # Drive.move_forward
+TURN = 1            # Drive.turn
+WHEEL_LEFT = 2      # DriveWheel (direction = 1)
+WHEEL_RIGHT = 3     # DriveWheel (direction = -1)
+SOURCE_NAMES = {MOVE_FORWARD: "move_forward", TURN: "turn", WHEEL_LEFT: "wheel_left", WHEEL_RIGHT: "wheel_right"}
+
+# One record per control cycle
+RECORD = np.dtype([
+    ("time", "<f8"),            # [s] clock time of the cycle
+    ("source", "u1"),           # one of the record sources above
+    ("call", "<u4"),            # move number (increments on every move_forward/turn)
+    ("target", "<i4"),          # target ticks
+    ("left_ticks", "<i4"),      # left encoder position
+    ("right_ticks", "<i4"),     # right encoder position
+    ("p", "<f4"),               # PID terms
+    ("i", "<f4"),
+    ("d", "<f4"),
+    ("left_speed", "<f4"),      # servo speed commands (NaN = servo stopped)
+    ("right_speed", "<f4"),
+])
+
+# LOG FILE FORMAT
+#   magic      4 bytes  b"MRTL"
+#   version    uint16   FORMAT_VERSION
+#   size       uint32   bytes per record
+#   length     uint32   bytes of schema text
+#   schema     text     "name:type,..." (NumPy type strings of the record fields)
+#   padding    zeros up to a multiple of 8 bytes
+#   records    fixed-size little-endian records until the end of the file
+MAGIC = b"MRTL"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHII")
+
+
+class Telemetry:
+    """
+    Preallocated ring buffer of control loop records.
+    record() only stores numbers into a NumPy array (no formatting or I/O);
+    a background thread appends new records to a binary log file.
+    Parameters:
+    ----------
+    path : str
+        Binary log file, replaced by start() (None = keep the records in memory only)
+    capacity : int
+        Number of records in the ring buffer
+    level : int
+        Console log level (QUIET, INFO or DEBUG)
+    clock : Clock
+        Time source for the record timestamps and the flusher
+    """
+
+    # CONSTANTS
+
+    CAPACITY = 1 << 16          # records (~3 MB, several minutes of driving)
+    FLUSH_PERIOD = 0.5          # [s] time between writes to the log file
+
+
+    # CONSTRUCTOR
+
+    def __init__(self, path: str = None, capacity: int = CAPACITY, level: int = INFO, clock=None):
+        self.path = path
+        self.capacity = capacity
+        self.level = level
+        self.clock = clock if clock is not None else MonotonicClock()
+        # Ring buffer
+        self._buf = np.zeros(capacity, dtype=RECORD)
+        self._head = 0          # total records written
+        self._tail = 0          # total records flushed to the file
+        self.dropped = 0        # records overwritten before they were flushed
+        self._lock = threading.Lock()
+        # Flusher thread
+        self._file = None
+        self._running = False
+        self._thread = None
+
+
+    # PUBLIC METHODS
+
+    def start(self):
+        """Open the log file and start the background flusher."""
+        if self.path is None or self._running:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "wb")      # one run per file: analyze() numbers moves per run
+        self._file.write(encode_header(RECORD))
+        self._running = True
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self.clock.register(self._thread)
+        self._thread.start()
+
+    def close(self):
+        """Stop the flusher and write the remaining records."""
+        self._running = False
+        if self._thread:
+            self.clock.join(self._thread)
+            self._thread = None
+        if self._file:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def record(self, source: int, call: int, target: int, left_ticks: int, right_ticks: int,
+               p: float, i: float, d: float, left_speed: float, right_speed: float):
+        """Store one control cycle (None speeds are stored as NaN)."""
+        if left_speed is None:
+            left_speed = math.nan
+        if right_speed is None:
+            right_speed = math.nan
+        with self._lock:
+            self._buf[self._head % self.capacity] = (self.clock.time(), source, call, target, left_ticks,
+                                                     right_ticks, p, i, d, left_speed, right_speed)
+            self._head += 1
+
+    def log(self, level: int, message: str):
+        """Print a console message if the log level allows it."""
+        if self.level >= level:
+            print(message)
+
+    def records(self):
+        """Returns a copy of the records still in the buffer (oldest first)."""
+        with self._lock:
+            start = max(0, self._head - self.capacity)
+            return self._copy(start, self._head)
+
+    def flush(self):
+        """Append the records written since the last flush to the log file."""
+        with self._lock:
+            start = self._tail
+            if self._head - start > self.capacity:
+                self.dropped += self._head - start - self.capacity
+                start = self._head - self.capacity
+            chunk = self._copy(start, self._head)
+            self._tail = self._head
+        if self._file and len(chunk):
+            self._file.write(chunk.tobytes())
+            self._file.flush()
+
+
+    # PRIVATE METHODS
+
+    def _copy(self, start: int, end: int):
+        """Copy records start..end (total counts) out of the ring (lock held)."""
+        a = start % self.capacity
+        b = a + (end - start)
+        if b <= self.capacity:
+            return self._buf[a:b].copy()
+        return np.concatenate((self._buf[a:], self._buf[:b - self.capacity]))
+
+    def _flush_loop(self):
+        while self._running:
+            self.clock.sleep(self.FLUSH_PERIOD)
+            self.flush()
+
+
+# LOG FILE FORMAT
+
+def encode_header(dtype: np.dtype = RECORD):
+    """Returns the log file header describing records of the given dtype."""
+    schema = ",".join(f"{name}:{dtype.fields[name][0].str}" for name in dtype.names).encode()
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, dtype.itemsize, len(schema)) + schema
+    return header + bytes(-len(header) % 8)
+
+
+def decode_header(data: bytes):
+    """Returns (version, record dtype, header size) of a log file header."""
+    magic, version, size, length = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a telemetry log (bad magic)")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Telemetry log version {version} is newer than this reader ({FORMAT_VERSION})")
+    schema = data[HEADER.size:HEADER.size + length].decode()
+    dtype = np.dtype([tuple(field.split(":")) for field in schema.split(",")])
+    if dtype.itemsize != size:
+        raise ValueError("Telemetry log schema does not match its record size")
+    offset = HEADER.size + length
+    return version, dtype, offset + (-offset % 8)
+
+
+def read(path: str):
+    """
+    Open a telemetry log as a read-only memory-mapped record array.
+    Nothing is parsed or copied: pages are loaded as the records are used.
+    """
+    with open(path, "rb") as f:
+        data = f.read(4096)
+    _, dtype, offset = decode_header(data)
+    count = (os.path.getsize(path) - offset) // dtype.itemsize    # ignore a partly written last record
+    if count <= 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+
+# ANALYSIS
+
+def analyze(records):
+    """
+    Step response metrics of every move_forward/turn call in a log.
+    Records with both speeds NaN are taken with the servos stopped (the
+    stop sample and the rest position recorded before the next move).
+    Returns one dict per call with:
+        duration    [s] first control cycle until both servos were stopped
+        overshoot   [ticks] furthest either wheel went past the target (coasting included)
+        settle      [s] time until both wheels stay within 1 tick of the target (NaN if never)
+        divergence  [ticks] largest left/right tick difference
+        period      [s] mean control period
+        jitter      [s] largest deviation of a control period from the median period
+    """
+    moves = records[(records["source"] == MOVE_FORWARD) | (records["source"] == TURN)]
+    results = []
+    for call in np.unique(moves["call"]):
+        m = moves[moves["call"] == call]
+        t = m["time"]
+        target = int(m["target"][0])
+        left = m["left_ticks"].astype(np.int64)
+        right = m["right_ticks"].astype(np.int64)
+        # Overshoot in the direction of travel
+        sign = 1 if target >= 0 else -1
+        overshoot = max(0, int(max((left - target).max() * sign, (right - target).max() * sign,
+                                   (left - target).min() * sign, (right - target).min() * sign)))
+        # Settle time: first cycle after the last one outside the 1 tick band
+        error = np.maximum(np.abs(left - target), np.abs(right - target))
+        outside = np.nonzero(error > 1)[0]
+        if len(outside) == 0:
+            settle = 0.0
+        elif outside[-1] + 1 < len(t):
+            settle = t[outside[-1] + 1] - t[0]
+        else:
+            settle = math.nan
+        # Control loop timing (only the cycles that ran on control deadlines)
+        stopped = np.isnan(m["left_speed"]) & np.isnan(m["right_speed"])
+        dt = np.diff(t[~stopped])
+        results.append({
+            "call": int(call),
+            "kind": SOURCE_NAMES[int(m["source"][0])],
+            "target": target,
+            "duration": t[stopped][0] - t[0] if stopped.any() else t[-1] - t[0],
+            "overshoot": overshoot,
+            "settle": settle,
+            "divergence": int(np.abs(left - right).max()),
+            "period": dt.mean() if len(dt) else math.nan,
+            "jitter": np.abs(dt - np.median(dt)).max() if len(dt) else math.nan,
+        })
+    return results
+
+
+# COMMAND LINE
+
+def dump(path: str):
+    """Print every record of a log."""
+    for r in read(path):
+        print(f"{r['time']:10.3f}  {SOURCE_NAMES.get(int(r['source']), r['source']):>12} #{r['call']:<3}"
+              f"  target: {r['target']:5d}  Lt: {r['left_ticks']:5d}  Rt: {r['right_ticks']:5d}"
+              f"  P: {r['p']:+.3f}  I: {r['i']:+.3f}  D: {r['d']:+.3f}"
+              f"  Ls: {r['left_speed']:+.3f}  Rs: {r['right_speed']:+.3f}")
+
+
+def report(paths):
+    """Print the per-move metrics of each log and a one line summary per log (to compare runs)."""
+    summary = []
+    for path in paths:
+        results = analyze(read(path))
+        print(f"{path}")
+        print(f"  {'call':>4} {'kind':>12} {'target':>6} {'time[s]':>8} {'over':>5} {'settle[s]':>9} {'div':>4} {'period[ms]':>10} {'jitter[ms]':>10}")
+        for r in results:
+            print(f"  {r['call']:>4} {r['kind']:>12} {r['target']:>6} {r['duration']:>8.2f} {r['overshoot']:>5} "
+                  f"{r['settle']:>9.2f} {r['divergence']:>4} {r['period'] * 1000:>10.2f} {r['jitter'] * 1000:>10.2f}")
+        if results:
+            summary.append((path, len(results),
+                            np.mean([r["overshoot"] for r in results]),
+                            np.nanmean([r["settle"] for r in results]),
+                            max(r["divergence"] for r in results),
+                            np.nanmax([r["jitter"] for r in results])))
+    if len(summary) > 1:
+        print(f"\n{'log':<40} {'moves':>5} {'over':>6} {'settle[s]':>9} {'div':>4} {'jitter[ms]':>10}")
+        for path, moves, overshoot, settle, divergence, jitter in summary:
+            print(f"{path:<40} {moves:>5} {overshoot:>6.2f} {settle:>9.2f} {divergence:>4} {jitter * 1000:>10.2f}")
+
+
+def main(argv=None):
+    """
+    python3 telemetry.py dump <log file>
+    python3 telemetry.py analyze <log file> [<log file> ...]
+    """
+    parser = argparse.ArgumentParser(description="Decode and analyze drive telemetry logs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("dump", help="print every record").add_argument("log")
+    commands.add_parser("analyze", help="overshoot, settle time, divergence and jitter per move").add_argument("logs", nargs="+")
+    args = parser.parse_args(argv)
+    if args.command == "dump":
+        dump(args.log)
+    else:
+        report(args.logs)
+    return 0
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,22 @@
 import cv2
 import math
-from itertools import combinations
-from picamera2 import Picamera2
+import os
+import sys
+import time
 from codrone_edu.drone import *
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from camera import Camera, CameraFrame
+from estimator import PoseFilter
+from pipeline import Pipeline
+from vision import IMAGE_HEIGHT, MarkerDetector, RoiTracker, draw, draw_crosshair, draw_roi
+
 drone = Drone()
 drone.pair()
 
-picam2 = Picamera2()
-picam2.configure(picam2.create_preview_configuration(main={"format": "XRGB8888", "size": (640, 480)}))
-picam2.start()
-
-FRONT_WIDTH = 24
-FOCAL_LENGTH = 3.04
-SENSOR_WIDTH = 3.68
-IMAGE_WIDTH = 640
-IMAGE_HEIGHT = 480
+camera = Camera().start()
 
-lower_green = (80, 45, 135)
-upper_green = (100, 255, 255)
-lower_red1 = (0, 60, 70)
-upper_red1 = (20, 255, 255)
-lower_red2 = (160, 60, 70)
-upper_red2 = (180, 255, 255)
+detector = MarkerDetector()
 
 # Centering parameters
 CENTERING_THRESHOLD = 50  # pixels - how close to center is "good enough" (expanded)
@@ -50,7 +44,8 @@ cv2.namedWindow('LED Tracker')
 print("Camera feed active. Press 't' when ready to takeoff...")
 takeoff_done = False
 while not takeoff_done:
-    frame = picam2.capture_array()
+    with camera.capture() as image:
+        frame = image.yuv.bgr()
     cv2.putText(frame, "Press 't' to TAKEOFF", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
     cv2.imshow('LED Tracker', frame)
     key = cv2.waitKey(1) & 0xFF
@@ -60,172 +55,137 @@ while not takeoff_done:
     elif key == ord('q'):
         drone.close()
         cv2.destroyAllWindows()
-        picam2.stop()
+        camera.stop()
         exit()
 
 print("Taking off...")
 drone.takeoff()
 drone.hover(2)
 drone.send_absolute_position(0,0,1,1,0,0)
+# State shared by the display loop (keys, drawing) and the control thread
 landing_mode = False
 low_alt_strikes = LOW_ALT_STRIKES
 should_exit = False
+current_height = None
+
+
+# Search a window around the predicted LEDs (full frame when lost)
+tracker = RoiTracker(detector)
+
+# Filtered drone pose (smooths the detections, coasts through short dropouts)
+pose = PoseFilter()
+
+
+def process(image):
+    """Vision stage: find the LEDs and the target."""
+    markers = tracker.detect(image.yuv)
+    return markers, markers.target(), tracker.roi
+
+
+def control(frame):
+    """Control stage: center over the target from the freshest processed frame and descend."""
+    global low_alt_strikes, should_exit, current_height
+    _, target, _ = frame.result
+    pose.update(frame.time, target)
+    if not landing_mode or should_exit:
+        return
+    # Pose now (the last go() may have taken a while since the capture)
+    target = pose.estimate(time.monotonic())
+    if target is None:
+        return
+    distance = target.distance
+    offset_x = target.offset_x
+    offset_y = target.offset_y
+    yaw = target.yaw
+    status = "CENTERED" if (abs(offset_x) < CENTERING_THRESHOLD and 
+                           abs(offset_y) < CENTERING_THRESHOLD and 
+                           abs(yaw) < YAW_THRESHOLD) else "ADJUSTING"
+    
+    # Check height and emergency stop if too low
+    current_height = drone.get_height()
+    
+    # Only check height if it's a valid reading (not 0)
+    if current_height > 0 and current_height < MIN_HEIGHT:
+        low_alt_strikes -= 1
+        print(f"HEIGHT LOW ({current_height}cm) - Strikes remaining: {low_alt_strikes}")
+        if low_alt_strikes <= 0:
+            print("EMERGENCY STOP!")
+            drone.emergency_stop()
+            should_exit = True
+            return
+    else:
+        low_alt_strikes = LOW_ALT_STRIKES
+    
+    print(f"Distance: {distance:.1f}mm | X: {offset_x:.1f}px | Y: {offset_y:.1f}px | Yaw: {yaw:.1f}° | Height: {current_height}cm | {status}")
+    
+    if status == "CENTERED":
+        print("CENTERED - Landing now!")
+        drone.land()
+        should_exit = True
+        return
+    
+    # Calculate position adjustments in meters
+    move_right = offset_x * POSITION_GAIN    # right/left in meters
+    move_forward = offset_y * POSITION_GAIN  # forward/back in meters
+    turn_angle = -yaw * YAW_GAIN             # yaw correction
+    
+    # Convert meters to go() duration (seconds at BASE_POWER)
+    # 1 second at 20% = 0.1m, so duration = distance / 0.1
+    duration_right = abs(move_right) / 0.1
+    duration_forward = abs(move_forward) / 0.1
+    
+    # Apply movements using go(direction, power, duration)
+    # (frames captured meanwhile are dropped, the next correction uses a fresh one)
+    if abs(move_forward) > 0.01:  # threshold 1cm
+        direction = "forward" if move_forward < 0 else "backward"
+        drone.go(direction, BASE_POWER, duration_forward)
+    
+    if abs(move_right) > 0.01:  # threshold 1cm
+        direction = "right" if move_right < 0 else "left"
+        drone.go(direction, BASE_POWER, duration_right)
+    
+    if abs(turn_angle) > 1:  # threshold 1 degree
+        drone.turn(turn_angle)
+    
+    # Only descend if target is detected and reasonably close to center
+    total_offset = math.sqrt(offset_x**2 + offset_y**2)
+    if total_offset < DESCENT_THRESHOLD:
+        drone.go("down", DESCENT_POWER, DESCENT_DURATION)
+        print(f"descending {DESCENT_DURATION}s (offset: {total_offset:.1f}px)")
+
+
+# Capture, vision and control run on their own threads; display stays here
+pipeline = Pipeline(camera.capture, process, control, release=CameraFrame.release)
+pipeline.start()
 
 try:
     while True:
-        frame = picam2.capture_array()
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        
-        green_mask = cv2.inRange(hsv, lower_green, upper_green)
-        red_mask1 = cv2.inRange(hsv, lower_red1, upper_red1)
-        red_mask2 = cv2.inRange(hsv, lower_red2, upper_red2)
-        red_mask = cv2.bitwise_or(red_mask1, red_mask2)
-        
-        green_contours, _ = cv2.findContours(green_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        red_contours, _ = cv2.findContours(red_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # Find all green LEDs with area (brightness proxy)
-        green_candidates = []
-        for c in green_contours:
-            area = cv2.contourArea(c)
-            if area > 50:
-                M = cv2.moments(c)
-                if M["m00"] > 0:
-                    cx = int(M["m10"] / M["m00"])
-                    cy = int(M["m01"] / M["m00"])
-                    green_candidates.append((cx, cy, area))
-        
-        # Keep only the two strongest (largest area) green LEDs
-        green_candidates.sort(key=lambda x: x[2], reverse=True)
-        green_centers = [(x, y) for x, y, _ in green_candidates[:2]]
-        for cx, cy in green_centers:
-            cv2.circle(frame, (cx, cy), 5, (0, 255, 0), -1)
-        
-        # Find all red LEDs with area (brightness proxy)
-        red_candidates = []
-        for c in red_contours:
-            area = cv2.contourArea(c)
-            if area > 50:
-                M = cv2.moments(c)
-                if M["m00"] > 0:
-                    cx = int(M["m10"] / M["m00"])
-                    cy = int(M["m01"] / M["m00"])
-                    red_candidates.append((cx, cy, area))
-        
-        # Keep only the two strongest (largest area) red LEDs
-        red_candidates.sort(key=lambda x: x[2], reverse=True)
-        red_centers = [(x, y) for x, y, _ in red_candidates[:2]]
-        for cx, cy in red_centers:
-            cv2.circle(frame, (cx, cy), 5, (0, 0, 255), -1)
-        
-        # Draw center crosshairs
-        cv2.line(frame, (IMAGE_WIDTH // 2 - 20, IMAGE_HEIGHT // 2), 
-                (IMAGE_WIDTH // 2 + 20, IMAGE_HEIGHT // 2), (255, 0, 255), 2)
-        cv2.line(frame, (IMAGE_WIDTH // 2, IMAGE_HEIGHT // 2 - 20), 
-                (IMAGE_WIDTH // 2, IMAGE_HEIGHT // 2 + 20), (255, 0, 255), 2)
-        cv2.circle(frame, (IMAGE_WIDTH // 2, IMAGE_HEIGHT // 2), 
-                  CENTERING_THRESHOLD, (255, 0, 255), 2)
-        
-        target_detected = False
-        offset_x = 0
-        offset_y = 0
-        yaw = 0
+        result = pipeline.latest(timeout=1.0)
+        if result is None:
+            continue
+        frame = result.image.yuv.bgr()
+        markers, target, roi = result.result
+        draw(frame, markers, target)
+        draw_roi(frame, roi)
+        draw_crosshair(frame, CENTERING_THRESHOLD)
         
-        if len(green_centers) >= 2 and len(red_centers) >= 2:
-            target_detected = True
-            all_points = green_centers + red_centers
-            
-            for i, pt in enumerate(all_points):
-                for j in range(i + 1, len(all_points)):
-                    cv2.line(frame, pt, all_points[j], (255, 255, 0), 1)
-            
-                pixel_width = math.sqrt((green_centers[0][0] - green_centers[1][0])**2 + 
-                                       (green_centers[0][1] - green_centers[1][1])**2)
-            
-                if pixel_width > 0:
-                    distance = (FRONT_WIDTH * FOCAL_LENGTH * IMAGE_WIDTH) / (pixel_width * SENSOR_WIDTH)
-                    avg_x = sum(p[0] for p in all_points) / 4
-                    avg_y = sum(p[1] for p in all_points) / 4
-                    offset_x = avg_x - IMAGE_WIDTH / 2
-                    offset_y = 240 - avg_y
-                    
-                    front_center_x = (green_centers[0][0] + green_centers[1][0]) / 2
-                    rear_center_x = (red_centers[0][0] + red_centers[1][0]) / 2
-                    front_center_y = (green_centers[0][1] + green_centers[1][1]) / 2
-                    rear_center_y = (red_centers[0][1] + red_centers[1][1]) / 2
-                    yaw = math.degrees(math.atan2(rear_center_x - front_center_x, 
-                                                 front_center_y - rear_center_y))
-                    
-                    # Draw target center
-                    cv2.circle(frame, (int(avg_x), int(avg_y)), 10, (0, 255, 255), 2)
-                    
-                    # Display status
-                    status = "CENTERED" if (abs(offset_x) < CENTERING_THRESHOLD and 
-                                           abs(offset_y) < CENTERING_THRESHOLD and 
-                                           abs(yaw) < YAW_THRESHOLD) else "ADJUSTING"
-                    cv2.putText(frame, status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
-                               1, (0, 255, 0) if status == "CENTERED" else (0, 165, 255), 2)
-                    
-                    # Landing mode: adjust position to center
-                    if landing_mode:
-                        # Check height and emergency stop if too low
-                        current_height = drone.get_height()
-                        
-                        # Display height on screen
-                        cv2.putText(frame, f"Height: {current_height}cm", (10, IMAGE_HEIGHT - 100), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                        
-                        # Only check height if it's a valid reading (not 0)
-                        if current_height > 0 and current_height < MIN_HEIGHT:
-                            low_alt_strikes -= 1
-                            print(f"HEIGHT LOW ({current_height}cm) - Strikes remaining: {low_alt_strikes}")
-                            if low_alt_strikes <= 0:
-                                print("EMERGENCY STOP!")
-                                drone.emergency_stop()
-                                should_exit = True
-                        else:
-                            low_alt_strikes = LOW_ALT_STRIKES
-                        
-                        print(f"Distance: {distance:.1f}mm | X: {offset_x:.1f}px | Y: {offset_y:.1f}px | Yaw: {yaw:.1f}° | Height: {current_height}cm | {status}")
-                        
-                        if abs(offset_x) < CENTERING_THRESHOLD and abs(offset_y) < CENTERING_THRESHOLD and abs(yaw) < YAW_THRESHOLD:
-                            print("CENTERED - Landing now!")
-                            drone.land()
-                            should_exit = True
-                        else:
-                            # Calculate position adjustments in meters
-                            move_right = offset_x * POSITION_GAIN    # right/left in meters
-                            move_forward = offset_y * POSITION_GAIN  # forward/back in meters
-                            turn_angle = -yaw * YAW_GAIN             # yaw correction
-                            
-                            # Convert meters to go() duration (seconds at BASE_POWER)
-                            # 1 second at 20% = 0.1m, so duration = distance / 0.1
-                            duration_right = abs(move_right) / 0.1
-                            duration_forward = abs(move_forward) / 0.1
-                            
-                            # Apply movements using go(direction, power, duration)
-                            if abs(move_forward) > 0.01:  # threshold 1cm
-                                direction = "forward" if move_forward < 0 else "backward"
-                                drone.go(direction, BASE_POWER, duration_forward)
-                            
-                            if abs(move_right) > 0.01:  # threshold 1cm
-                                direction = "right" if move_right < 0 else "left"
-                                drone.go(direction, BASE_POWER, duration_right)
-                            
-                            if abs(turn_angle) > 1:  # threshold 1 degree
-                                drone.turn(turn_angle)
-                            
-                            # Only descend if target is detected and reasonably close to center
-                            total_offset = math.sqrt(offset_x**2 + offset_y**2)
-                            if total_offset < DESCENT_THRESHOLD:
-                                drone.go("down", DESCENT_POWER, DESCENT_DURATION)
-                                print(f"descending {DESCENT_DURATION}s (offset: {total_offset:.1f}px)")
+        if target is not None:
+            # Display status
+            status = "CENTERED" if (abs(target.offset_x) < CENTERING_THRESHOLD and 
+                                   abs(target.offset_y) < CENTERING_THRESHOLD and 
+                                   abs(target.yaw) < YAW_THRESHOLD) else "ADJUSTING"
+            cv2.putText(frame, status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
+                       1, (0, 255, 0) if status == "CENTERED" else (0, 165, 255), 2)
         
         if landing_mode:
+            # Display height on screen
+            if current_height is not None:
+                cv2.putText(frame, f"Height: {current_height}cm", (10, IMAGE_HEIGHT - 100), 
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
             mode_text = "LANDING MODE"
             cv2.putText(frame, mode_text, (10, IMAGE_HEIGHT - 20), 
                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-            if not target_detected:
+            if pose.estimate(time.monotonic()) is None:
                 cv2.putText(frame, "TARGET LOST!", (10, IMAGE_HEIGHT - 60), 
                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
         
@@ -239,6 +199,8 @@ try:
             break
         elif key == ord('e'):
             print("EMERGENCY STOP!")
+            should_exit = True
+            pipeline.stop()     # no go() from the control thread after the stop
             drone.emergency_stop()
             break
         elif key == ord('l') and not landing_mode:
@@ -247,9 +209,16 @@ try:
 
 except KeyboardInterrupt:
     print("Interrupted - Emergency stop!")
+    should_exit = True
+    pipeline.stop()
     drone.emergency_stop()
 finally:
     print("Cleaning up...")
+    should_exit = True
+    pipeline.stop()
+    pipeline.report()
+    tracker.report()
+    pose.report()
     drone.close()
     cv2.destroyAllWindows()
-    picam2.stop()
+    camera.stop()
@@ -0,0 +1,50 @@
+# Clock test
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import threading
+import time
+
+
+# PRIVATE LIBRARIES
+from clock import MonotonicClock, VirtualClock
+
+
+def test1():
+    """Virtual sleeps from several threads wake in time order without waiting."""
+    clock = VirtualClock()
+    wakeups = []
+
+    def worker(period, count):
+        for _ in range(count):
+            clock.sleep(period)
+            wakeups.append(round(clock.time(), 6))
+
+    threads = [threading.Thread(target=worker, args=(0.5, 4)), threading.Thread(target=worker, args=(0.3, 4))]
+    start = time.perf_counter()
+    for t in threads:
+        clock.register(t)
+        t.start()
+    for t in threads:
+        clock.join(t)
+    elapsed = time.perf_counter() - start
+
+    print(f"Wakeups: {wakeups} ({elapsed:.3f}s real)")
+    assert wakeups == sorted(wakeups)
+    assert clock.time() == 2.0
+    assert elapsed < 1.0
+
+
+def test2():
+    """Monotonic clock sleeps for real."""
+    clock = MonotonicClock()
+    start = clock.time()
+    clock.sleep(0.05)
+    assert clock.time() - start >= 0.05
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    test1()
+    test2()
@@ -0,0 +1,58 @@
+# Arduino Emulator test
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import time
+
+
+# PRIVATE LIBRARIES
+from emulator import ArduinoEmulator, benchmark
+import arduino
+from arduino import Arduino, Command
+from hal import Hardware
+
+
+def test1():
+    """The driver talks to the emulated board over a real serial port."""
+    emulator = ArduinoEmulator()
+    port = emulator.start()
+    try:
+        start = time.perf_counter()
+        link = Arduino(port, hardware=Hardware())
+        print(f"Ready after {(time.perf_counter() - start) * 1000:.1f} ms")
+        assert time.perf_counter() - start < 2.0      # ready message, not a fixed delay
+        assert link.read_response() == "Arduino ready"
+        link.ping().result(timeout=1.0)
+        # timed jobs take as long as on the board
+        start = time.perf_counter()
+        assert link.motor(2, 255, 300).result(timeout=2.0) == 2
+        elapsed = time.perf_counter() - start
+        print(f"300 ms job took {elapsed * 1000:.1f} ms")
+        assert 0.29 < elapsed < 0.4
+        assert link.request(Command.RESET).result(timeout=2.0) == Command.RESET
+        link.close()
+    finally:
+        emulator.stop()
+
+
+def test2():
+    """The benchmark reports latency and throughput, limited by the 115200 baud line."""
+    emulator = ArduinoEmulator()
+    port = emulator.start()
+    try:
+        results = benchmark(port, count=50, window=8)
+    finally:
+        emulator.stop()
+    print(f"Median latency: {results['latency'][25] * 1000:.3f} ms, throughput: {results['throughput']:.0f} frames/s")
+    assert len(results["latency"]) == 50 and len(results["motor"]) == 50
+    frame_time = arduino.COMMAND_FRAME.size * 10 / arduino.BAUDRATE
+    reply_time = arduino.REPLY_FRAME.size * 10 / arduino.BAUDRATE
+    assert results["latency"][0] > frame_time + reply_time
+    assert 0 < results["throughput"] < 1.02 / frame_time
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    test1()
+    test2()
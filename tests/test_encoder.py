@@ -10,11 +10,12 @@ from adafruit_seesaw import seesaw, rotaryio
 
 
 # PRIVATE LIBRARIES
-from encoder import Encoder
+from encoder import Encoder, EncoderGroup
 
 
 # PARAMETERS
 I2C_ADDR = 0x36         # default address
+I2C_ADDR_2 = 0x37       # A0 set
 
 
 def test1():
@@ -59,6 +60,24 @@ def test2():
         print("Test ended.")
 
 
+def test3():
+    """Test both encoders polled together on the shared I2C bus"""
+    print("Initializing Encoders...")
+    group = EncoderGroup([Encoder(I2C_ADDR), Encoder(I2C_ADDR_2)])
+    group.start()
+
+    print("Encoders initialized. Rotate the knobs.\n")
+
+    try:
+        while True:
+            (pos1, pos2), stamp = group.get_snapshot()
+            print(f"Position 1: {pos1}, Position 2: {pos2}, Sampled: {stamp:.3f}")
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        group.stop()
+        print("Test ended.")
+
+
 # If this file is run as a script
 if __name__ == "__main__":
     test2()
\ No newline at end of file
@@ -0,0 +1,101 @@
+# Drone Pose Estimator test
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import numpy as np
+
+
+# PRIVATE LIBRARIES
+from estimator import PoseFilter
+from vision import Target
+
+
+FRAME_PERIOD = 1 / 30       # [s]
+VELOCITY = (60.0, -30.0)    # [px/s]
+
+
+def truth(t: float):
+    """Drone pose at time t: moving at constant velocity, slowly turning."""
+    return 200 + VELOCITY[0] * t, 300 + VELOCITY[1] * t, 170 + 20 * t, 40.0
+
+
+def measure(t: float, rng=None):
+    """Detection of the drone at time t (with detector noise if rng is given)."""
+    x, y, yaw, scale = truth(t)
+    if rng is not None:
+        x, y = x + rng.normal(0, 2), y + rng.normal(0, 2)
+        yaw, scale = yaw + rng.normal(0, 3), scale + rng.normal(0, 1)
+    return Target.from_pose(x, y, (yaw + 180) % 360 - 180, scale)
+
+
+def error(target: Target, t: float):
+    x, y, _, _ = truth(t)
+    return np.hypot(target.x - x, target.y - y)
+
+
+def test1():
+    """Smooths noisy detections, learns the velocity and predicts between frames."""
+    rng = np.random.default_rng(0)
+    pose = PoseFilter()
+    raw, filtered = [], []
+    for n in range(90):
+        t = n * FRAME_PERIOD
+        measurement = measure(t, rng)
+        assert pose.update(t, measurement)
+        if n >= 30:
+            raw.append(error(measurement, t))
+            filtered.append(error(pose.estimate(t), t))
+    assert np.mean(filtered) < 0.6 * np.mean(raw)
+    assert np.allclose(pose.velocity()[:2], VELOCITY, atol=10)
+    # 100 Hz control between two camera frames
+    t = 90 * FRAME_PERIOD
+    for k in range(4):
+        assert error(pose.estimate(t + k * 0.01), t + k * 0.01) < 2.0
+    pose.report()
+
+
+def test2():
+    """Coasts through a short dropout and drops the track after max_coast."""
+    pose = PoseFilter(max_coast=0.3)
+    for n in range(30):
+        pose.update(n * FRAME_PERIOD, measure(n * FRAME_PERIOD))
+    last = 29 * FRAME_PERIOD
+    for n in range(30, 36):             # 0.2 s without the LEDs
+        assert not pose.update(n * FRAME_PERIOD, None)
+    assert error(pose.estimate(last + 0.2), last + 0.2) < 1.0
+    assert pose.estimate(last + 0.31) is None
+    assert pose.missed == 6
+
+
+def test3():
+    """A single wrong detection is rejected; a lasting jump restarts the track."""
+    pose = PoseFilter()
+    for n in range(30):
+        pose.update(n * FRAME_PERIOD, measure(n * FRAME_PERIOD))
+    t = 30 * FRAME_PERIOD
+    jump = Target.from_pose(500, 100, 0, 40)
+    assert not pose.update(t, jump)
+    assert error(pose.estimate(t), t) < 1.0
+    assert not pose.update(t + FRAME_PERIOD, jump)
+    assert pose.update(t + 2 * FRAME_PERIOD, jump)      # third in a row
+    assert pose.rejected == 2 and pose.restarts == 1
+    assert pose.estimate(t + 2 * FRAME_PERIOD).x == 500
+
+
+def test4():
+    """Yaw is filtered across the +-180 degree wrap."""
+    pose = PoseFilter()
+    for n in range(60):
+        t = n * FRAME_PERIOD
+        pose.update(t, measure(t))      # yaw passes 180 at t = 0.5 s
+    assert pose.rejected == 0
+    assert abs(pose.estimate(59 * FRAME_PERIOD).yaw - (170 + 20 * 59 * FRAME_PERIOD - 360)) < 1.0
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    test1()
+    test2()
+    test3()
+    test4()
@@ -0,0 +1,41 @@
+# Start Light Detector test
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import numpy as np
+
+
+# PRIVATE LIBRARIES
+from lightstart import FlashDetector, LORES_SIZE
+
+
+def frame(level: float, rng, noise: float = 2.0):
+    """Synthetic Y plane at a brightness level."""
+    w, h = LORES_SIZE
+    return np.clip(rng.normal(level, noise, (h, w)), 0, 255).astype(np.uint8)
+
+
+def test1():
+    """Slow ambient drift and sensor noise do not trigger; the flash does on its first frame."""
+    rng = np.random.default_rng(0)
+    detector = FlashDetector()
+    # ambient brightness drifts by 30 levels over 300 frames (auto exposure, lights)
+    for n in range(300):
+        assert not detector.update(detector.brightness(frame(60 + n * 0.1, rng)))
+    assert detector.update(detector.brightness(frame(120, rng)))
+
+
+def test2():
+    """Brightness is an integer mean over the region of interest."""
+    y_plane = np.zeros(LORES_SIZE[::-1], dtype=np.uint8)
+    y_plane[10:20, 30:50] = 255
+    detector = FlashDetector(roi=(30, 10, 20, 10))
+    assert detector.brightness(y_plane) == 255
+    assert FlashDetector().brightness(y_plane) == 255 * 200 / y_plane.size
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    test1()
+    test2()
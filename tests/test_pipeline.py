@@ -0,0 +1,105 @@
+# Frame Pipeline test
+# 10/18/26
+
+
+# PRIVATE LIBRARIES
+from clock import VirtualClock
+from pipeline import LatestQueue, Pipeline
+
+
+CAMERA_PERIOD = 1 / 30      # [s]
+PROCESS_TIME = 0.025        # [s]
+CONTROL_TIME = 0.005        # [s]
+
+
+def stages(clock, process_time: float = PROCESS_TIME):
+    """Simulated camera, vision and control stages (they only take time)."""
+    def capture():
+        clock.sleep(CAMERA_PERIOD)
+        return "image"
+
+    def process(image):
+        clock.sleep(process_time)
+        return "markers"
+
+    def control(frame):
+        clock.sleep(CONTROL_TIME)
+
+    return capture, process, control
+
+
+def run(pipeline, clock, duration: float):
+    """Display loop on the calling thread for duration seconds."""
+    pipeline.start()
+    end = clock.time() + duration
+    while clock.time() < end:
+        pipeline.latest(timeout=end - clock.time())
+    pipeline.stop()
+    pipeline.report()
+
+
+def test1():
+    """Stages overlap: control keeps up with the camera instead of the sum of the stages."""
+    clock = VirtualClock()
+    pipeline = Pipeline(*stages(clock), clock=clock)
+    run(pipeline, clock, 2.0)
+    serial_rate = 1 / (CAMERA_PERIOD + PROCESS_TIME + CONTROL_TIME)     # ~16 Hz in one loop
+    control = pipeline.stats["control"]
+    assert control.rate > 29 > serial_rate
+    assert abs(control.latency_max - (PROCESS_TIME + CONTROL_TIME)) < 1e-6
+    assert pipeline.dropped()["process"] == 0
+
+
+def test2():
+    """A slow vision stage drops old frames: control acts on fresh frames and latency does not grow."""
+    clock = VirtualClock()
+    pipeline = Pipeline(*stages(clock, process_time=0.1), clock=clock)
+    run(pipeline, clock, 3.0)
+    control = pipeline.stats["control"]
+    assert 9 < control.rate <= 10
+    # Worst case: a frame waits for the frame being processed, then is processed itself
+    assert control.latency_max <= 0.1 + 0.1 + CONTROL_TIME + 1e-6
+    assert pipeline.dropped()["process"] > 50
+
+
+def test3():
+    """A full queue drops its oldest item."""
+    queue = LatestQueue(maxsize=2)
+    for n in range(5):
+        queue.put(n)
+    assert queue.dropped == 3
+    assert [queue.get(0), queue.get(0), queue.get(0)] == [3, 4, None]
+    queue.close()
+    assert queue.get() is None
+
+
+def test4():
+    """Every captured image is released exactly once, dropped or not, and not while displayed."""
+    clock = VirtualClock()
+    capture, process, control = stages(clock, process_time=0.1)
+    captured, released = [], []
+    count = iter(range(1000))
+
+    def capture_buffer():
+        capture()
+        captured.append(next(count))
+        return captured[-1]
+
+    pipeline = Pipeline(capture_buffer, process, control, clock=clock, release=released.append)
+    pipeline.start()
+    end = clock.time() + 2.0
+    while clock.time() < end:
+        frame = pipeline.latest(timeout=end - clock.time())
+        if frame is not None:
+            assert frame.image not in released
+    pipeline.stop()
+    assert pipeline.dropped()["process"] > 20
+    assert sorted(released) == captured
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    test1()
+    test2()
+    test3()
+    test4()
@@ -0,0 +1,46 @@
+# Fixed-rate loop test
+# 10/18/26
+
+
+# PRIVATE LIBRARIES
+from clock import VirtualClock
+from rate import Rate, PeriodicTask
+
+
+def test1():
+    """Loop body time does not stretch the period; late cycles are skipped and counted."""
+    clock = VirtualClock()
+    rate = Rate(50, clock)
+    starts = []
+    for i in range(10):
+        starts.append(round(clock.time(), 6))
+        clock.sleep(0.005 if i != 5 else 0.05)   # cycle 5 overruns by 1.5 periods
+        rate.sleep()
+    print(f"Cycle starts: {starts}")
+    print(rate.stats)
+    assert starts[:6] == [0.0, 0.02, 0.04, 0.06, 0.08, 0.1]
+    assert starts[6] == 0.15                    # late cycle runs right away...
+    assert starts[7] == 0.16                    # ...and the missed 0.14 deadline is skipped
+    assert rate.stats.overruns == 1
+    assert rate.stats.cycles == 10
+
+
+def test2():
+    """PeriodicTask calls its body once per period."""
+    clock = VirtualClock()
+    calls = []
+    task = PeriodicTask(lambda: calls.append(round(clock.time(), 6)), 100, clock)
+    task.start()
+    clock.sleep(0.1)
+    task.stop()
+    print(f"Calls: {calls}")
+    print(task.stats)
+    assert calls[:3] == [0.0, 0.01, 0.02]
+    assert 10 <= len(calls) <= 11
+    assert task.stats.overruns == 0
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    test1()
+    test2()
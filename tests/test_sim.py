@@ -0,0 +1,239 @@
+# Simulated Hardware test
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import asyncio
+import threading
+import time
+
+
+# PRIVATE LIBRARIES
+from sim import SimHardware
+from drive import Drive
+from encoder import Encoder, EncoderGroup
+from servo import Servo
+from arduino import Arduino, Command
+import arduino as arduino_protocol
+from hal import START_CAMERA, START_SENSOR
+from tasks import run_async
+from main import Robot, PIN_SERVO_LEFT, PIN_SERVO_RIGHT, ADDR_ENC_LEFT, ADDR_ENC_RIGHT, PORT_ARDUINO
+
+
+# PARAMETERS
+DISTANCE_IN = 6
+
+
+def make_hardware():
+    return SimHardware(PIN_SERVO_LEFT, PIN_SERVO_RIGHT, ADDR_ENC_LEFT, ADDR_ENC_RIGHT)
+
+
+def test1():
+    """Drive forward in simulation and check the robot ends up near the target."""
+    hardware = make_hardware()
+    d = Drive(PIN_SERVO_LEFT, PIN_SERVO_RIGHT, ADDR_ENC_LEFT, ADDR_ENC_RIGHT, hardware=hardware)
+    d.startup()
+    d.move_forward(DISTANCE_IN)
+    d.shutdown()
+    x, y, heading = hardware.robot.pose()
+    print(f"Pose: x={x:.2f}in y={y:.2f}in heading={heading:.3f}rad")
+    assert abs(x - DISTANCE_IN) < 1.0
+
+
+def test2():
+    """Send a command to the simulated Arduino, read its responses and wait for completion."""
+    hardware = make_hardware()
+    arduino = Arduino(PORT_ARDUINO, hardware=hardware)
+    assert arduino.read_response() == "Arduino ready"
+    start = hardware.clock.time()
+    task = arduino.request(Command.MOTOR1)
+    assert task.result() == Command.MOTOR1
+    # completes as soon as the firmware reports it (5 s motor run), not after a fixed delay
+    assert abs(hardware.clock.time() - start - 5.0) < 0.05
+    # a command the firmware never finishes times out
+    assert not arduino.run_command(Command.MOTOR2, timeout=1.0)
+    arduino.close()
+
+
+def test3():
+    """Replay the full mission on the virtual clock (much faster than real time)."""
+    hardware = make_hardware()
+    start = time.perf_counter()
+    Robot(hardware).run()
+    elapsed = time.perf_counter() - start
+    print(f"Mission: {hardware.clock.time():.1f}s simulated in {elapsed:.2f}s")
+    assert elapsed < hardware.clock.time() / 10
+
+
+def test4():
+    """Encoder updates wake a waiting thread and reach subscribers with their sample time."""
+    hardware = make_hardware()
+    servo = Servo(PIN_SERVO_LEFT, 1, hardware=hardware)
+    group = EncoderGroup([Encoder(ADDR_ENC_LEFT, 1, hardware=hardware)])
+    samples = []
+    group.subscribe(lambda positions, stamp: samples.append((positions, stamp)))
+    servo.startup()
+    group.start()
+    servo.set_speed(1.0)
+    seq = group.get_sequence()
+    seq = group.wait_for_update(seq, timeout=1.0)
+    positions, stamp = group.get_snapshot()
+    servo.shutdown()
+    group.stop()
+    print(f"Update {seq}: {positions} at {stamp:.3f}s")
+    assert positions[0] > 0
+    assert samples[0] == (positions, stamp)
+
+
+def test5():
+    """Servo runs without a pulse thread and only reprograms the PWM when the pulse width changes."""
+    hardware = make_hardware()
+    servo = Servo(PIN_SERVO_LEFT, 1, hardware=hardware)
+    threads = threading.active_count()
+    servo.startup()
+    writes = []
+    set_pulse = servo.pwm.set_pulse
+    servo.pwm.set_pulse = lambda on_us, period_us=20000: (writes.append(on_us), set_pulse(on_us, period_us))
+    for _ in range(10):
+        servo.set_speed(0.5)
+    servo.set_speed(-0.5)
+    assert threading.active_count() == threads
+    servo.shutdown()
+    print(f"PWM writes: {writes}")
+    assert writes == [1750, 1250, 1500]
+
+
+def test6():
+    """asyncio code can await Arduino command completion."""
+    hardware = make_hardware()
+    arduino = Arduino(PORT_ARDUINO, hardware=hardware)
+    results = []
+
+    async def actuators():
+        results.extend(await asyncio.gather(arduino.command(Command.MOTOR3), arduino.command(Command.MOTOR1)))
+
+    # the event loop runs outside the virtual clock (no timing checks), the main thread waits on it
+    loop_thread = threading.Thread(target=asyncio.run, args=(actuators(),))
+    loop_thread.start()
+    hardware.clock.join(loop_thread)
+    arduino.close()
+    print(f"Results: {results}")
+    assert results == [Command.MOTOR3, Command.MOTOR1]
+
+
+def test7():
+    """Binary frames: CRC round trip, parameterised motor jobs, stop and rejected frames."""
+    frame = arduino_protocol.encode_command(arduino_protocol.OP_MOTOR, 7, 2, -200, 1500)
+    assert len(frame) == arduino_protocol.COMMAND_FRAME.size
+    assert arduino_protocol.crc8(frame[1:-1]) == frame[-1]
+    hardware = make_hardware()
+    arduino = Arduino(PORT_ARDUINO, hardware=hardware)
+    start = hardware.clock.time()
+    assert arduino.motor(2, -200, 1500).result() == 2
+    assert abs(hardware.clock.time() - start - 1.5) < 0.05
+    arduino.motor(3, 120).result()
+    assert hardware.arduino.speed(3) == 120
+    arduino.stop().result()
+    assert hardware.arduino.speed(3) == 0
+    # a frame for a motor that does not exist is rejected
+    try:
+        arduino.motor(4, 255).result()
+        assert False, "motor 4 should be rejected"
+    except IOError as e:
+        print(e)
+    arduino.close()
+
+
+def test8():
+    """Jobs for different motors overlap; a stop cancels the running jobs."""
+    hardware = make_hardware()
+    arduino = Arduino(PORT_ARDUINO, hardware=hardware)
+    start = hardware.clock.time()
+    tasks = [arduino.request(Command.MOTOR2), arduino.request(Command.MOTOR3), arduino.request(Command.MOTOR1)]
+    assert arduino.status().result() == [1, 2, 3]
+    assert [task.result() for task in tasks] == [Command.MOTOR2, Command.MOTOR3, Command.MOTOR1]
+    # extender (4 s out + 4 s back) is the longest, the others run alongside it
+    elapsed = hardware.clock.time() - start
+    print(f"Actuators finished in {elapsed:.2f}s")
+    assert abs(elapsed - 8.0) < 0.1
+    assert arduino.status().result() == []
+    task = arduino.request(Command.MOTOR3)
+    hardware.clock.sleep(1.0)
+    arduino.stop(3).result()
+    assert task.wait(0.1)
+    try:
+        task.result()
+        assert False, "stopped job should be cancelled"
+    except IOError as e:
+        print(e)
+    assert hardware.arduino.speed(3) == 0
+    arduino.close()
+
+
+def test9():
+    """The driver waits for the ready message instead of a fixed delay (or pings without a reset)."""
+    hardware = make_hardware()
+    arduino = Arduino(PORT_ARDUINO, hardware=hardware, wait=False)
+    assert hardware.clock.time() == 0.0 and not arduino.ready.done()
+    assert arduino.wait_ready()
+    print(f"Ready after {hardware.clock.time():.3f}s")
+    assert abs(hardware.clock.time() - hardware.arduino.RESET_TIME) < 0.01
+    arduino.close()
+    # reopening without a reset: the running sketch answers right away
+    start = hardware.clock.time()
+    arduino = Arduino(PORT_ARDUINO, hardware=hardware, reset=False)
+    assert hardware.clock.time() - start < 0.01
+    assert arduino.read_response() is None
+    arduino.close()
+
+
+def test10():
+    """The light sensor trigger starts the robot sooner than the camera, which takes over if the sensor times out."""
+    for trigger, timeout, delay in ((START_SENSOR, None, 1.0), (START_CAMERA, None, 1.025),
+                                    (START_SENSOR, 0.2, 0.2 + 0.5 + 1.025)):    # + camera start
+        hardware = make_hardware()
+        hardware.prepare_start(trigger)
+        start = hardware.clock.time()
+        hardware.wait_for_start(trigger, timeout)
+        print(f"{trigger}: started after {hardware.clock.time() - start:.3f}s")
+        assert abs(hardware.clock.time() - start - delay) < 1e-9
+
+
+def test11():
+    """A failed actuator does not stop the return home; a failed drone aborts, but the hardware is shut down."""
+    def fail():
+        raise TimeoutError("no reply")
+
+    hardware = make_hardware()
+    robot = Robot(hardware)
+    robot.turn_crank = lambda: run_async(fail, clock=hardware.clock)
+    returned = []
+    wait_idle = robot.drive.wait_idle
+    robot.drive.wait_idle = lambda: returned.append(wait_idle())
+    robot.run()
+    assert returned and not robot.arduino.ser.is_open
+
+    hardware = make_hardware()
+    robot = Robot(hardware)
+    robot.fly_drone = lambda: run_async(fail, clock=hardware.clock)
+    try:
+        robot.run()
+        assert False, "expected TimeoutError"
+    except TimeoutError:
+        pass
+    assert not robot.arduino.ser.is_open
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    test1()
+    test2()
+    test3()
+    test4()
+    test5()
+    test6()
+    test7()
+    test8()
+    test9()
+    test10()
+    test11()
@@ -0,0 +1,58 @@
+# Hardware Startup test
+# 10/18/26
+
+
+# PRIVATE LIBRARIES
+from clock import VirtualClock
+from startup import Startup
+from sim import SimHardware
+from main import Robot
+
+
+def test1():
+    """Devices come up at the same time: ready after the slowest one, not the sum."""
+    clock = VirtualClock()
+    startup = Startup(clock)
+    for name, duration in (("serial", 1.5), ("i2c", 0.2), ("camera", 0.5)):
+        startup.add(name, clock.sleep, duration)
+    assert startup.wait()
+    startup.report()
+    assert startup.times() == {"i2c": 0.2, "camera": 0.5, "serial": 1.5}
+    assert clock.time() == 1.5
+    assert startup.failed() == []
+
+
+def test2():
+    """A failing or hanging device is reported by the barrier without blocking the others."""
+    clock = VirtualClock()
+    startup = Startup(clock)
+    startup.add("ok", lambda: "up")
+    startup.add("broken", lambda: 1 / 0)
+    startup.add("slow", clock.sleep, 10.0)
+    assert not startup.wait(timeout=2.0)
+    startup.report()
+    assert clock.time() == 2.0
+    assert startup.result("ok") == "up"
+    assert sorted(startup.failed()) == ["broken", "slow"]
+    try:
+        startup.result("broken")
+        assert False, "result() should re-raise the init error"
+    except ZeroDivisionError:
+        pass
+
+
+def test3():
+    """The robot is ready after its slowest device (warm start before the start light)."""
+    hardware = SimHardware(pair_time=2.0)
+    robot = Robot(hardware)
+    print(f"Robot ready after {hardware.clock.time():.3f}s")
+    assert abs(hardware.clock.time() - 2.0) < 0.01
+    robot.drive.shutdown()
+    robot.arduino.close()
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    test1()
+    test2()
+    test3()
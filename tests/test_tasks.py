@@ -0,0 +1,54 @@
+# Background Task test
+# 10/18/26
+
+
+# PRIVATE LIBRARIES
+from clock import VirtualClock
+from tasks import CommandQueue, run_async, wait_all
+
+
+def test1():
+    """Queued commands run in order while the caller keeps working; a parallel task overlaps them."""
+    clock = VirtualClock()
+    queue = CommandQueue(clock, "test")
+    queue.start()
+    log = []
+
+    def command(name, duration):
+        clock.sleep(duration)
+        log.append((name, clock.time()))
+        return name
+
+    first = queue.submit(command, "first", 2.0)
+    second = queue.submit(command, "second", 3.0)
+    other = run_async(command, "other", 4.0, clock=clock)
+    assert clock.time() == 0.0 and not first.done()
+    assert wait_all([first, second, other]) == ["first", "second", "other"]
+    queue.stop()
+    print(f"Log: {log}")
+    assert log == [("first", 2.0), ("other", 4.0), ("second", 5.0)]
+    assert clock.time() == 5.0
+
+
+def test2():
+    """A failing command re-raises from result() and does not stop the queue."""
+    clock = VirtualClock()
+    queue = CommandQueue(clock, "test")
+    queue.start()
+    failed = queue.submit(lambda: 1 / 0)
+    ok = queue.submit(lambda: "ok")
+    assert ok.result() == "ok"
+    try:
+        failed.result()
+        assert False, "expected ZeroDivisionError"
+    except ZeroDivisionError:
+        pass
+    assert isinstance(failed.exception(), ZeroDivisionError) and ok.exception() is None
+    assert not queue.submit(clock.sleep, 10).wait(timeout=1.0)
+    queue.stop()
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    test1()
+    test2()
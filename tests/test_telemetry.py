@@ -0,0 +1,98 @@
+# Telemetry test
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import contextlib
+import io
+import math
+import os
+import tempfile
+
+
+# PRIVATE LIBRARIES
+import telemetry
+from telemetry import Telemetry, QUIET, MOVE_FORWARD, TURN
+from clock import VirtualClock
+from sim import SimHardware
+from drive import Drive
+from main import PIN_SERVO_LEFT, PIN_SERVO_RIGHT, ADDR_ENC_LEFT, ADDR_ENC_RIGHT
+
+
+def test1():
+    """Records wrap around the ring buffer and are flushed in order to a new log file."""
+    path = os.path.join(tempfile.mkdtemp(), "test.tlm")
+    with open(path, "wb") as f:
+        f.write(b"stale file from an earlier run")
+    t = Telemetry(path, capacity=8)
+    t.start()
+    for n in range(6):
+        t.record(MOVE_FORWARD, 1, 10, n, n, 0.0, 0.0, 0.0, 0.5, None)
+    t.flush()
+    for n in range(6, 20):
+        t.record(MOVE_FORWARD, 1, 10, n, n, 0.0, 0.0, 0.0, 0.5, None)
+    t.close()
+    log = telemetry.read(path)
+    print(f"Logged ticks: {list(log['left_ticks'])} ({t.dropped} dropped)")
+    assert list(log["left_ticks"]) == list(range(6)) + list(range(12, 20))
+    assert t.dropped == 6
+    assert list(t.records()["left_ticks"]) == list(range(12, 20))
+
+
+def test2():
+    """A QUIET drive move writes no per-cycle console output but records every control cycle."""
+    hardware = SimHardware(PIN_SERVO_LEFT, PIN_SERVO_RIGHT, ADDR_ENC_LEFT, ADDR_ENC_RIGHT)
+    t = Telemetry(level=QUIET, clock=hardware.clock)
+    d = Drive(PIN_SERVO_LEFT, PIN_SERVO_RIGHT, ADDR_ENC_LEFT, ADDR_ENC_RIGHT, hardware=hardware, telemetry=t)
+    d.startup()
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        d.move_forward(6)
+    d.shutdown()
+    records = t.records()
+    print(f"{len(records)} records, console output: {out.getvalue()!r}")
+    assert "Comp:" not in out.getvalue() and "Target ticks" not in out.getvalue()
+    assert len(records) > 10
+    assert (records["call"] == 1).all()
+
+
+def test3():
+    """The log header describes the records and analyze() measures each move."""
+    clock = VirtualClock()
+    path = os.path.join(tempfile.mkdtemp(), "test.tlm")
+    t = Telemetry(path, clock=clock)
+    t.start()
+    # move 1: 10 ticks, right wheel lags, coasts 2 ticks past the target
+    for left, right in [(0, 0), (4, 3), (8, 6), (10, 9)]:
+        t.record(MOVE_FORWARD, 1, 10, left, right, 0.0, 0.0, 0.0, 0.7, 0.7)
+        clock.sleep(0.02)
+    t.record(MOVE_FORWARD, 1, 10, 11, 10, 0.0, 0.0, 0.0, None, None)     # stopped
+    clock.sleep(0.5)
+    t.record(MOVE_FORWARD, 1, 10, 12, 11, 0.0, 0.0, 0.0, None, None)     # rest position
+    # move 2: turn with one late control cycle
+    for n, dt in enumerate([0.02, 0.03, 0.02, 0.02]):
+        t.record(TURN, 2, 3, n, n, 0.0, 0.0, 0.0, 0.7, -0.7)
+        clock.sleep(dt)
+    t.record(TURN, 2, 3, 3, 3, 0.0, 0.0, 0.0, None, None)
+    t.close()
+
+    with open(path, "rb") as f:
+        version, dtype, offset = telemetry.decode_header(f.read())
+    assert version == telemetry.FORMAT_VERSION and dtype == telemetry.RECORD and offset % 8 == 0
+    moves = telemetry.analyze(telemetry.read(path))
+    print(moves)
+    forward, turn = moves
+    assert forward["kind"] == "move_forward" and turn["kind"] == "turn"
+    assert forward["overshoot"] == 2
+    assert forward["divergence"] == 2
+    assert math.isnan(forward["settle"])            # came to rest 2 ticks past the target
+    assert abs(forward["duration"] - 0.08) < 1e-9
+    assert turn["overshoot"] == 0 and turn["settle"] > 0
+    assert abs(turn["jitter"] - 0.01) < 1e-9
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    test1()
+    test2()
+    test3()
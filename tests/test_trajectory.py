@@ -0,0 +1,44 @@
+# Motion Profile test
+# 10/18/26
+
+
+# PRIVATE LIBRARIES
+from trajectory import MotionProfile
+
+
+def check(profile, steps=2000):
+    """Sample a profile and return its largest velocity and acceleration."""
+    dt = profile.duration / steps
+    samples = [profile.sample(n * dt) for n in range(steps + 1)]
+    v_max = max(abs(v) for _, v in samples)
+    a_max = max(abs(samples[n + 1][1] - samples[n][1]) / dt for n in range(steps))
+    assert samples[0] == (0.0, 0.0)
+    assert samples[-1] == (profile.distance, 0.0)
+    return v_max, a_max
+
+
+def test1():
+    """Long moves cruise at v_max without exceeding the acceleration limit."""
+    for jerk in (None, 600.0):
+        profile = MotionProfile(62, 15.0, 60.0, jerk)
+        v_max, a_max = check(profile)
+        print(f"jerk={jerk}: duration {profile.duration:.3f}s, v {v_max:.2f}, a {a_max:.1f}")
+        assert abs(v_max - 15.0) < 1e-6
+        assert a_max <= 60.0 + 1e-6
+        assert profile.t_cruise > 0
+
+
+def test2():
+    """Short and reverse moves lower the peak velocity and still end at rest on the target."""
+    profile = MotionProfile(-4, 15.0, 60.0, 600.0)
+    v_max, a_max = check(profile)
+    print(f"duration {profile.duration:.3f}s, v {v_max:.2f}, a {a_max:.1f}")
+    assert profile.t_cruise < 1e-6
+    assert v_max < 15.0
+    assert profile.sample(profile.duration / 2)[1] < 0
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    test1()
+    test2()
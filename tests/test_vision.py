@@ -0,0 +1,164 @@
+# LED Marker Vision test
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import cv2
+import numpy as np
+
+
+# PRIVATE LIBRARIES
+from vision import (COMPONENTS, GREEN_BRIGHT, RED_BRIGHT, MarkerDetector, RoiTracker, YuvFrame, allocations, contour_blobs,
+                    i420, synthetic_frame)
+
+
+def test1():
+    """The four LEDs are found among small noise blobs and give the drone's pose."""
+    markers = MarkerDetector().detect(synthetic_frame(noise_blobs=200))
+    assert markers.found()
+    assert sorted(map(tuple, np.round(markers.green))) == [(300, 220), (340, 220)]
+    assert sorted(map(tuple, np.round(markers.red))) == [(300, 270), (340, 270)]
+    target = markers.target()
+    assert (round(target.x), round(target.y)) == (320, 245)
+    assert (round(target.offset_x), round(target.offset_y)) == (0, -5)
+    assert round(target.pixel_width) == 40
+    assert round(abs(target.yaw)) == 180        # rear (red) LEDs are below the front ones in the image
+
+
+def test2():
+    """Both blob methods keep the same blobs as the trackers' original contour loop."""
+    frame = synthetic_frame(seed=1, noise_blobs=500)
+    for detector in (MarkerDetector(), MarkerDetector(method=COMPONENTS)):
+        for mask in detector.masks(frame):
+            centroids, areas = detector.blobs(mask)
+            reference = contour_blobs(mask)
+            assert len(centroids) == len(reference)
+            for (x, y), (rx, ry, _) in zip(sorted(centroids.tolist()), sorted(reference)):
+                assert abs(x - rx) <= 1 and abs(y - ry) <= 1
+
+
+def test3():
+    """A frame without LEDs has no target."""
+    frame = np.zeros((480, 640, 3), np.uint8)
+    markers = MarkerDetector().detect(frame)
+    assert not markers.found()
+    assert markers.target() is None
+
+
+def test4():
+    """A moving drone is tracked in a small predicted window with the same result as a full search."""
+    detector = MarkerDetector()
+    tracker = RoiTracker(detector)
+    for n in range(40):
+        frame = synthetic_frame(seed=n, center=(200 + 6 * n, 150 + 4 * n))
+        markers = tracker.detect(frame)
+        full = detector.detect(frame)
+        assert np.allclose(markers.points(), full.points())
+    tracker.report()
+    assert tracker.frames == 40 and tracker.hits == 39      # the first frame has no prediction
+    x0, y0, x1, y1 = tracker.roi
+    assert (x1 - x0) * (y1 - y0) < 0.15 * 640 * 480
+
+
+def test5():
+    """When the drone jumps out of the window the frame is searched in full and tracking resumes."""
+    tracker = RoiTracker()
+    for center in ((200, 150), (205, 150), (500, 380), (505, 380)):
+        markers = tracker.detect(synthetic_frame(center=center))
+        assert abs(markers.target().x - center[0]) < 1
+    assert tracker.hits == 2        # frames 2 and 4; frame 3 fell back to a full search
+    assert tracker.roi is not None
+    tracker.detect(np.zeros((480, 640, 3), np.uint8))
+    assert tracker.roi is None and tracker.predict(640, 480) is None
+
+
+def test6():
+    """The color lookup table matches the HSV thresholds except for colors right at their edges."""
+    rng = np.random.default_rng(0)
+    noise = cv2.GaussianBlur(rng.integers(0, 256, (480, 640, 3), dtype=np.uint8), (0, 0), 2)
+    noise = cv2.normalize(noise, None, 0, 255, cv2.NORM_MINMAX)
+    for detector in (MarkerDetector(), MarkerDetector(GREEN_BRIGHT, RED_BRIGHT)):
+        for lut, hsv in zip(detector.masks(noise), detector.hsv_masks(noise)):
+            assert np.mean((lut > 0) != (hsv > 0)) < 0.015
+
+
+def test7():
+    """BGRX camera frames and windows cut out of them give the same LEDs as BGR frames."""
+    frame = synthetic_frame()
+    bgrx = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+    detector = MarkerDetector()
+    assert np.allclose(detector.detect(bgrx).points(), detector.detect(frame).points())
+    window = detector.detect(bgrx[170:320, 240:400]).shifted(240, 170)
+    assert np.allclose(window.points(), detector.detect(frame).points())
+
+
+def test8():
+    """Once its buffers are sized the vision loop allocates no image memory per frame."""
+    frame = synthetic_frame()
+    mask_size = frame.shape[0] * frame.shape[1]
+    for frame in (frame, cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)):
+        for method in (None, COMPONENTS):
+            detector = MarkerDetector() if method is None else MarkerDetector(method=method)
+            tracker = RoiTracker(detector)
+            for fn in (detector.detect, detector.hsv_masks, tracker.detect):
+                buffers, peak = allocations(detector, fn, frame)
+                assert buffers == 0
+                assert peak < mask_size / 4
+
+
+def test9():
+    """The camera's YUV planes give the same LEDs as the BGR frame, without buffer allocations."""
+    frame = synthetic_frame(noise_blobs=200)
+    yuv = YuvFrame.from_i420(i420(frame), 640, 480)
+    for method in (None, COMPONENTS):
+        detector = MarkerDetector() if method is None else MarkerDetector(method=method)
+        expected, markers = detector.detect(frame), detector.detect(yuv)
+        assert markers.found()
+        # Chroma is half resolution: blobs grow up to a pixel and may touch a nearby noise blob
+        assert np.allclose(sorted(map(tuple, markers.green)), sorted(map(tuple, expected.green)), atol=1.5)
+        assert np.allclose(sorted(map(tuple, markers.red)), sorted(map(tuple, expected.red)), atol=1.5)
+        assert allocations(detector, detector.detect, yuv)[0] == 0
+    bgr = yuv.bgr()
+    assert np.abs(bgr.astype(int) - frame).mean() < 2             # only blob edges lose chroma detail
+    assert np.abs(bgr[[220, 270], 300].astype(int) - frame[[220, 270], 300]).max() < 4
+
+
+def test10():
+    """Padded camera rows (stride > width) are skipped, and windows stay on even pixels."""
+    frame = synthetic_frame()
+    planes = i420(frame)
+    y, u, v = planes[:640 * 480], planes[640 * 480:640 * 480 + 320 * 240], planes[640 * 480 + 320 * 240:]
+    padded = np.concatenate([np.pad(plane.reshape(rows, cols), ((0, 0), (0, pad)), constant_values=255).ravel()
+                             for plane, rows, cols, pad in ((y, 480, 640, 64), (u, 240, 320, 32), (v, 240, 320, 32))])
+    yuv = YuvFrame.from_i420(padded, 640, 480, stride=704)
+    assert yuv.shape == (480, 640)
+    assert np.array_equal(yuv.y, y.reshape(480, 640)) and np.array_equal(yuv.v, v.reshape(240, 320))
+    window = yuv[101:301, 51:250]
+    assert window.shape == (200, 200) and window.u.shape == (100, 100)
+    assert np.shares_memory(window.y, padded)
+
+
+def test11():
+    """The ROI tracker follows the LEDs on YUV frames."""
+    tracker = RoiTracker(MarkerDetector())
+    for n in range(10):
+        center = (200 + 8 * n, 200 + 5 * n)
+        markers = tracker.detect(YuvFrame.from_i420(i420(synthetic_frame(seed=n, center=center)), 640, 480))
+        target = markers.target()
+        assert abs(target.x - center[0]) < 1 and abs(target.y - center[1]) < 1
+    assert tracker.hit_rate() >= 0.9
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    test1()
+    test2()
+    test3()
+    test4()
+    test5()
+    test6()
+    test7()
+    test8()
+    test9()
+    test10()
+    test11()
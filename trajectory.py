@@ -0,0 +1,107 @@
+# Motion Profile Library
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import math
+
+
+class MotionProfile:
+    """
+    Point-to-point velocity profile (position and velocity over time).
+    Accelerates to v_max, cruises and decelerates to stop exactly at the
+    distance. Without j_max the acceleration switches on/off instantly
+    (trapezoidal velocity); with j_max it ramps up and down (S-curve). Short
+    moves that cannot reach v_max get a lower peak velocity.
+    Parameters:
+    ----------
+    distance : float
+        Distance to travel (any unit, sign gives the direction)
+    v_max : float
+        Maximum velocity (distance units/s)
+    a_max : float
+        Maximum acceleration (distance units/s^2)
+    j_max : float
+        Maximum jerk (distance units/s^3), None for a trapezoidal profile
+    """
+
+    # CONSTRUCTOR
+
+    def __init__(self, distance: float, v_max: float, a_max: float, j_max: float = None):
+        self.distance = distance
+        self.v_max = v_max
+        self.a_max = a_max
+        self.j_max = j_max
+        self._sign = 1 if distance >= 0 else -1
+        length = abs(distance)
+        # Peak velocity: v_max if there is room to cruise, otherwise the
+        # velocity whose acceleration + deceleration cover the whole distance
+        v = v_max
+        if 2 * self._ramp_distance(v) > length:
+            lo, hi = 0.0, v_max
+            for _ in range(50):
+                v = (lo + hi) / 2
+                if 2 * self._ramp_distance(v) > length:
+                    hi = v
+                else:
+                    lo = v
+            v = lo
+        self.v_peak = v
+        self.a_peak, self.t_jerk, self.t_ramp = self._ramp(v)
+        self.t_cruise = (length - 2 * self._ramp_distance(v)) / v if v > 0 else 0.0
+        self.duration = 2 * self.t_ramp + self.t_cruise
+
+
+    # PUBLIC METHODS
+
+    def sample(self, t: float):
+        """Returns (position, velocity) at time t after the start."""
+        length = abs(self.distance)
+        if t <= 0:
+            return 0.0, 0.0
+        if t >= self.duration:
+            return self.distance, 0.0
+        if t < self.t_ramp:
+            p, v = self._ramp_sample(t)
+        elif t < self.t_ramp + self.t_cruise:
+            p = self._ramp_distance(self.v_peak) + self.v_peak * (t - self.t_ramp)
+            v = self.v_peak
+        else:
+            # Deceleration mirrors the acceleration
+            p, v = self._ramp_sample(self.duration - t)
+            p = length - p
+        return self._sign * p, self._sign * v
+
+
+    # PRIVATE METHODS
+
+    def _ramp(self, v: float):
+        """Returns (peak acceleration, jerk time, total time) of a 0 -> v ramp."""
+        if v <= 0:
+            return 0.0, 0.0, 0.0
+        if self.j_max is None:
+            return self.a_max, 0.0, v / self.a_max
+        a = min(self.a_max, math.sqrt(v * self.j_max))
+        return a, a / self.j_max, v / a + a / self.j_max
+
+    def _ramp_distance(self, v: float):
+        """Distance covered while ramping from 0 to v (the ramp is point symmetric, so average speed is v/2)."""
+        return v * self._ramp(v)[2] / 2
+
+    def _ramp_sample(self, t: float):
+        """(position, velocity) at time t into the acceleration ramp."""
+        a, tj, tr = self.a_peak, self.t_jerk, self.t_ramp
+        v = self.v_peak
+        if tj == 0:
+            return a * t * t / 2, a * t
+        if t < tj:
+            # Jerk phase: acceleration rises to a
+            return self.j_max * t ** 3 / 6, self.j_max * t * t / 2
+        if t < tr - tj:
+            # Constant acceleration
+            p1, v1 = self.j_max * tj ** 3 / 6, self.j_max * tj * tj / 2
+            dt = t - tj
+            return p1 + v1 * dt + a * dt * dt / 2, v1 + a * dt
+        # Jerk phase: acceleration falls to 0 (mirror of the first one)
+        r = tr - t
+        return self._ramp_distance(v) - (v * r - self.j_max * r ** 3 / 6), v - self.j_max * r * r / 2
@@ -0,0 +1,620 @@
+# LED Marker Vision Library
+# 10/18/26
+
+
+# PUBLIC LIBRARIES
+import argparse
+import math
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+import cv2
+import numpy as np
+
+
+# CAMERA PARAMETERS
+IMAGE_WIDTH = 640           # [px]
+IMAGE_HEIGHT = 480          # [px]
+FOCAL_LENGTH = 3.04         # [mm] Pi camera lens
+SENSOR_WIDTH = 3.68         # [mm]
+
+# MARKER PARAMETERS
+FRONT_WIDTH = 24            # [mm] spacing of the two green (front) LEDs on the drone
+
+# HSV THRESHOLDS (OpenCV ranges: H 0-180, S and V 0-255), [(lower, upper), ...] per color
+GREEN = [((80, 45, 135), (100, 255, 255))]
+RED = [((0, 60, 70), (20, 255, 255)), ((160, 60, 70), (180, 255, 255))]     # red wraps around H = 0
+# Lower saturation, higher value; green extended into cyan, red into orange
+GREEN_BRIGHT = [((77, 24, 200), (98, 255, 255))]
+RED_BRIGHT = [((0, 10, 200), (33, 255, 255)), ((170, 21, 160), (180, 255, 255))]
+# More saturated, narrower red
+GREEN_STRICT = [((80, 90, 135), (100, 255, 255))]
+RED_STRICT = [((0, 70, 70), (10, 255, 255)), ((170, 70, 70), (180, 255, 255))]
+MIN_AREA = 50               # [px] smaller blobs are noise
+
+# COLOR LABELS (bits of ColorClassifier.labels())
+LABEL_GREEN = 1
+LABEL_RED = 2
+LUT_BITS = 6                # bits per channel of the color lookup table
+
+# TRACKING PARAMETERS
+ROI_MARGIN = 40             # [px] search window border around the predicted LEDs
+
+# BLOB METHODS
+CONTOURS = "contours"       # findContours (fastest while the masks are sparse)
+COMPONENTS = "components"   # connectedComponentsWithStats (fixed cost, wins with many noise blobs)
+
+
+@dataclass
+class Target:
+    """Drone pose measured from its four LEDs (image coordinates)."""
+    x: float                # [px] center of the four LEDs
+    y: float
+    offset_x: float         # [px] right of the image center
+    offset_y: float         # [px] above the image center
+    yaw: float              # [deg] rotation of the front LEDs relative to the rear ones
+    distance: float         # [mm] from the spacing of the front LEDs
+    pixel_width: float      # [px] spacing of the front LEDs
+
+    @classmethod
+    def from_pose(cls, x: float, y: float, yaw: float, pixel_width: float,
+                  width: int = IMAGE_WIDTH, height: int = IMAGE_HEIGHT):
+        """Target at (x, y) [px] seen by a width x height camera."""
+        distance = (FRONT_WIDTH * FOCAL_LENGTH * width) / (pixel_width * SENSOR_WIDTH)
+        return cls(float(x), float(y), float(x - width / 2), float(height / 2 - y), float(yaw), distance, float(pixel_width))
+
+
+@dataclass
+class Markers:
+    """LED blobs found in one frame, largest first."""
+    green: np.ndarray       # (n, 2) centroids [px]
+    green_area: np.ndarray  # (n,) areas [px]
+    red: np.ndarray
+    red_area: np.ndarray
+
+    def found(self):
+        """True if both front (green) and both rear (red) LEDs were seen."""
+        return len(self.green) >= 2 and len(self.red) >= 2
+
+    def target(self, width: int = IMAGE_WIDTH, height: int = IMAGE_HEIGHT):
+        """Returns the Target seen by a width x height camera, or None if LEDs are missing."""
+        if not self.found():
+            return None
+        green, red = self.green[:2], self.red[:2]
+        pixel_width = float(np.hypot(*(green[0] - green[1])))
+        if pixel_width == 0:
+            return None
+        x, y = np.vstack((green, red)).mean(axis=0)
+        front, rear = green.mean(axis=0), red.mean(axis=0)
+        yaw = math.degrees(math.atan2(rear[0] - front[0], front[1] - rear[1]))
+        return Target.from_pose(x, y, yaw, pixel_width, width, height)
+
+    def points(self):
+        """(4, 2) centroids of the two front and two rear LEDs."""
+        return np.vstack((self.green[:2], self.red[:2]))
+
+    def shifted(self, dx: float, dy: float):
+        """Markers moved by (dx, dy), e.g. from window to full-frame coordinates."""
+        offset = np.array([dx, dy], dtype=np.float64)
+        return Markers(self.green + offset, self.green_area, self.red + offset, self.red_area)
+
+
+class BufferPool:
+    """
+    Image buffers reused from frame to frame.
+    get() returns a contiguous view of a named buffer at the requested
+    shape; a buffer is only (re)allocated when a larger size or another
+    dtype is asked for, so once the largest frame has been seen the vision
+    loop allocates no image memory. Views stay valid until the next get()
+    of the same name, so a pool must not be shared between threads.
+    """
+
+    def __init__(self):
+        self.allocations = 0        # buffers allocated so far
+        self.allocated = 0          # [bytes] allocated so far
+        self._buffers = {}          # name -> flat buffer
+
+    def get(self, name: str, shape: tuple, dtype=np.uint8):
+        """View of buffer name at shape (allocated or grown if needed)."""
+        size = math.prod(shape)
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.size < size or buffer.dtype != dtype:
+            buffer = np.empty(size, dtype=dtype)
+            self._buffers[name] = buffer
+            self.allocations += 1
+            self.allocated += buffer.nbytes
+        return buffer[:size].reshape(shape)
+
+    def __str__(self):
+        return f"{len(self._buffers)} buffers, {self.allocated / 1e6:.1f} MB in {self.allocations} allocations"
+
+
+class YuvFrame:
+    """
+    Y, U and V planes of an I420 (YUV420) image, e.g. views of a mapped
+    camera buffer (nothing is copied). U and V have half the resolution.
+    frame[y0:y1, x0:x1] is a window of it, also as views (bounds rounded
+    down to even so the planes line up).
+    """
+
+    def __init__(self, y: np.ndarray, u: np.ndarray, v: np.ndarray):
+        self.y = y
+        self.u = u
+        self.v = v
+
+    @classmethod
+    def from_i420(cls, buffer: np.ndarray, width: int, height: int, stride: int = None):
+        """Planes of an I420 buffer whose Y rows are stride bytes apart (chroma rows stride / 2)."""
+        stride = width if stride is None else stride
+        flat = buffer.reshape(-1)
+        y_size = stride * height
+        c_stride = stride // 2
+        c_size = c_stride * (height // 2)
+        y = flat[:y_size].reshape(height, stride)[:, :width]
+        u = flat[y_size:y_size + c_size].reshape(height // 2, c_stride)[:, :width // 2]
+        v = flat[y_size + c_size:y_size + 2 * c_size].reshape(height // 2, c_stride)[:, :width // 2]
+        return cls(y, u, v)
+
+    @property
+    def shape(self):
+        return self.y.shape
+
+    def __getitem__(self, index):
+        rows, cols = index
+        y0, y1, _ = rows.indices(self.y.shape[0])
+        x0, x1, _ = cols.indices(self.y.shape[1])
+        y0, y1, x0, x1 = y0 & ~1, y1 & ~1, x0 & ~1, x1 & ~1
+        return YuvFrame(self.y[y0:y1, x0:x1], self.u[y0 // 2:y1 // 2, x0 // 2:x1 // 2],
+                        self.v[y0 // 2:y1 // 2, x0 // 2:x1 // 2])
+
+    def bgr(self):
+        """BGR copy of the frame (for display; full-range sYCC like the camera's YUV streams)."""
+        size = self.y.shape[::-1]
+        u = cv2.resize(self.u, size, interpolation=cv2.INTER_NEAREST)
+        v = cv2.resize(self.v, size, interpolation=cv2.INTER_NEAREST)
+        return cv2.cvtColor(cv2.merge((self.y, v, u)), cv2.COLOR_YCrCb2BGR)
+
+
+class ColorClassifier:
+    """
+    Labels every pixel of a frame green and/or red in one table lookup.
+    The table is built once from the HSV ranges for all BGR colors
+    quantized to `bits` bits per channel. The 4 bytes of a BGRX pixel are
+    read as one (little-endian) uint32, so the table index is a shift and
+    a mask: no HSV conversion and no per-range passes over the frame.
+    YuvFrames (full-range sYCC) go through a second table indexed by the
+    quantized Y, U and V of each chroma sample, so they are labelled at
+    half resolution without converting them to BGR.
+    The index, label and mask images are written into a BufferPool (a new
+    1.2 MB index image per frame costs more than the lookup itself), so the
+    returned masks are only valid until the next call.
+    Parameters:
+    ----------
+    green, red : list
+        HSV ranges [(lower, upper), ...] of each color
+    bits : int
+        Bits per channel (the table has 2^(8 * 3 - 2) entries at 6 bits)
+    buffers : BufferPool
+        Pool for the per-frame images (a new one if None)
+    """
+
+    # CONSTRUCTOR
+
+    def __init__(self, green=GREEN, red=RED, bits: int = LUT_BITS, buffers: BufferPool = None):
+        self.buffers = buffers if buffers is not None else BufferPool()
+        self.shift = 8 - bits
+        self.mask = ((1 << bits) - 1) * 0x010101
+        # Index: channel 0 | channel 1 << 8 | channel 2 << 16 (quantized)
+        self.table = self._build(green, red, bits, lambda bgr: bgr)
+        self.yuv_table = self._build(green, red, bits, lambda yuv: cv2.cvtColor(yuv[..., [0, 2, 1]], cv2.COLOR_YCrCb2BGR))
+
+
+    # PUBLIC METHODS
+
+    def labels(self, frame: np.ndarray):
+        """LABEL_GREEN/LABEL_RED bits of every pixel of a BGRX (or BGR) frame."""
+        if frame.shape[2] == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA, dst=self.buffers.get("bgrx", frame.shape[:2] + (4,)))
+        pixels = frame.view(np.uint32)[..., 0]
+        # intp index: np.take would otherwise copy a uint32 index to intp every frame
+        index = self.buffers.get("index", pixels.shape, np.intp)
+        np.right_shift(pixels, self.shift, out=index)
+        np.bitwise_and(index, self.mask, out=index)
+        # mode="clip" also keeps np.take from buffering the output
+        return np.take(self.table, index, out=self.buffers.get("labels", pixels.shape), mode="clip")
+
+    def yuv_labels(self, frame: YuvFrame):
+        """LABEL_GREEN/LABEL_RED bits of every chroma sample (half resolution) of a YuvFrame."""
+        shape = frame.u.shape
+        index = self.buffers.get("index", shape, np.intp)
+        part = self.buffers.get("index_part", shape, np.intp)
+        np.right_shift(frame.y[::2, ::2], self.shift, out=index)
+        for plane, position in ((frame.u, 8), (frame.v, 16)):
+            np.right_shift(plane, self.shift, out=part)
+            np.left_shift(part, position, out=part)
+            np.bitwise_or(index, part, out=index)
+        return np.take(self.yuv_table, index, out=self.buffers.get("labels", shape), mode="clip")
+
+    def masks(self, frame):
+        """Returns the (green, red) masks of a frame or YuvFrame (nonzero = that color)."""
+        labels = self.yuv_labels(frame) if isinstance(frame, YuvFrame) else self.labels(frame)
+        green = cv2.bitwise_and(labels, LABEL_GREEN, dst=self.buffers.get("green", labels.shape))
+        red = cv2.bitwise_and(labels, LABEL_RED, dst=self.buffers.get("red", labels.shape))
+        return green, red
+
+
+    # PRIVATE METHODS
+
+    def _build(self, green, red, bits: int, to_bgr):
+        """Label table of every quantized color; to_bgr converts an n x 1 image of colors to BGR."""
+        table = np.zeros(self.mask + 1, dtype=np.uint8)
+        # HSV of the center of every quantized color, as an n x 1 image
+        levels = np.arange(1 << bits, dtype=np.uint32)
+        centers = np.minimum((levels << self.shift) + (1 << self.shift) // 2, 255).astype(np.uint8)
+        c0, c1, c2 = np.meshgrid(centers, centers, centers, indexing="ij")
+        colors = np.stack((c0.ravel(), c1.ravel(), c2.ravel()), axis=-1)[:, None]
+        hsv = cv2.cvtColor(np.ascontiguousarray(to_bgr(colors)), cv2.COLOR_BGR2HSV)
+        q0, q1, q2 = np.meshgrid(levels, levels, levels, indexing="ij")
+        index = (q0 | (q1 << 8) | (q2 << 16)).ravel()
+        for label, ranges in ((LABEL_GREEN, green), (LABEL_RED, red)):
+            inside = np.zeros(len(index), dtype=bool)
+            for lower, upper in ranges:
+                inside |= cv2.inRange(hsv, np.array(lower, np.uint8), np.array(upper, np.uint8)).ravel() > 0
+            table[index[inside]] |= label
+        return table
+
+
+class MarkerDetector:
+    """
+    Finds the drone's green (front) and red (rear) LEDs in BGRX (or BGR)
+    frames or YuvFrames (found at chroma resolution, returned in Y plane
+    pixels). Colors are segmented with a ColorClassifier lookup table built
+    from the HSV ranges. Every per-frame image is written (dst=) into the
+    detector's BufferPool, so masks are only valid until the next frame.
+    The blob areas of a mask are filtered and the largest-k selected as
+    NumPy array operations; centroids are only computed for the kept
+    blobs. Blobs come from findContours (one area call per blob) or from
+    one connectedComponentsWithStats pass (areas and centroids of every
+    blob at once, a fixed cost per frame that pays off on very noisy masks;
+    compare them on the Pi with `python3 vision.py bench`).
+    Parameters:
+    ----------
+    green, red : list
+        HSV ranges [(lower, upper), ...] of each color
+    min_area : int
+        Blobs with this many pixels or fewer are ignored
+    count : int
+        Largest blobs kept per color
+    method : str
+        CONTOURS or COMPONENTS
+    bits : int
+        Bits per channel of the color lookup table
+    """
+
+    # CONSTRUCTOR
+
+    def __init__(self, green=GREEN, red=RED, min_area: int = MIN_AREA, count: int = 2, method: str = CONTOURS,
+                 bits: int = LUT_BITS):
+        self.green = [(np.array(lo, np.uint8), np.array(hi, np.uint8)) for lo, hi in green]
+        self.red = [(np.array(lo, np.uint8), np.array(hi, np.uint8)) for lo, hi in red]
+        self.buffers = BufferPool()
+        self.classifier = ColorClassifier(green, red, bits, self.buffers)
+        self.min_area = min_area
+        self.count = count
+        self.method = method
+
+
+    # PUBLIC METHODS
+
+    def masks(self, frame: np.ndarray):
+        """Returns the (green, red) masks of a BGRX (or BGR) frame (nonzero = that color)."""
+        return self.classifier.masks(frame)
+
+    def hsv_masks(self, frame: np.ndarray):
+        """Masks from an HSV conversion and inRange per range (exact thresholds, slower)."""
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV, dst=self.buffers.get("hsv", frame.shape[:2] + (3,)))
+        return self._mask(hsv, self.green, "hsv_green"), self._mask(hsv, self.red, "hsv_red")
+
+    def detect(self, frame):
+        """Returns the Markers in a BGRX (or BGR) frame or a YuvFrame."""
+        scale = 2 if isinstance(frame, YuvFrame) else 1     # YUV masks are at chroma resolution
+        green_mask, red_mask = self.masks(frame)
+        green, green_area = self.blobs(green_mask, scale)
+        red, red_area = self.blobs(red_mask, scale)
+        return Markers(green, green_area, red, red_area)
+
+    def blobs(self, mask: np.ndarray, scale: int = 1):
+        """Returns (centroids, areas) of the largest blobs of a mask, largest first, in pixels of a scale times larger image."""
+        if self.method == COMPONENTS:
+            labels = self.buffers.get("components", mask.shape, np.int32)
+            _, _, stats, centroids = cv2.connectedComponentsWithStats(mask, labels, connectivity=8)
+            areas = stats[1:, cv2.CC_STAT_AREA] * float(scale * scale)     # label 0 is the background
+            keep = self._largest(areas)
+            centroids = centroids[1:][keep]
+        else:
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            areas = np.fromiter((cv2.contourArea(c) for c in contours), np.float64, len(contours)) * (scale * scale)
+            keep = self._largest(areas)
+            centroids = np.empty((len(keep), 2))
+            for n, i in enumerate(keep):
+                m = cv2.moments(contours[i])
+                centroids[n] = m["m10"] / m["m00"], m["m01"] / m["m00"]
+        if scale != 1:
+            centroids = centroids * scale + (scale - 1) / 2     # center of the scale x scale block
+        return centroids, areas[keep]
+
+
+    # PRIVATE METHODS
+
+    def _largest(self, areas: np.ndarray):
+        """Indices of the count largest areas above min_area, largest first."""
+        keep = np.flatnonzero(areas > self.min_area)
+        if len(keep) > self.count:
+            keep = keep[np.argpartition(areas[keep], -self.count)[-self.count:]]
+        return keep[np.argsort(areas[keep])[::-1]]
+
+    def _mask(self, hsv: np.ndarray, ranges, name: str):
+        shape = hsv.shape[:2]
+        mask = cv2.inRange(hsv, *ranges[0], dst=self.buffers.get(name, shape))
+        for lower, upper in ranges[1:]:
+            part = cv2.inRange(hsv, lower, upper, dst=self.buffers.get("hsv_part", shape))
+            cv2.bitwise_or(mask, part, dst=mask)
+        return mask
+
+
+class RoiTracker:
+    """
+    Tracks the LEDs in a small window instead of the whole frame.
+    The window is the bounding box of the four LEDs from the last frame,
+    moved by their velocity (per processed frame) and grown by a margin.
+    If the LEDs are not all found in it, the same frame is searched in
+    full and the next prediction starts over from that detection.
+    Parameters:
+    ----------
+    detector : MarkerDetector
+        Detector run on the window (or the full frame)
+    margin : int
+        Window border around the predicted LEDs [px]
+    """
+
+    # CONSTRUCTOR
+
+    def __init__(self, detector: MarkerDetector = None, margin: int = ROI_MARGIN):
+        self.detector = detector if detector is not None else MarkerDetector()
+        self.margin = margin
+        self.roi = None             # (x0, y0, x1, y1) last search window, None = full frame
+        self.frames = 0
+        self.attempts = 0           # frames searched in a predicted window
+        self.hits = 0               # ... where all four LEDs were found in it
+        self.roi_area = 0.0         # sum of window areas / frame area (for the mean)
+        self._points = None         # (4, 2) LEDs of the last detection
+        self._velocity = np.zeros(2)
+
+
+    # PUBLIC METHODS
+
+    def predict(self, width: int, height: int):
+        """Search window (x0, y0, x1, y1) for the next frame, or None for a full-frame search."""
+        if self._points is None:
+            return None
+        points = self._points + self._velocity
+        pad = self.margin + np.abs(self._velocity)
+        x0, y0 = np.floor(points.min(axis=0) - pad).astype(int)
+        x1, y1 = np.ceil(points.max(axis=0) + pad).astype(int) + 1
+        x0, y0, x1, y1 = max(0, x0), max(0, y0), min(width, x1), min(height, y1)
+        x0, y0 = x0 & ~1, y0 & ~1       # even, so YUV420 chroma planes line up
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, y0, x1, y1
+
+    def detect(self, frame: np.ndarray):
+        """Returns the Markers (full-frame coordinates) of a BGR frame."""
+        height, width = frame.shape[:2]
+        self.frames += 1
+        self.roi = self.predict(width, height)
+        markers = None
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            self.attempts += 1
+            self.roi_area += (x1 - x0) * (y1 - y0) / (width * height)
+            markers = self.detector.detect(frame[y0:y1, x0:x1]).shifted(x0, y0)
+            if markers.found():
+                self.hits += 1
+            else:
+                markers = None
+        if markers is None:
+            # Lost (or no prediction yet): search the whole frame
+            self.roi = None
+            markers = self.detector.detect(frame)
+        self._update(markers)
+        return markers
+
+    def hit_rate(self):
+        """Fraction of the frames whose LEDs were all found in the predicted window."""
+        return self.hits / self.frames if self.frames else 0.0
+
+    def report(self):
+        """Print the ROI hit rate and mean window size."""
+        mean_area = self.roi_area / self.attempts if self.attempts else 0.0
+        print(f"ROI hit rate {self.hit_rate() * 100:.1f}% ({self.hits}/{self.frames} frames) | "
+              f"window {mean_area * 100:.1f}% of the frame | "
+              f"{self.frames - self.hits} full-frame searches")
+
+
+    # PRIVATE METHODS
+
+    def _update(self, markers: Markers):
+        """Remember the LEDs and their velocity for the next prediction."""
+        if not markers.found():
+            self._points = None
+            self._velocity = np.zeros(2)
+            return
+        points = markers.points()
+        if self._points is not None:
+            self._velocity = points.mean(axis=0) - self._points.mean(axis=0)
+        self._points = points
+
+
+def draw(frame: np.ndarray, markers: Markers, target: Target = None):
+    """Draw the LEDs (and the target center) on a frame like the trackers show them."""
+    for (x, y) in markers.green[:2]:
+        cv2.circle(frame, (int(x), int(y)), 5, (0, 255, 0), -1)
+    for (x, y) in markers.red[:2]:
+        cv2.circle(frame, (int(x), int(y)), 5, (0, 0, 255), -1)
+    if target is not None:
+        points = [(int(x), int(y)) for x, y in np.vstack((markers.green[:2], markers.red[:2]))]
+        for i, pt in enumerate(points):
+            for other in points[i + 1:]:
+                cv2.line(frame, pt, other, (255, 255, 0), 1)
+        cv2.circle(frame, (int(target.x), int(target.y)), 10, (0, 255, 255), 2)
+
+
+def draw_roi(frame: np.ndarray, roi):
+    """Draw the tracker's search window (nothing for a full-frame search)."""
+    if roi is not None:
+        x0, y0, x1, y1 = roi
+        cv2.rectangle(frame, (x0, y0), (x1 - 1, y1 - 1), (255, 255, 255), 1)
+
+
+def draw_crosshair(frame: np.ndarray, radius: int):
+    """Draw the image center and the centering circle."""
+    w, h = frame.shape[1], frame.shape[0]
+    cv2.line(frame, (w // 2 - 20, h // 2), (w // 2 + 20, h // 2), (255, 0, 255), 2)
+    cv2.line(frame, (w // 2, h // 2 - 20), (w // 2, h // 2 + 20), (255, 0, 255), 2)
+    cv2.circle(frame, (w // 2, h // 2), radius, (255, 0, 255), 2)
+
+
+# BENCHMARK
+
+def contour_blobs(mask: np.ndarray, min_area: int = MIN_AREA, count: int = 2):
+    """The trackers' original findContours + moments loop (reference for the benchmark)."""
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    candidates = []
+    for c in contours:
+        area = cv2.contourArea(c)
+        if area > min_area:
+            M = cv2.moments(c)
+            if M["m00"] > 0:
+                candidates.append((int(M["m10"] / M["m00"]), int(M["m01"] / M["m00"]), area))
+    candidates.sort(key=lambda x: x[2], reverse=True)
+    return candidates[:count]
+
+
+def i420(frame: np.ndarray):
+    """Full-range (sYCC) I420 buffer of a BGR frame, like the camera's lores stream."""
+    height, width = frame.shape[:2]
+    y, cr, cb = cv2.split(cv2.cvtColor(frame, cv2.COLOR_BGR2YCrCb))
+    u = cv2.resize(cb, (width // 2, height // 2), interpolation=cv2.INTER_AREA)
+    v = cv2.resize(cr, (width // 2, height // 2), interpolation=cv2.INTER_AREA)
+    return np.concatenate((y.ravel(), u.ravel(), v.ravel()))
+
+
+def synthetic_frame(seed: int = 0, noise_blobs: int = 200, center: tuple = (320, 245)):
+    """Synthetic 640x480 frame: the four drone LEDs around center plus small colored noise blobs."""
+    rng = np.random.default_rng(seed)
+    frame = np.full((IMAGE_HEIGHT, IMAGE_WIDTH, 3), 40, np.uint8)
+    for _ in range(noise_blobs):
+        color = (200, 255, 60) if rng.random() < 0.5 else (40, 40, 255)      # LED colors, too small to count
+        cv2.circle(frame, (int(rng.integers(0, IMAGE_WIDTH)), int(rng.integers(0, IMAGE_HEIGHT))), 2, color, -1)
+    cx, cy = center
+    for (x, y), color in (((-20, -25), (200, 255, 60)), ((20, -25), (200, 255, 60)),
+                          ((-20, 25), (40, 40, 255)), ((20, 25), (40, 40, 255))):
+        cv2.circle(frame, (cx + x, cy + y), 8, color, -1)
+    return frame
+
+
+def benchmark(frame: np.ndarray, repeat: int = 200):
+    """Returns {step: [s] per frame} of color segmentation (HSV, lookup table on BGRX and on
+    the camera's YUV planes), the blob step (original loop and both methods), the whole
+    detect() on BGRX and YUV and a tracked window."""
+    yuv = YuvFrame.from_i420(i420(frame[..., :3]), frame.shape[1], frame.shape[0])
+    if frame.shape[2] == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)     # as the camera delivers it (XRGB8888)
+    detector = MarkerDetector()
+    components = MarkerDetector(method=COMPONENTS)
+    masks = detector.masks(frame)
+    results = {}
+    for name, fn, image in (("hsv", detector.hsv_masks, frame), ("lut", detector.masks, frame),
+                            ("yuv", detector.masks, yuv)):
+        fn(image)       # warm up (first-touch page faults)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn(image)
+        results[name] = (time.perf_counter() - start) / repeat
+    for name, fn in (("loop", contour_blobs), (CONTOURS, detector.blobs), (COMPONENTS, components.blobs)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for mask in masks:
+                fn(mask)
+        results[name] = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        detector.detect(frame)
+    results["detect"] = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        detector.detect(yuv)
+    results["detect yuv"] = (time.perf_counter() - start) / repeat
+    tracker = RoiTracker(detector)
+    tracker.detect(frame)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        tracker.detect(frame)
+    results["roi"] = (time.perf_counter() - start) / repeat
+    return results
+
+
+def allocations(detector: MarkerDetector, fn, frame: np.ndarray, repeat: int = 20):
+    """
+    Returns (buffers allocated per call, largest transient NumPy/OpenCV array
+    memory [bytes]) of fn(frame) once the detector's buffers are sized.
+    A 640x480 mask is 300 KB; what remains are contour lists and ufunc
+    buffers. OpenCV's own C++ scratch memory is not visible to tracemalloc.
+    """
+    fn(frame)
+    before = detector.buffers.allocations
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for _ in range(repeat):
+            fn(frame)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return (detector.buffers.allocations - before) / repeat, peak
+
+
+def main(argv=None):
+    """
+    python3 vision.py bench [image]
+    """
+    parser = argparse.ArgumentParser(description="LED marker detection tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    bench = commands.add_parser("bench", help="time color segmentation, the blob step, detect() and ROI tracking per frame")
+    bench.add_argument("image", nargs="?", help="BGR image (default: synthetic frame with noise blobs)")
+    bench.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+    frame = cv2.imread(args.image) if args.image else synthetic_frame()
+    if frame is None:
+        print(f"Error: Could not load image '{args.image}'")
+        return 1
+    for name, seconds in benchmark(frame, args.repeat).items():
+        print(f"{name:>10}: {seconds * 1000:.3f} ms/frame")
+    yuv = YuvFrame.from_i420(i420(frame), frame.shape[1], frame.shape[0])
+    if frame.shape[2] == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+    detector = MarkerDetector()
+    tracker = RoiTracker(detector)
+    for name, fn, image in (("detect", detector.detect, frame), ("roi", tracker.detect, frame),
+                            ("detect yuv", detector.detect, yuv)):
+        buffers, peak = allocations(detector, fn, image)
+        print(f"{name:>10}: {buffers:g} buffer allocations/frame, {peak / 1024:.0f} KB peak transient")
+    print(f"{'pool':>10}: {detector.buffers}")
+    return 0
+
+
+# If this file is run as a script
+if __name__ == "__main__":
+    sys.exit(main())